@@ -0,0 +1,148 @@
+"""
+Ball tracker benchmark: per-frame cost and drift against YOLO.
+
+YOLO runs on every frame of each recorded wall ball clip to give the
+ground-truth ball track.  Each tracker is seeded from YOLO every
+``--reseed-every`` frames (the production ``detect_every_n_frames``) and
+bridges the frames in between, as it does inside GymObjectDetector.
+
+Reported per tracker, over all clips:
+
+  seed ms     mean cost of seeding the tracker on a YOLO hit
+  update ms   mean cost of one in-between frame
+  drift px    median / 90th percentile centroid distance to YOLO on in-between frames
+  lost %      in-between frames where YOLO sees the ball but the tracker has lost it
+
+Pick the cheapest tracker whose drift and loss are acceptable, and set it
+with BALL_TRACKER.
+
+Usage:
+    python benchmark_trackers.py clip1.mp4 [clip2.mp4 ...]
+        [--trackers csrt,kcf,mosse,optical_flow] [--reseed-every 3] [--max-frames 900]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+# Allow imports from the project root without Django setup.
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from workout.utilities.frame_source import open_frame_source  # noqa: E402
+from workout.utilities.wall_ball.object_detector import GymObjectDetector  # noqa: E402
+from workout.utilities.wall_ball.trackers import TRACKERS, create_tracker  # noqa: E402
+
+
+class TrackerRun:
+    """Timings and drift of one tracker across the benchmark."""
+
+    def __init__(self, name: str, tracker):
+        self.name = name
+        self.tracker = tracker
+        self.active = False
+        self.seed_ms: list[float] = []
+        self.update_ms: list[float] = []
+        self.drift_px: list[float] = []
+        self.lost = 0
+        self.compared = 0
+
+    def seed(self, frame, ball) -> None:
+        if ball is None:
+            self.active = False
+            return
+        x1, y1, x2, y2 = ball['bbox']
+        start = time.perf_counter()
+        self.tracker.init(frame, (x1, y1, x2 - x1, y2 - y1))
+        self.seed_ms.append((time.perf_counter() - start) * 1000)
+        self.active = True
+
+    def bridge(self, frame, truth) -> None:
+        centroid = None
+        if self.active:
+            start = time.perf_counter()
+            ok, (x, y, w, h) = self.tracker.update(frame)
+            self.update_ms.append((time.perf_counter() - start) * 1000)
+            self.active = ok
+            if ok:
+                centroid = (x + w / 2, y + h / 2)
+        if truth is None:
+            return
+        self.compared += 1
+        if centroid is None:
+            self.lost += 1
+        else:
+            tx, ty = truth['centroid']
+            self.drift_px.append(float(np.hypot(centroid[0] - tx, centroid[1] - ty)))
+
+    def row(self) -> str:
+        def mean(values):
+            return f"{np.mean(values):9.2f}" if values else "        -"
+        if self.drift_px:
+            drift = f"{np.median(self.drift_px):6.1f} / {np.percentile(self.drift_px, 90):6.1f}"
+        else:
+            drift = "     - /      -"
+        lost = f"{100.0 * self.lost / self.compared:6.1f}" if self.compared else "     -"
+        return f"{self.name:<13} {mean(self.seed_ms)} {mean(self.update_ms)}  {drift}  {lost}"
+
+
+def benchmark_clip(path: str, detector: GymObjectDetector, runs: list[TrackerRun],
+                   reseed_every: int, max_frames: int) -> int:
+    """Feed one clip through YOLO and every tracker; returns the frames read."""
+    video = open_frame_source(path)
+    if not video.isOpened():
+        print(f"Could not open {path}", file=sys.stderr)
+        return 0
+    frame_idx = 0
+    try:
+        while frame_idx < max_frames:
+            success, frame = video.read()
+            if not success or frame is None:
+                break
+            # Ground truth: YOLO's best ball on every frame (no torso filter, as in the pre-scan).
+            truth = detector._run_yolo([frame], [None])[0]
+            for run in runs:
+                if frame_idx % reseed_every == 0:
+                    run.seed(frame, truth)
+                else:
+                    run.bridge(frame, truth)
+            frame_idx += 1
+    finally:
+        video.release()
+    return frame_idx
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('clips', nargs='+', help='Recorded wall ball videos')
+    parser.add_argument('--trackers', default=','.join(TRACKERS), help='Comma-separated trackers to compare')
+    parser.add_argument('--reseed-every', type=int, default=3, help='Frames between YOLO seeds')
+    parser.add_argument('--max-frames', type=int, default=900, help='Frames to read per clip')
+    args = parser.parse_args()
+
+    runs = []
+    for name in args.trackers.split(','):
+        tracker = create_tracker(name.strip())
+        if tracker is None:
+            print(f"Skipping {name}: not available in this OpenCV build", file=sys.stderr)
+            continue
+        runs.append(TrackerRun(name.strip(), tracker))
+    if not runs:
+        sys.exit("No trackers to benchmark")
+
+    detector = GymObjectDetector(detect_every_n_frames=1)
+    total = 0
+    for path in args.clips:
+        frames = benchmark_clip(path, detector, runs, args.reseed_every, args.max_frames)
+        print(f"{path}: {frames} frames")
+        total += frames
+
+    print(f"\n{total} frames, YOLO seed every {args.reseed_every} frames\n")
+    print(f"{'tracker':<13} {'seed ms':>9} {'update ms':>9}  {'drift px p50 / p90':>15}  {'lost %':>6}")
+    for run in runs:
+        print(run.row())
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,7 @@
+import logging
 import os
 from celery import Celery
+from celery.signals import worker_init, worker_process_init
 from decouple import config
 
 
@@ -8,3 +10,29 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'judgeFit.settings')
 app = Celery('judgeFit')
 app.config_from_object('django.conf:settings', namespace='CELERY')
 app.autodiscover_tasks()
+
+logger = logging.getLogger(__name__)
+
+
+def _warm_model_registry():
+    if os.environ.get('MODEL_WARM_UP', '1') == '0':
+        return
+    from workout.utilities.model_registry import get_model_registry  # noqa: PLC0415
+    try:
+        get_model_registry().warm_up()
+    except Exception as exc:
+        # Models still load lazily on the first task.
+        logger.warning("Model warm-up failed: %s", exc)
+
+
+@worker_process_init.connect
+def warm_models_in_child(**kwargs):
+    """Prefork/spawn pools: each child process warms its own models."""
+    _warm_model_registry()
+
+
+@worker_init.connect
+def warm_models_in_solo_worker(sender=None, **kwargs):
+    """Solo pool: tasks run in the main worker process, which never forks a child."""
+    if app.conf.worker_pool == 'solo':
+        _warm_model_registry()
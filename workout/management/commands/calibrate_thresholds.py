@@ -0,0 +1,58 @@
+import csv
+
+from django.core.management.base import BaseCommand, CommandError
+
+from workout.utilities.calibration_sweep import SWEEP_PARAMS, criteria_key, parse_grid_values, sweep
+from workout.utilities.utils import load_movement_criteria
+from workout.utilities.workout_analyser import normalise_movement_name
+
+
+class Command(BaseCommand):
+    help = 'sweep counter thresholds for a movement against a folder of labelled clips'
+
+    def add_arguments(self, parser):
+        parser.add_argument('folder', type=str, help='Folder with the clips and labels.json')
+        parser.add_argument('--movement', type=str, required=True, help='Movement name, e.g. "Air Squat"')
+        parser.add_argument('--descending', type=str, help='descending_threshold grid, e.g. 100:120:5')
+        parser.add_argument('--end-point', type=str, help='end_point grid, e.g. 55,60,65,70')
+        parser.add_argument('--start-point', type=str, help='start_point grid, e.g. 155:175:5')
+        parser.add_argument('--workers', type=int, default=None, help='Process pool size (default: CPU count)')
+        parser.add_argument('--output', type=str, help='Write the full accuracy surface to this CSV file')
+        parser.add_argument('--top', type=int, default=10, help='How many of the best candidates to print')
+
+    def handle(self, *args, **options):
+        movement = normalise_movement_name(options['movement'])
+        try:
+            key = criteria_key(movement)
+            grid = {
+                name: parse_grid_values(options[option])
+                for name, option in zip(SWEEP_PARAMS, ('descending', 'end_point', 'start_point'))
+                if options[option]
+            }
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        base_criteria = load_movement_criteria().get(key, {})
+        try:
+            rows = sweep(options['folder'], movement, base_criteria, grid, workers=options['workers'])
+        except (OSError, ValueError) as exc:
+            raise CommandError(f'Sweep failed: {exc}')
+
+        if options['output']:
+            with open(options['output'], 'w', newline='') as fh:
+                writer = csv.DictWriter(fh, fieldnames=list(rows[0].keys()))
+                writer.writeheader()
+                writer.writerows(rows)
+            self.stdout.write(f"Wrote {len(rows)} candidates to {options['output']}")
+
+        for row in rows[:options['top']]:
+            self.stdout.write(
+                '  '.join(f'{name}={row[name]}' for name in SWEEP_PARAMS)
+                + f"  exact={row['exact_match_rate']:.2f}"
+                + f"  good_mae={row['good_rep_mae']:.2f}  no_rep_mae={row['no_rep_mae']:.2f}"
+            )
+
+        best = rows[0]
+        self.stdout.write(self.style.SUCCESS(
+            f"Best for '{key}': " + ', '.join(f'{name}={best[name]}' for name in SWEEP_PARAMS)
+        ))
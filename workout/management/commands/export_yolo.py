@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from workout.utilities.wall_ball.object_detector import _DEFAULT_MODEL_PATH
+from workout.utilities.wall_ball.yolo_runtime import EXPORT_BACKENDS, export_model
+
+
+class Command(BaseCommand):
+    help = 'export the YOLO ball detector weights for the ONNX Runtime or OpenVINO backend'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--backend', choices=EXPORT_BACKENDS, default='onnx', help='Runtime to export for')
+        parser.add_argument('--weights', type=str, default=_DEFAULT_MODEL_PATH, help='Path to the .pt weights')
+        parser.add_argument('--force', action='store_true', help='Re-export even if the export is up to date')
+
+    def handle(self, *args, **options):
+        try:
+            path = export_model(options['weights'], options['backend'], force=options['force'])
+        except (ImportError, OSError, RuntimeError) as exc:
+            raise CommandError(f'Export failed: {exc}')
+        self.stdout.write(self.style.SUCCESS(f"{options['backend']} model ready at {path}"))
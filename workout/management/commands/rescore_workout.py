@@ -0,0 +1,49 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from workout.models import Workout
+from workout.tasks import rescore_workout, rescore_workout_videos
+
+
+class Command(BaseCommand):
+    help = 're-score every analysed video of a workout from its stored pose tracks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('workout_id', type=int, help='ID of the workout to re-score')
+        parser.add_argument(
+            '--criteria',
+            type=str,
+            help='Path to a JSON file of per-movement overrides, e.g. {"squat": {"end_point": 75}}',
+        )
+        parser.add_argument(
+            '--async',
+            action='store_true',
+            dest='run_async',
+            help='Queue the re-score on Celery instead of running it here',
+        )
+
+    def handle(self, *args, **options):
+        workout_id = options['workout_id']
+        if not Workout.objects.filter(id=workout_id).exists():
+            raise CommandError(f'Workout {workout_id} does not exist')
+
+        overrides = {}
+        if options['criteria']:
+            try:
+                with open(options['criteria']) as fh:
+                    overrides = json.load(fh)
+            except (OSError, json.JSONDecodeError) as exc:
+                raise CommandError(f'Could not read criteria overrides: {exc}')
+
+        if options['run_async']:
+            rescore_workout.delay(workout_id, overrides)
+            self.stdout.write(self.style.SUCCESS(f'Queued re-score of workout {workout_id}'))
+            return
+
+        summary = rescore_workout_videos(workout_id, overrides)
+        for score_id, reason in summary['skipped'].items():
+            self.stdout.write(self.style.WARNING(f'Skipped score {score_id}: {reason}'))
+        self.stdout.write(self.style.SUCCESS(
+            f"Re-scored {len(summary['rescored'])} videos of workout {workout_id}"
+        ))
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.20 on 2026-10-18 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workout', '0011_add_competition_to_workout'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='video',
+            name='pose_track_key',
+            field=models.CharField(blank=True, max_length=100, null=True),
+        ),
+    ]
@@ -123,7 +123,9 @@ class Score(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     is_scaled = models.BooleanField(default=False)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, blank=True, null=True)
-    # Per-movement breakdown: list of {round, sequence, movement, reps, no_reps, expected_reps}
+    # Per-movement breakdown: list of {round, sequence, movement, reps, no_reps, expected_reps},
+    # plus a final {event: 'analysis_stopped', reason, frame, timestamp} entry when analysis
+    # stopped early ('plan_complete' or 'time_cap').
     movement_breakdown = models.JSONField(default=list, blank=True)
 
 
@@ -178,6 +180,8 @@ class Video(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     competition = models.ForeignKey('athlete.Competition', on_delete=models.CASCADE, blank=True, null=True)
     urlPath = models.CharField(max_length=255, blank=True, null=True)
+    # PoseTrackCache key of the landmark track recorded during analysis (used for re-scoring).
+    pose_track_key = models.CharField(max_length=100, blank=True, null=True)
 
     @staticmethod
     def process_video(video):
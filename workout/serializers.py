@@ -80,6 +80,7 @@ class VideoSerializer(serializers.ModelSerializer):
     class Meta:
         model = Video
         fields = '__all__'
+        read_only_fields = ['pose_track_key']
 
 
 class VideoScore(serializers.ModelSerializer):
@@ -7,6 +7,21 @@ from rest_framework.response import Response
 logger = logging.getLogger(__name__)
 
 
+def _workout_context(workout):
+    """Return (components, workout_components, workout_type) for the analysers."""
+    components = list(workout.components.select_related('movement').order_by('round', 'sequence'))
+    workout_components = [
+        {
+            'movement': component.movement.name,
+            'expected_reps': component.reps,
+            'round': component.round,
+            'sequence': component.sequence,
+        }
+        for component in components
+    ]
+    return components, workout_components, workout.type
+
+
 @shared_task(bind=True)
 def analyse_video(self, score_id, video_url):
     from workout.models import Score
@@ -22,20 +37,10 @@ def analyse_video(self, score_id, video_url):
         workout_components = []
         workout_type = 'FT'
         components = []
+        video = None
         try:
             video = score.video  # reverse OneToOneField from Video.score
-            workout = video.workout
-            workout_type = workout.type
-            components = list(workout.components.select_related('movement').order_by('round', 'sequence'))
-            workout_components = [
-                {
-                    'movement': component.movement.name,
-                    'expected_reps': component.reps,
-                    'round': component.round,
-                    'sequence': component.sequence,
-                }
-                for component in components
-            ]
+            components, workout_components, workout_type = _workout_context(video.workout)
         except Exception as ctx_err:
             logger.warning(
                 "Could not load workout context for score %s — falling back to "
@@ -44,7 +49,9 @@ def analyse_video(self, score_id, video_url):
             )
 
         if workout_components:
-            result = analyse_workout_video(video_url, workout_components, workout_type)
+            result = analyse_workout_video(
+                video_url, workout_components, workout_type, time_cap=video.workout.time_cap,
+            )
         else:
             logger.error("Task failed for score %s: %s", score_id, e)
             score.status = Score.FAILED
@@ -53,50 +60,11 @@ def analyse_video(self, score_id, video_url):
                 status=status.HTTP_406_NOT_ACCEPTABLE
                 )
 
-        score.total_reps = result['total_reps']
-        score.no_reps = result['no_reps']
-        score.good_reps = result['good_reps']
-        score.is_valid = result['is_valid']
-        score.is_scaled = result['is_scaled']
-        score.movement_breakdown = result.get('breakdown', [])
-        score.status = Score.COMPLETE
-        score.save()
+        if video is not None and result.get('pose_track_key'):
+            video.pose_track_key = result['pose_track_key']
+            video.save(update_fields=['pose_track_key'])
 
-        # Create per-rep ScoreBreakdown records if the analyser produced a rep log.
-        rep_log = result.get('rep_log', [])
-        if rep_log:
-            from workout.models import ScoreBreakdown
-            try:
-                # Resolve the Movement FK — use the first wall_ball component.
-                movement_obj = None
-                for component in components:
-                    if 'wall' in component.movement.name.lower():
-                        movement_obj = component.movement
-                        break
-                if movement_obj is None and components:
-                    movement_obj = components[0].movement
-
-                if movement_obj is not None:
-                    ScoreBreakdown.objects.bulk_create([
-                        ScoreBreakdown(
-                            score=score,
-                            is_good_rep=rep['is_good_rep'],
-                            movement=movement_obj,
-                            no_rep_reason=rep.get('no_rep_reason'),
-                            rep_number=rep.get('rep_number'),
-                            rep_timestamp=rep.get('rep_timestamp'),
-                        )
-                        for rep in rep_log
-                    ])
-                    logger.info(
-                        "Created %d ScoreBreakdown records for score %s",
-                        len(rep_log), score_id,
-                    )
-            except Exception as breakdown_err:
-                logger.warning(
-                    "Could not create ScoreBreakdown records for score %s: %s",
-                    score_id, breakdown_err,
-                )
+        _save_result(score, result, components)
 
     except Exception as e:
         from vision.llava_client import LLaVAClockDetectionError, LLaVATargetDetectionError
@@ -107,3 +75,135 @@ def analyse_video(self, score_id, video_url):
         score.status = Score.FAILED
         score.save()
         raise
+
+
+def _save_result(score, result, components):
+    """Write an analyser result onto ``score`` and (re)build its ScoreBreakdown rows."""
+    from workout.models import Score, ScoreBreakdown
+
+    score.total_reps = result['total_reps']
+    score.no_reps = result['no_reps']
+    score.good_reps = result['good_reps']
+    score.is_valid = result['is_valid']
+    score.is_scaled = result['is_scaled']
+    score.movement_breakdown = result.get('breakdown', [])
+    score.status = Score.COMPLETE
+    score.save()
+
+    # Replace the breakdown from any previous scoring of this video, even when
+    # the new result has no rep log to rebuild it from.
+    ScoreBreakdown.objects.filter(score=score).delete()
+
+    # Create per-rep ScoreBreakdown records if the analyser produced a rep log.
+    rep_log = result.get('rep_log', [])
+    if rep_log:
+        try:
+            # Resolve the Movement FK — use the first wall_ball component.
+            movement_obj = None
+            for component in components:
+                if 'wall' in component.movement.name.lower():
+                    movement_obj = component.movement
+                    break
+            if movement_obj is None and components:
+                movement_obj = components[0].movement
+
+            if movement_obj is not None:
+                ScoreBreakdown.objects.bulk_create([
+                    ScoreBreakdown(
+                        score=score,
+                        is_good_rep=rep['is_good_rep'],
+                        movement=movement_obj,
+                        no_rep_reason=rep.get('no_rep_reason'),
+                        rep_number=rep.get('rep_number'),
+                        rep_timestamp=rep.get('rep_timestamp'),
+                    )
+                    for rep in rep_log
+                ])
+                logger.info(
+                    "Created %d ScoreBreakdown records for score %s",
+                    len(rep_log), score.id,
+                )
+        except Exception as breakdown_err:
+            logger.warning(
+                "Could not create ScoreBreakdown records for score %s: %s",
+                score.id, breakdown_err,
+            )
+
+
+def rescore_workout_videos(workout_id, criteria_overrides=None):
+    """
+    Re-judge every analysed video of a workout from its stored pose track.
+
+    Args:
+        workout_id:         Workout primary key.
+        criteria_overrides: {movement_key: {criterion: value}} applied on top of
+                            movement_analysis_criteria.json.
+
+    Returns:
+        dict with 'workout_id', 'rescored' (score ids), 'skipped' ({score_id: reason}),
+        'skipped_videos' (ids of the videos left with their old score) and
+        'needs_reanalysis' (those of them whose stored track is missing, evicted
+        from the cache or cut short, so only a full re-analysis can re-score them).
+    """
+    from workout.models import Video, Workout
+    from workout.utilities.rescore import (
+        RescoreError, TrackUnavailableError, load_track, merge_criteria, rescore_track,
+    )
+    from workout.utilities.utils import load_movement_criteria
+
+    workout = Workout.objects.get(id=workout_id)
+    components, workout_components, workout_type = _workout_context(workout)
+    criteria = merge_criteria(load_movement_criteria(), criteria_overrides)
+
+    rescored = []
+    skipped = {}
+    skipped_videos = []
+    needs_reanalysis = []
+    videos = Video.objects.filter(
+        workout=workout, is_deleted=False, score__isnull=False,
+    ).select_related('score')
+    for video in videos:
+        score_id = str(video.score_id)
+        if not video.pose_track_key:
+            skipped[score_id] = 'no stored pose track'
+            skipped_videos.append(str(video.id))
+            needs_reanalysis.append(str(video.id))
+            continue
+        try:
+            track = load_track(video.pose_track_key)
+            result = rescore_track(track, workout_components, workout_type, criteria, time_cap=workout.time_cap)
+        except TrackUnavailableError as exc:
+            logger.warning("Video %s needs a full re-analysis to be re-scored: %s", video.id, exc)
+            skipped[score_id] = str(exc)
+            skipped_videos.append(str(video.id))
+            needs_reanalysis.append(str(video.id))
+            continue
+        except RescoreError as exc:
+            logger.warning("Could not re-score score %s: %s", score_id, exc)
+            skipped[score_id] = str(exc)
+            skipped_videos.append(str(video.id))
+            continue
+        _save_result(video.score, result, components)
+        rescored.append(score_id)
+
+    logger.info(
+        "Re-scored workout %s: %d scores updated, %d skipped",
+        workout_id, len(rescored), len(skipped),
+    )
+    if skipped_videos:
+        logger.warning(
+            "Re-score of workout %s left %d videos with their old score: %s (needs full re-analysis: %s)",
+            workout_id, len(skipped_videos), ', '.join(skipped_videos), ', '.join(needs_reanalysis) or 'none',
+        )
+    return {
+        'workout_id': str(workout_id),
+        'rescored': rescored,
+        'skipped': skipped,
+        'skipped_videos': skipped_videos,
+        'needs_reanalysis': needs_reanalysis,
+    }
+
+
+@shared_task
+def rescore_workout(workout_id, criteria_overrides=None):
+    return rescore_workout_videos(workout_id, criteria_overrides)
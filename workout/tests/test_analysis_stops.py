@@ -0,0 +1,173 @@
+from unittest import mock
+
+import cv2
+import numpy as np
+from django.test import SimpleTestCase
+
+from workout.utilities.barbell import barbell_analyser
+from workout.utilities.movement_counters import WallBallCounter
+from workout.utilities.pose_cache import PoseTrack
+from workout.utilities.utils import load_movement_criteria
+from workout.utilities.wall_ball.wall_ball_analyser import WallBallAnalyser
+from workout.utilities.workout_analyser import WorkoutAnalyser, WorkoutPlan
+
+FPS = 30.0
+
+
+def _track(frames=10, start_frame=0, extras=None):
+    return PoseTrack(
+        np.zeros((frames, 33, 3), dtype=np.float32),
+        fps=FPS,
+        frame_size=(640, 480),
+        settings={},
+        start_frame=start_frame,
+        extras=extras,
+    )
+
+
+class WorkoutAnalyserStopTests(SimpleTestCase):
+
+    def _analyser(self, workout_type='FT', time_cap=None, start_frame=0):
+        components = [
+            {'movement': 'squat', 'expected_reps': 10, 'sequence': 1},
+            {'movement': 'push_up', 'expected_reps': 10, 'sequence': 2},
+        ]
+        plan = WorkoutPlan(components, workout_type=workout_type, time_cap=time_cap)
+        return WorkoutAnalyser(None, plan, load_movement_criteria(), pose_track=_track(start_frame=start_frame))
+
+    def test_stops_once_a_for_time_plan_is_complete(self):
+        analyser = self._analyser()
+        analyser.plan_index = 1
+        self.assertFalse(analyser._check_stop())
+        analyser.plan_index = 2
+        self.assertTrue(analyser._check_stop())
+        self.assertEqual(analyser.stop_reason, 'plan_complete')
+
+    def test_amrap_plan_never_completes(self):
+        analyser = self._analyser(workout_type='AMRAP')
+        analyser.plan_index = 20
+        self.assertFalse(analyser._check_stop())
+
+    def test_time_cap_runs_from_the_analysis_start_frame(self):
+        analyser = self._analyser(time_cap=10, start_frame=450)
+        analyser._switch_movement('squat')
+        analyser._frame_no = 450 + 10 * int(FPS) - 1
+        self.assertFalse(analyser._check_stop())
+        # No rep has started: the cap still runs from the workout start.
+        self.assertFalse(analyser.current_counter.in_rep())
+        analyser._frame_no = 450 + 10 * int(FPS)
+        self.assertTrue(analyser._check_stop())
+        self.assertEqual(analyser.stop_reason, 'time_cap')
+
+
+class WallBallAnalyserStopTests(SimpleTestCase):
+
+    def _analyser(self, expected_reps=5, time_cap=None, pose_track=None, llava=False):
+        """Just the state _check_stop() reads; no video, models or target calibration."""
+        analyser = WallBallAnalyser.__new__(WallBallAnalyser)
+        analyser.expected_reps = expected_reps
+        analyser.stop_at_expected_reps = True
+        analyser.time_cap = time_cap
+        analyser.stop_reason = None
+        analyser.pose_track = pose_track
+        analyser.llava_client = object() if llava else None
+        analyser._equipment_criteria = {'ball_weight': '20 lb'}
+        analyser.counter = WallBallCounter(load_movement_criteria().get('wall_ball', {}))
+        analyser.counter.set_fps(FPS)
+        analyser._pending_frames = None
+        analyser._start_frame = 0
+        analyser._frame_idx = 0
+        analyser._fps = FPS
+        return analyser
+
+    def test_stops_at_the_expected_reps(self):
+        analyser = self._analyser()
+        analyser.counter.count = 4
+        self.assertFalse(analyser._check_stop())
+        analyser.counter.count = 5
+        self.assertTrue(analyser._check_stop())
+        self.assertEqual(analyser.stop_reason, 'plan_complete')
+
+    def test_keeps_going_while_equipment_checks_may_demote_reps(self):
+        analyser = self._analyser(llava=True)
+        analyser.counter.count = 5
+        self.assertFalse(analyser._check_stop())
+
+    def test_replay_follows_the_recorded_equipment_checks(self):
+        checked = self._analyser(pose_track=_track(extras={'equipment_checks': [[2, 'light ball']]}))
+        checked.counter.count = 5
+        self.assertFalse(checked._check_stop())
+
+        unchecked = self._analyser(pose_track=_track(extras={'equipment_checks': []}))
+        unchecked.counter.count = 5
+        self.assertTrue(unchecked._check_stop())
+
+    def test_never_stops_while_calibration_holds_frames(self):
+        analyser = self._analyser()
+        analyser.counter.count = 5
+        analyser._pending_frames = []
+        self.assertFalse(analyser._check_stop())
+
+    def test_time_cap_from_the_workout_start_frame(self):
+        for start_frame in (0, 120):
+            analyser = self._analyser(expected_reps=None, time_cap=60)
+            analyser._start_frame = start_frame
+            analyser._frame_idx = 60 * int(FPS) - 1
+            self.assertFalse(analyser._check_stop())
+            analyser._frame_idx = 60 * int(FPS)
+            self.assertTrue(analyser._check_stop())
+            self.assertEqual(analyser.stop_reason, 'time_cap')
+
+
+class _Video:
+
+    def __init__(self, frames):
+        self.frames = frames
+        self.reads = 0
+
+    def isOpened(self):
+        return True
+
+    def get(self, prop):
+        return FPS if prop == cv2.CAP_PROP_FPS else 0
+
+    def read(self):
+        if self.reads >= self.frames:
+            return False, None
+        self.reads += 1
+        return True, np.zeros((4, 4, 3), dtype=np.uint8)
+
+    def release(self):
+        pass
+
+
+class _NoPose:
+
+    def detect_into(self, packet, frame, frame_size=None):
+        frame.clear()
+
+
+@mock.patch.object(barbell_analyser, 'get_model_registry')
+@mock.patch.object(barbell_analyser, 'PoseTrackSession')
+class BarbellAnalyserStopTests(SimpleTestCase):
+
+    def _analyse(self, session_cls, frames, **kwargs):
+        session_cls.return_value.begin.return_value = _NoPose()
+        with mock.patch.object(barbell_analyser, 'open_frame_source', return_value=_Video(frames)):
+            analyser = barbell_analyser.BarbellAnalyser('clip.mp4', 'snatch', None, {}, **kwargs)
+            return analyser, analyser.analyse()
+
+    def test_time_cap_runs_from_the_start_of_the_video(self, session_cls, _registry):
+        analyser, result = self._analyse(session_cls, 200, time_cap=2)
+        self.assertEqual(analyser.stop_reason, 'time_cap')
+        self.assertEqual(result['breakdown'][0]['frame'], 2 * int(FPS))
+        finish = session_cls.return_value.finish.call_args
+        self.assertEqual(finish.kwargs['frames'], 2 * int(FPS) + 1)
+        self.assertFalse(finish.kwargs['complete'])
+
+    def test_finish_reports_every_frame_read(self, session_cls, _registry):
+        analyser, _ = self._analyse(session_cls, 50)
+        self.assertIsNone(analyser.stop_reason)
+        finish = session_cls.return_value.finish.call_args
+        self.assertEqual(finish.kwargs['frames'], 50)
+        self.assertTrue(finish.kwargs['complete'])
@@ -0,0 +1,71 @@
+import numpy as np
+from django.test import SimpleTestCase
+
+from workout.utilities.movement_counters import seconds_to_frames
+from workout.utilities.wall_ball.ball_trajectory import BallTrajectory
+
+
+def _throw(t, fps=30.0):
+    """Ball centroid ``t`` frames into a throw: up and slightly right, under gravity."""
+    s = t * 30.0 / fps  # reference-rate frames
+    return 100 + 2 * s, 600 - 30 * s + 0.75 * s * s
+
+
+def _ball(x, y):
+    return {'centroid': (x, y), 'bbox': (x - 15, y - 15, x + 15, y + 15), 'confidence': 0.9}
+
+
+class BallTrajectoryTests(SimpleTestCase):
+
+    def test_no_prediction_without_a_track(self):
+        trajectory = BallTrajectory(30.0)
+        self.assertIsNone(trajectory.predict())
+        trajectory.step(None)
+        self.assertIsNone(trajectory.predict())
+
+    def test_predicts_a_parabolic_throw(self):
+        trajectory = BallTrajectory(30.0)
+        for t in range(12):
+            trajectory.step(_ball(*_throw(t)))
+        x, y, sigma = trajectory.predict(ahead=3)
+        true_x, true_y = _throw(14)
+        self.assertAlmostEqual(x, true_x, delta=3)
+        self.assertAlmostEqual(y, true_y, delta=3)
+        fresh = BallTrajectory(30.0)
+        fresh.step(_ball(*_throw(0)))
+        self.assertLess(sigma, fresh.predict(ahead=3)[2] / 2)
+        self.assertEqual(trajectory.ball_extent, 30)
+
+    def test_uncertainty_grows_while_coasting(self):
+        trajectory = BallTrajectory(30.0)
+        for t in range(12):
+            trajectory.step(_ball(*_throw(t)))
+        sigma = trajectory.predict()[2]
+        trajectory.step(None)
+        trajectory.step(None)
+        self.assertGreater(trajectory.predict()[2], sigma)
+
+    def test_track_is_dropped_after_the_coast_limit(self):
+        trajectory = BallTrajectory(30.0)
+        trajectory.step(_ball(100, 100))
+        for _ in range(seconds_to_frames(0.5, 30.0)):
+            trajectory.step(None)
+        self.assertIsNotNone(trajectory.predict())
+        trajectory.step(None)
+        self.assertIsNone(trajectory.predict())
+
+    def test_far_measurement_starts_a_new_track(self):
+        trajectory = BallTrajectory(30.0)
+        for t in range(8):
+            trajectory.step(_ball(*_throw(t)))
+        trajectory.step(_ball(1500, 50))
+        x, y, _ = trajectory.predict()
+        self.assertEqual((x, y), (1500, 50))
+
+    def test_prediction_is_in_frames_of_the_video_rate(self):
+        slow, fast = BallTrajectory(30.0), BallTrajectory(60.0)
+        for t in range(12):
+            slow.step(_ball(*_throw(t, 30.0)))
+        for t in range(23):
+            fast.step(_ball(*_throw(t, 60.0)))
+        np.testing.assert_allclose(slow.predict(2)[:2], fast.predict(4)[:2], atol=3)
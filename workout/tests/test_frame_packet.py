@@ -0,0 +1,52 @@
+import cv2
+import numpy as np
+from django.test import SimpleTestCase
+
+from workout.utilities.frame_packet import FramePacket
+
+
+class FramePacketTests(SimpleTestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(2)
+        self.image = rng.integers(0, 256, size=(120, 160, 3), dtype=np.uint8)
+
+    def test_region_image_is_a_view_of_the_frame(self):
+        packet = FramePacket(self.image)
+        child = packet.region(10, 50, 20, 80)
+        self.assertTrue(np.shares_memory(child.image, self.image))
+        np.testing.assert_array_equal(child.image, self.image[10:50, 20:80])
+
+    def test_region_slices_views_the_parent_already_computed(self):
+        packet = FramePacket(self.image)
+        gray = packet.gray
+        child = packet.region(10, 50, 20, 80)
+        self.assertTrue(np.shares_memory(child.gray, gray))
+        np.testing.assert_array_equal(child.gray, cv2.cvtColor(self.image[10:50, 20:80], cv2.COLOR_BGR2GRAY))
+
+    def test_region_picks_up_views_computed_after_it_was_created(self):
+        packet = FramePacket(self.image)
+        child = packet.region(0, 60)
+        hsv = packet.hsv
+        self.assertIs(packet.region(0, 60), child)
+        self.assertTrue(np.shares_memory(child.hsv, hsv))
+
+    def test_region_computes_its_own_view_when_the_parent_has_none(self):
+        packet = FramePacket(self.image, color='rgb')
+        child = packet.region(0, 60, 0, 40)
+        np.testing.assert_array_equal(child.bgr, cv2.cvtColor(self.image[0:60, 0:40], cv2.COLOR_RGB2BGR))
+        self.assertNotIn('bgr', packet._views)
+
+    def test_scaled_fits_the_longer_side(self):
+        packet = FramePacket(self.image)
+        self.assertIs(packet.scaled(None), packet)
+        self.assertIs(packet.scaled(200), packet)
+        self.assertEqual(packet.scaled(80).shape, (60, 80, 3))
+        self.assertIs(packet.scaled(80), packet.scaled(80))
+
+
+    def test_views_are_computed_once(self):
+        packet = FramePacket(self.image)
+        self.assertIs(packet.gray, packet.gray)
+        self.assertIs(packet.bgr, self.image)
+        np.testing.assert_array_equal(packet.rgb, self.image[..., ::-1])
@@ -0,0 +1,145 @@
+import numpy as np
+from django.test import SimpleTestCase
+
+from workout.utilities.frame_pipeline import FramePipeline
+from workout.utilities.pose_cache import PoseTrack, ReplayPoseDetector
+
+
+class _Video:
+    """cv2.VideoCapture stand-in: frame ``i`` is a tiny image filled with ``i``."""
+
+    def __init__(self, frames=None, fail_at=None):
+        self.frames = frames
+        self.fail_at = fail_at
+        self.reads = 0
+
+    def read(self):
+        if self.fail_at is not None and self.reads == self.fail_at:
+            raise OSError("decoder crashed")
+        if self.frames is not None and self.reads >= self.frames:
+            return False, None
+        img = np.full((4, 4, 3), self.reads % 256, dtype=np.uint8)
+        self.reads += 1
+        return True, img
+
+
+class _Detector:
+    """Writes the frame number into every landmark row."""
+
+    def __init__(self, fail_at=None):
+        self.fail_at = fail_at
+        self.calls = 0
+
+    def detect_into(self, packet, frame, frame_size=None):
+        if self.fail_at is not None and self.calls == self.fail_at:
+            raise RuntimeError("inference failed")
+        self.calls += 1
+        frame.set_rows(np.full((33, 3), packet.image[0, 0, 0], dtype=np.float32))
+
+
+class _EveryOther:
+    """MotionSampler stand-in that skips inference on odd frames."""
+
+    motion = False
+
+    def cover_lag(self, frames):
+        pass
+
+    def should_inspect(self, packet):
+        return packet.image[0, 0, 0] % 2 == 0
+
+    def observe(self, frame):
+        pass
+
+
+def _replay(frames=20, start_frame=0):
+    """ReplayPoseDetector over a track whose frame ``i`` holds ``start_frame + i`` in every row."""
+    landmarks = np.repeat(np.arange(start_frame, start_frame + frames, dtype=np.float32), 33 * 3)
+    track = PoseTrack(landmarks.reshape(frames, 33, 3), fps=30.0, frame_size=(4, 4), settings={},
+                      start_frame=start_frame)
+    return ReplayPoseDetector(track)
+
+
+class FramePipelineTests(SimpleTestCase):
+
+    def assertStopped(self, pipeline):
+        self.assertFalse(any(thread.is_alive() for thread in pipeline._threads))
+
+    def test_yields_every_frame_in_order(self):
+        pipeline = FramePipeline(_Video(frames=50), _Detector(), queue_size=4)
+        with pipeline as frames:
+            seen = [(int(packet.image[0, 0, 0]), int(lmList[0][1])) for packet, lmList in frames]
+        self.assertEqual(seen, [(i, i) for i in range(50)])
+        self.assertStopped(pipeline)
+
+    def test_break_shuts_the_threads_down(self):
+        video = _Video()  # endless
+        pipeline = FramePipeline(video, _Detector(), queue_size=2)
+        with pipeline as frames:
+            for i, _ in enumerate(frames):
+                if i == 3:
+                    break
+        self.assertStopped(pipeline)
+        self.assertLessEqual(video.reads, 4 + 2 * 2 + 2)
+
+    def test_closing_a_suspended_generator_shuts_the_threads_down(self):
+        pipeline = FramePipeline(_Video(), _Detector(), queue_size=2)
+
+        def analyse():
+            with pipeline as frames:
+                for packet, _ in frames:
+                    yield packet
+
+        gen = analyse()
+        next(gen)
+        gen.close()
+        self.assertStopped(pipeline)
+
+    def test_caller_exception_shuts_the_threads_down(self):
+        pipeline = FramePipeline(_Video(), _Detector(), queue_size=2)
+        with self.assertRaises(ValueError):
+            with pipeline as frames:
+                for _ in frames:
+                    raise ValueError("counter failed")
+        self.assertStopped(pipeline)
+
+    def test_inference_error_is_raised_in_the_caller(self):
+        pipeline = FramePipeline(_Video(), _Detector(fail_at=5), queue_size=2)
+        with self.assertRaises(RuntimeError), self.assertLogs('workout.utilities.frame_pipeline', 'ERROR'):
+            with pipeline as frames:
+                for _ in frames:
+                    pass
+        self.assertStopped(pipeline)
+
+    def test_decode_error_is_raised_in_the_caller(self):
+        pipeline = FramePipeline(_Video(fail_at=5), _Detector(), queue_size=2)
+        with self.assertRaises(OSError), self.assertLogs('workout.utilities.frame_pipeline', 'ERROR'):
+            with pipeline as frames:
+                for _ in frames:
+                    pass
+        self.assertStopped(pipeline)
+
+
+    def test_replay_detector_serves_the_track(self):
+        pipeline = FramePipeline(_Video(frames=20), _replay(), queue_size=4)
+        with pipeline as frames:
+            seen = [(int(packet.image[0, 0, 0]), lmList[0][1]) for packet, lmList in frames]
+        self.assertEqual(seen, [(i, i) for i in range(20)])
+
+    def test_replay_detector_stays_aligned_on_skipped_frames(self):
+        pipeline = FramePipeline(_Video(frames=20), _replay(), queue_size=4, sampler=_EveryOther())
+        with pipeline as frames:
+            seen = [lmList[0][1] for _, lmList in frames]
+        self.assertEqual(seen, list(range(20)))
+        self.assertStopped(pipeline)
+
+
+class ReplayPoseDetectorTests(SimpleTestCase):
+
+    def test_reset_rewinds_to_the_track_start(self):
+        detector = _replay(start_frame=5)
+        detector.getPose(None)
+        detector.getPose(None)
+        detector.reset()
+        detector.getPose(None)
+        self.assertEqual(detector.getPosition(None)[0][1], 5)
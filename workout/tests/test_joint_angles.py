@@ -0,0 +1,46 @@
+import numpy as np
+from django.test import SimpleTestCase
+
+import workout.utilities.PoseModule as pm
+
+
+class BatchAnglesTests(SimpleTestCase):
+
+    def _scalar_angles(self, xy, triplet):
+        """PoseDetector.getAngle for every frame of ``xy`` (no MediaPipe graph is built)."""
+        detector = pm.PoseDetector.__new__(pm.PoseDetector)
+        detector.lmList = pm.LandmarkFrame()
+        angles = []
+        for rows in xy:
+            detector.lmList.set_rows(np.column_stack([rows, np.ones(33)]))
+            angles.append(detector.getAngle(None, *triplet, draw=False))
+        return np.array(angles, dtype=np.float64)
+
+    def test_matches_get_angle_exactly(self):
+        xy = np.random.default_rng(1).integers(0, 1920, size=(2000, 33, 2)).astype(np.float64)
+        angles = pm.batch_angles(xy)
+        for name, triplet in pm.JOINT_TRIPLETS.items():
+            np.testing.assert_array_equal(angles[name], self._scalar_angles(xy, triplet), err_msg=name)
+
+    def test_returns_float_arrays(self):
+        angles = pm.batch_angles(np.zeros((5, 33, 2)))
+        self.assertEqual(set(angles), set(pm.JOINT_TRIPLETS))
+        self.assertEqual(angles['left_hip_knee_ankle'].dtype, np.float64)
+
+    def test_zero_length_limb_is_zero_degrees(self):
+        xy = np.zeros((1, 33, 2))
+        xy[0, 23] = (100, 100)  # hip; knee and ankle sit on the origin
+        angles = pm.batch_angles(xy, {'knee': (23, 25, 27)})
+        self.assertEqual(angles['knee'][0], 0.0)
+
+    def test_straight_and_right_angles(self):
+        xy = np.zeros((2, 33, 2))
+        xy[:, 25] = (100, 100)
+        xy[0, 23], xy[0, 27] = (100, 0), (100, 200)   # straight leg
+        xy[1, 23], xy[1, 27] = (100, 0), (200, 100)   # knee at 90°
+        angles = pm.batch_angles(xy, {'knee': (23, 25, 27)})['knee']
+        np.testing.assert_array_equal(angles, [180.0, 90.0])
+
+    def test_rejects_wrong_shape(self):
+        with self.assertRaises(ValueError):
+            pm.batch_angles(np.zeros((10, 33, 3)))
@@ -0,0 +1,56 @@
+import os
+import tempfile
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from workout.utilities.keyframe_index import KeyframeIndex
+
+
+@mock.patch('workout.utilities.keyframe_index.probe_keyframes', return_value=[60, 0, 30])
+class KeyframeIndexCacheTests(SimpleTestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.cache_dir = os.path.join(self._tmp.name, 'keyframes')
+        self.video_dir = os.path.join(self._tmp.name, 'videos')
+        os.makedirs(self.video_dir)
+        self.video_path = self._video('clip.mp4')
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _video(self, name, content=b'not really a video'):
+        path = os.path.join(self.video_dir, name)
+        with open(path, 'wb') as fh:
+            fh.write(content)
+        return path
+
+    def test_index_is_cached_by_content_not_beside_the_video(self, probe):
+        index = KeyframeIndex.for_video(self.video_path, 30.0, cache_dir=self.cache_dir)
+        self.assertEqual(index.keyframes, [0, 30, 60])
+        self.assertEqual(os.listdir(self.video_dir), ['clip.mp4'])
+
+        copy = self._video('copy.mp4')
+        self.assertEqual(KeyframeIndex.for_video(copy, 30.0, cache_dir=self.cache_dir).keyframes, [0, 30, 60])
+        self.assertEqual(probe.call_count, 1)
+
+    def test_other_content_or_fps_is_probed_again(self, probe):
+        KeyframeIndex.for_video(self.video_path, 30.0, cache_dir=self.cache_dir)
+        KeyframeIndex.for_video(self.video_path, 25.0, cache_dir=self.cache_dir)
+        KeyframeIndex.for_video(self._video('other.mp4', b'other'), 30.0, cache_dir=self.cache_dir)
+        self.assertEqual(probe.call_count, 3)
+
+    def test_corrupt_index_is_probed_again(self, probe):
+        KeyframeIndex.for_video(self.video_path, 30.0, cache_dir=self.cache_dir)
+        (name,) = os.listdir(self.cache_dir)
+        with open(os.path.join(self.cache_dir, name), 'w') as fh:
+            fh.write('[1, 2')
+        self.assertEqual(len(KeyframeIndex.for_video(self.video_path, 30.0, cache_dir=self.cache_dir)), 3)
+        self.assertEqual(probe.call_count, 2)
+
+    def test_disabled_cache_writes_nothing(self, probe):
+        with mock.patch.dict(os.environ, {'KEYFRAME_INDEX_CACHE_ENABLED': '0'}):
+            self.assertEqual(len(KeyframeIndex.for_video(self.video_path, 30.0)), 3)
+        self.assertFalse(os.path.exists(self.cache_dir))
+        self.assertEqual(os.listdir(self.video_dir), ['clip.mp4'])
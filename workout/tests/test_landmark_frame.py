@@ -0,0 +1,75 @@
+from types import SimpleNamespace
+
+import cv2
+import numpy as np
+from django.test import SimpleTestCase
+
+from workout.utilities.PoseModule import LandmarkFrame
+
+
+def _landmarks(rows):
+    """MediaPipe-style normalised landmarks from (x, y, visibility) rows."""
+    return [SimpleNamespace(x=x, y=y, visibility=v) for x, y, v in rows]
+
+
+class LandmarkFrameTests(SimpleTestCase):
+
+    def test_empty_frame_behaves_like_an_empty_list(self):
+        frame = LandmarkFrame()
+        self.assertFalse(frame)
+        self.assertEqual(len(frame), 0)
+        self.assertEqual(frame.tolist(), [])
+        self.assertEqual(list(frame), [])
+        self.assertEqual(np.asarray(frame).shape, (0, 4))
+        with self.assertRaises(IndexError):
+            frame[0]
+
+    def test_fill_truncates_to_pixels_like_the_legacy_list(self):
+        rows = np.random.default_rng(0).random((33, 3))
+        frame = LandmarkFrame()
+        frame.fill(_landmarks(rows), width=1920, height=1080)
+
+        self.assertEqual(len(frame), 33)
+        expected = [[i, int(x * 1920), int(y * 1080)] for i, (x, y, _) in enumerate(rows)]
+        self.assertEqual([row[:3] for row in frame.tolist()], expected)
+        self.assertEqual([row[:3] for row in frame], expected)
+        np.testing.assert_allclose(frame.visibility, rows[:, 2], rtol=1e-6)
+
+    def test_rows_are_int_pixel_lists(self):
+        frame = LandmarkFrame()
+        frame.set_rows(np.full((33, 3), (10.0, 20.0, 0.5)))
+        row = frame[7]
+        self.assertEqual(row, [7, 10, 20, 0.5])
+        self.assertIs(type(row[1]), int)
+        self.assertEqual(frame[-1][0], 32)
+        self.assertEqual(len(frame[11:13]), 2)
+        with self.assertRaises(IndexError):
+            frame[33]
+
+    def test_rows_can_be_drawn_with_opencv(self):
+        frame = LandmarkFrame()
+        frame.set_rows(np.full((33, 3), (10.0, 20.0, 1.0)))
+        img = np.zeros((40, 40, 3), dtype=np.uint8)
+        cv2.circle(img, (frame[0][1], frame[0][2]), 3, (255, 0, 0), cv2.FILLED)
+        cv2.putText(img, 'x', (frame[0][1], frame[0][2]), cv2.FONT_HERSHEY_PLAIN, 1, (0, 255, 0))
+        self.assertTrue(img.any())
+
+    def test_copy_is_detached_from_the_reused_buffer(self):
+        frame = LandmarkFrame()
+        frame.set_rows(np.ones((33, 3)))
+        kept = frame.copy()
+
+        frame.set_rows(np.full((33, 3), 5.0))
+        frame.clear()
+
+        self.assertEqual(kept[0][1], 1)
+        self.assertFalse(frame)
+
+    def test_array_accessors_are_views(self):
+        frame = LandmarkFrame()
+        frame.set_rows(np.zeros((33, 3)))
+        frame.xy[3] = (10, 20)
+        frame.visibility[3] = 0.5
+        self.assertEqual(frame[3], [3, 10, 20, 0.5])
+        self.assertEqual(frame.data.dtype, np.float32)
+        np.testing.assert_array_equal(np.asarray(frame)[3], [3, 10, 20, 0.5])
@@ -0,0 +1,80 @@
+import numpy as np
+from django.test import SimpleTestCase
+
+from workout.utilities.frame_packet import FramePacket
+from workout.utilities.frame_pipeline import FramePipeline
+from workout.utilities.motion_sampler import MotionSampler
+
+_IDLE_FRAMES = 120
+
+
+def _frame(i):
+    """Static scene until _IDLE_FRAMES, then a bar that grows by 10 pixels a frame (the rep)."""
+    img = np.zeros((90, 160, 3), dtype=np.uint8)
+    if i >= _IDLE_FRAMES:
+        img[40:50, 20:21 + i - _IDLE_FRAMES] = 255
+    return img
+
+
+class _Video:
+
+    def __init__(self, frames):
+        self.frames = frames
+        self.reads = 0
+
+    def read(self):
+        if self.reads >= self.frames:
+            return False, None
+        self.reads += 1
+        return True, _frame(self.reads - 1)
+
+
+class _Detector:
+    """Landmark x is the bar's area: 0 while idle, growing once the rep starts."""
+
+    def __init__(self):
+        self._prev = None
+
+    def detect_into(self, packet, frame, frame_size=None):
+        frame.set_rows(np.full((33, 3), np.count_nonzero(packet.gray) / 10, dtype=np.float32))
+        self._prev = frame
+
+    def repeat_into(self, frame):
+        frame.set_rows(self._prev.data[:, 1:])
+        self._prev = frame
+
+
+class MotionSamplerTests(SimpleTestCase):
+
+    def _sampler(self):
+        return MotionSampler(30.0, idle_fps=2.0)
+
+    def test_static_frames_are_skipped_at_the_idle_rate(self):
+        sampler = self._sampler()
+        for _ in range(90):
+            sampler.should_inspect(FramePacket(_frame(0)))
+        self.assertGreater(sampler.skipped, 45)
+        self.assertGreaterEqual(sampler.inspected, 90 // sampler.idle_stride)
+
+    def test_motion_is_inspected_at_once(self):
+        sampler = self._sampler()
+        for _ in range(90):
+            sampler.should_inspect(FramePacket(_frame(0)))
+        moving = FramePacket(_frame(0).copy())
+        moving.image[:, :40] = 255
+        self.assertTrue(sampler.should_inspect(moving))
+        self.assertTrue(sampler.motion)
+
+    def test_rep_after_a_long_idle_stretch_is_seen_from_its_first_frame(self):
+        sampler = self._sampler()
+        # The bar changes too few pixels to count as motion on its first two frames.
+        self.assertLess(np.count_nonzero(_frame(_IDLE_FRAMES + 1)[..., 0]), 0.002 * 90 * 160)
+
+        with FramePipeline(_Video(_IDLE_FRAMES + 30), _Detector(), queue_size=4, sampler=sampler) as frames:
+            areas = [lmList[0][1] for _, lmList in frames]
+
+        self.assertEqual(len(areas), _IDLE_FRAMES + 30)
+        self.assertEqual(next(i for i, area in enumerate(areas) if area), _IDLE_FRAMES)
+        self.assertEqual(areas[_IDLE_FRAMES:], list(range(1, 31)))
+        self.assertGreater(sampler.skipped, _IDLE_FRAMES // 2)
+        self.assertGreater(sampler.backfilled, 0)
@@ -0,0 +1,205 @@
+import json
+import os
+import tempfile
+from types import SimpleNamespace
+from unittest import mock
+
+import numpy as np
+from django.test import SimpleTestCase
+
+import workout.utilities.PoseModule as pm
+from workout.utilities.pose_cache import PoseTrack, PoseTrackCache, PoseTrackSession, TrackRecorder
+
+
+def _track(frames=20, start_frame=0, complete=True, with_ball=False):
+    rng = np.random.default_rng(frames)
+    landmarks = rng.random((frames, 33, 3), dtype=np.float32) * 100
+    landmarks[1] = np.nan  # no pose on this frame
+    ball = None
+    if with_ball:
+        ball = rng.random((frames, 6), dtype=np.float32) * 100
+        ball[2, :5] = np.nan
+    return PoseTrack(
+        landmarks,
+        fps=29.97,
+        frame_size=(1280, 720),
+        settings={'model_complexity': 1, 'roi_tracking': False},
+        start_frame=start_frame,
+        complete=complete,
+        ball=ball,
+        extras={'equipment_checks': [[3, 'light ball']]},
+    )
+
+
+def _size(cache, key):
+    return sum(os.path.getsize(path) for path in cache._paths(key) if os.path.exists(path))
+
+
+def _age(cache, key, seconds):
+    """Backdate every file of ``key`` by ``seconds``, as if it was last used that long ago."""
+    when = os.path.getmtime(os.path.join(cache.root, key + '.json')) - seconds
+    for path in cache._paths(key):
+        if os.path.exists(path):
+            os.utime(path, (when, when))
+
+
+class PoseTrackCacheTests(SimpleTestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.cache = PoseTrackCache(root=self._tmp.name, max_bytes=64 * 1024 * 1024)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_round_trip(self):
+        track = _track(start_frame=90, with_ball=True)
+        self.cache.store('a', track)
+        loaded = self.cache.load('a')
+
+        np.testing.assert_array_equal(loaded.landmarks, track.landmarks)
+        np.testing.assert_array_equal(loaded.ball, track.ball)
+        self.assertEqual(loaded.fps, track.fps)
+        self.assertEqual(loaded.frame_size, (1280, 720))
+        self.assertEqual(loaded.settings, track.settings)
+        self.assertEqual(loaded.start_frame, 90)
+        self.assertEqual(loaded.extras, track.extras)
+        self.assertIsNone(loaded.frame(91))
+        self.assertIsNone(loaded.ball_at(92))
+        self.assertEqual(loaded.frame(95).shape, (33, 3))
+
+    def test_restore_without_ball_drops_the_old_ball_file(self):
+        self.cache.store('a', _track(with_ball=True))
+        self.cache.store('a', _track())
+        self.assertIsNone(self.cache.load('a').ball)
+
+    def test_miss(self):
+        self.assertIsNone(self.cache.load('missing'))
+
+    def test_unreadable_landmarks_are_a_miss_and_removed(self):
+        self.cache.store('a', _track())
+        with open(os.path.join(self.cache.root, 'a.npy'), 'wb') as fh:
+            fh.write(b'not a numpy file')
+        with self.assertLogs('workout.utilities.pose_cache', 'WARNING'):
+            self.assertIsNone(self.cache.load('a'))
+        self.assertFalse(os.path.exists(os.path.join(self.cache.root, 'a.json')))
+
+    def test_bad_metadata_is_a_miss_and_removed(self):
+        truncated = {'frame_size': [640, 480], 'settings': {}}
+        wrong_types = {'fps': 30, 'frame_size': None, 'settings': {}}
+        for meta in (truncated, wrong_types, [1, 2]):
+            self.cache.store('a', _track())
+            with open(os.path.join(self.cache.root, 'a.json'), 'w') as fh:
+                json.dump(meta, fh)
+            with self.assertLogs('workout.utilities.pose_cache', 'WARNING'):
+                self.assertIsNone(self.cache.load('a'), meta)
+            self.assertFalse(os.path.exists(os.path.join(self.cache.root, 'a.npy')), meta)
+
+    def test_eviction_drops_the_least_recently_stored_track(self):
+        self.cache.store('a', _track())
+        _age(self.cache, 'a', 60)
+        self.cache.max_bytes = _size(self.cache, 'a') + 1
+
+        self.cache.store('b', _track())
+
+        self.assertIsNone(self.cache.load('a'))
+        self.assertIsNotNone(self.cache.load('b'))
+
+    def test_load_counts_as_use_for_eviction(self):
+        self.cache.store('a', _track())
+        self.cache.store('b', _track())
+        _age(self.cache, 'a', 120)
+        _age(self.cache, 'b', 60)
+        self.cache.load('a')
+
+        self.cache.max_bytes = _size(self.cache, 'a') + 1
+        self.cache.evict()
+
+        self.assertIsNotNone(self.cache.load('a'))
+        self.assertIsNone(self.cache.load('b'))
+
+
+@mock.patch.dict(os.environ, {'FRAME_SOURCE_BACKEND': 'ffmpeg'})
+@mock.patch('workout.utilities.frame_source.shutil.which', return_value='/usr/bin/ffmpeg')
+class PoseTrackSessionTests(SimpleTestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.cache = PoseTrackCache(root=os.path.join(self._tmp.name, 'cache'))
+        self.video_path = os.path.join(self._tmp.name, 'clip.mp4')
+        with open(self.video_path, 'wb') as fh:
+            fh.write(b'not really a video')
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _key(self, **kwargs):
+        return PoseTrackSession(self.video_path, cache=self.cache, **kwargs).key
+
+    def test_key_covers_the_decode_settings(self, _which):
+        full_bgr = self._key()
+        self.assertNotEqual(self._key(pose_only=True), full_bgr)
+        with mock.patch.dict(os.environ, {'POSE_MAX_INFERENCE_SIDE': '640'}):
+            self.assertNotEqual(self._key(pose_only=True), self._key())
+        with mock.patch.dict(os.environ, {'ANALYSIS_TARGET_FPS': '30'}):
+            self.assertNotEqual(self._key(), full_bgr)
+        with mock.patch.dict(os.environ, {'FRAME_SOURCE_BACKEND': 'opencv'}):
+            opencv = self._key()
+            # OpenCV decodes BGR at full size whatever is asked for.
+            self.assertEqual(self._key(pose_only=True), opencv)
+        self.assertNotEqual(opencv, full_bgr)
+
+    def test_pose_only_session_decodes_rgb_at_inference_size(self, _which):
+        with mock.patch.dict(os.environ, {'POSE_MAX_INFERENCE_SIDE': '640'}):
+            decode = PoseTrackSession(self.video_path, cache=self.cache, pose_only=True).decode
+        self.assertEqual((decode['color'], decode['max_side']), ('rgb', 640))
+
+    def _recorded_session(self, frames=5):
+        session = PoseTrackSession(self.video_path, cache=self.cache)
+        recorder = TrackRecorder()
+        frame = pm.LandmarkFrame()
+        frame.set_rows(np.zeros((33, 3)))
+        for _ in range(frames):
+            recorder.append(frame)
+        session.detector = SimpleNamespace(recorder=recorder)
+        return session
+
+    def test_finish_stores_complete_tracks(self, _which):
+        session = self._recorded_session()
+        session.finish(30.0, (640, 480))
+        self.assertEqual(len(self.cache.load(session.key)), 5)
+
+    def test_finish_skips_incomplete_tracks(self, _which):
+        session = self._recorded_session()
+        session.finish(30.0, (640, 480), complete=False, frames=3)
+        self.assertIsNone(self.cache.load(session.key))
+        self.assertIsNone(session.detector.recorder)
+
+
+class TrackRecorderTests(SimpleTestCase):
+
+    def test_records_missing_poses_as_nan_and_grows(self):
+        recorder = TrackRecorder(start_frame=5, capacity=2)
+        frame = pm.LandmarkFrame()
+        for i in range(5):
+            if i == 2:
+                frame.clear()
+            else:
+                frame.set_rows(np.full((33, 3), i, dtype=np.float32))
+            recorder.append(frame)
+
+        track = recorder.to_track(30.0, (640, 480), {})
+        self.assertEqual(len(track), 5)
+        self.assertEqual(track.start_frame, 5)
+        np.testing.assert_array_equal(track.present, [True, True, False, True, True])
+        self.assertEqual(track.frame(9)[0, 0], 4)
+
+    def test_to_track_truncates_to_the_frames_consumed(self):
+        recorder = TrackRecorder()
+        frame = pm.LandmarkFrame()
+        frame.set_rows(np.zeros((33, 3)))
+        for _ in range(10):
+            recorder.append(frame)
+
+        self.assertEqual(len(recorder.to_track(30.0, (640, 480), {}, frames=7)), 7)
+        self.assertEqual(len(recorder.to_track(30.0, (640, 480), {}, frames=50)), 10)
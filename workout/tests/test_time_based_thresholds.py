@@ -0,0 +1,50 @@
+from unittest import mock
+
+import cv2
+from django.test import SimpleTestCase
+
+from workout.utilities.barbell import barbell_analyser
+from workout.utilities.movement_counters import seconds_to_frames
+
+
+class SecondsToFramesTests(SimpleTestCase):
+
+    def test_scales_with_fps(self):
+        self.assertEqual(seconds_to_frames(1 / 3, 30), 10)
+        self.assertEqual(seconds_to_frames(1 / 3, 60), 20)
+        self.assertEqual(seconds_to_frames(4, 25), 100)
+        self.assertEqual(seconds_to_frames(2, 29.97), 60)
+
+    def test_at_least_one_frame(self):
+        self.assertEqual(seconds_to_frames(0.001, 30), 1)
+        self.assertEqual(seconds_to_frames(0, 30), 1)
+
+    def test_unknown_fps_uses_the_reference_rate(self):
+        self.assertEqual(seconds_to_frames(1, 0), 30)
+        self.assertEqual(seconds_to_frames(1, -1), 30)
+
+
+class _Source:
+
+    def __init__(self, fps):
+        self.fps = fps
+
+    def get(self, prop):
+        return self.fps if prop == cv2.CAP_PROP_FPS else 0
+
+
+@mock.patch.object(barbell_analyser, 'get_model_registry')
+@mock.patch.object(barbell_analyser, 'PoseTrackSession')
+class BarbellVisionCooldownTests(SimpleTestCase):
+
+    def _analyser(self, fps, **kwargs):
+        with mock.patch.object(barbell_analyser, 'open_frame_source', return_value=_Source(fps)):
+            return barbell_analyser.BarbellAnalyser('clip.mp4', 'snatch', None, {}, **kwargs)
+
+    def test_cooldown_is_given_in_seconds(self, _session, _registry):
+        self.assertEqual(self._analyser(60, vision_cooldown_seconds=0.5)._vision_cooldown_frames, 30)
+
+    def test_deprecated_frame_cooldown_is_read_at_the_reference_rate(self, _session, _registry):
+        with self.assertWarns(DeprecationWarning):
+            analyser = self._analyser(60, vision_cooldown_frames=15)
+        self.assertEqual(analyser._vision_cooldown_frames, 30)
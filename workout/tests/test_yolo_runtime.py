@@ -0,0 +1,82 @@
+import numpy as np
+from django.test import SimpleTestCase
+
+from workout.utilities.wall_ball import yolo_runtime
+
+
+def _raw_output(boxes, classes=2):
+    """Model output (4 + classes, anchors) for ``(cx, cy, w, h, conf, cls)`` boxes in input pixels."""
+    output = np.zeros((4 + classes, len(boxes)), dtype=np.float32)
+    for i, (cx, cy, w, h, conf, cls) in enumerate(boxes):
+        output[:4, i] = cx, cy, w, h
+        output[4 + cls, i] = conf
+    return output
+
+
+class YoloPostprocessTests(SimpleTestCase):
+
+    def test_letterbox_pads_to_a_square(self):
+        frame = np.zeros((720, 1280, 3), dtype=np.uint8)
+        tensor, (gain, pad_x, pad_y) = yolo_runtime._letterbox(frame, 640)
+        self.assertEqual(tensor.shape, (3, 640, 640))
+        self.assertEqual(tensor.dtype, np.float32)
+        self.assertEqual((gain, pad_x, pad_y), (0.5, 0, 140))
+        self.assertAlmostEqual(float(tensor[0, 0, 0]), 114 / 255, places=6)
+        self.assertEqual(float(tensor[0, 320, 320]), 0.0)
+
+    def test_boxes_map_back_to_image_pixels(self):
+        frame = np.zeros((720, 1280, 3), dtype=np.uint8)
+        _, letterbox = yolo_runtime._letterbox(frame, 640)
+        # A 100x50 box centred on (600, 300) in the image: scaled by 0.5, shifted down by 140.
+        output = _raw_output([(300, 290, 50, 25, 0.8, 1)])
+        detections = yolo_runtime._postprocess(output, frame.shape[:2], letterbox)
+        np.testing.assert_allclose(detections, [[550, 275, 650, 325, 0.8, 1]], rtol=1e-6)
+
+    def test_boxes_are_clipped_to_the_image(self):
+        output = _raw_output([(10, 150, 40, 40, 0.9, 0)])
+        detections = yolo_runtime._postprocess(output, (360, 640), (1.0, 0, 140))
+        np.testing.assert_allclose(detections[0, :4], [0, 0, 30, 30])
+
+    def test_low_confidence_gives_no_detections(self):
+        output = _raw_output([(100, 100, 20, 20, 0.1, 0)])
+        detections = yolo_runtime._postprocess(output, (640, 640), (1.0, 0, 0))
+        self.assertEqual(detections.shape, (0, 6))
+
+    def test_nms_is_per_class(self):
+        output = _raw_output([
+            (100, 100, 40, 40, 0.9, 0),
+            (102, 100, 40, 40, 0.8, 0),   # overlaps the first, same class: suppressed
+            (100, 102, 40, 40, 0.7, 1),   # overlaps the first, other class: kept
+        ])
+        detections = yolo_runtime._postprocess(output, (640, 640), (1.0, 0, 0))
+        np.testing.assert_allclose(detections[:, 4], [0.9, 0.7], rtol=1e-6)
+        np.testing.assert_array_equal(detections[:, 5], [0, 1])
+
+    def test_detections_are_capped_after_nms(self):
+        n = 500
+        boxes = [(10 + 20 * i, 10, 8, 8, 0.3 + 0.6 * i / n, 0) for i in range(n)]
+        detections = yolo_runtime._postprocess(_raw_output(boxes), (640, 20 * n), (1.0, 0, 0))
+        self.assertEqual(len(detections), yolo_runtime._MAX_DET)
+        self.assertTrue(np.all(np.diff(detections[:, 4]) <= 0))
+        self.assertAlmostEqual(float(detections[-1, 4]), boxes[n - yolo_runtime._MAX_DET][4], places=5)
+
+    def test_exported_model_runs_in_chunks_of_its_batch_size(self):
+        class FixedBatchYolo(yolo_runtime.ExportedYolo):
+            max_batch = 2
+
+            def __init__(self):
+                self.batches = []
+
+            def _infer(self, batch):
+                self.batches.append(batch.shape)
+                return np.stack([_raw_output([(320, 320, 64, 64, 0.9, 0)])] * len(batch))
+
+        model = FixedBatchYolo()
+        detections = model([np.zeros((640, 640, 3), dtype=np.uint8)] * 5)
+        self.assertEqual(model.batches, [(2, 3, 640, 640), (2, 3, 640, 640), (1, 3, 640, 640)])
+        self.assertEqual(len(detections), 5)
+        np.testing.assert_allclose(detections[4][0, :4], [288, 288, 352, 352])
+
+    def test_exported_model_needs_an_inference_backend(self):
+        with self.assertRaises(TypeError):
+            yolo_runtime.ExportedYolo()
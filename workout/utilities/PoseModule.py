@@ -7,6 +7,116 @@ import queue
 
 import numpy as np
 
+from workout.utilities.frame_packet import FramePacket
+
+
+# Named (p1, p2, p3) landmark triplets; the angle is measured at p2.
+JOINT_TRIPLETS = {
+    'left_hip_knee_ankle': (23, 25, 27),
+    'right_hip_knee_ankle': (24, 26, 28),
+    'left_shoulder_elbow_wrist': (11, 13, 15),
+    'right_shoulder_elbow_wrist': (12, 14, 16),
+    'left_shoulder_hip_ankle': (11, 23, 27),
+    'right_shoulder_hip_ankle': (12, 24, 28),
+}
+
+
+# Decimal places angles are rounded to.  libm's acos and NumPy's SIMD arccos can
+# differ in the last bit; rounding both paths the same way makes them agree.
+_ANGLE_DECIMALS = 6
+
+
+def batch_angles(landmarks, triplets=None) -> dict:
+    """
+    Compute joint-angle series for every frame of a video in one NumPy pass.
+
+    Same maths as ``PoseDetector.getAngle`` (degrees, 0 for a zero-length limb),
+    but vectorised over frames and joints.
+
+    Args:
+        landmarks: (N, 33, 2) array of pixel x/y coordinates.
+        triplets:  dict of name -> (p1, p2, p3); defaults to JOINT_TRIPLETS.
+
+    Returns:
+        dict of name -> (N,) float64 array of angles.
+    """
+    if triplets is None:
+        triplets = JOINT_TRIPLETS
+    xy = np.asarray(landmarks, dtype=np.float64)
+    if xy.ndim != 3 or xy.shape[1:] != (33, 2):
+        raise ValueError(f"Expected landmarks of shape (N, 33, 2), got {xy.shape}")
+
+    names = list(triplets)
+    idx = np.array([triplets[name] for name in names], dtype=np.intp)  # (J, 3)
+
+    a = xy[:, idx[:, 0]]  # (N, J, 2)
+    b = xy[:, idx[:, 1]]
+    c = xy[:, idx[:, 2]]
+    v1 = a - b
+    v2 = c - b
+
+    # Spelled out like getAngle's scalar maths so replayed angles match it exactly.
+    dot = v1[..., 0] * v2[..., 0] + v1[..., 1] * v2[..., 1]
+    mags = np.sqrt(v1[..., 0] ** 2 + v1[..., 1] ** 2) * np.sqrt(v2[..., 0] ** 2 + v2[..., 1] ** 2)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        cosine = np.clip(dot / mags, -1.0, 1.0)
+    cosine[mags == 0] = 1.0
+    angles = np.round(np.degrees(np.arccos(cosine)), _ANGLE_DECIMALS)
+    angles[mags == 0] = 0.0
+
+    return {name: angles[:, j] for j, name in enumerate(names)}
+
+
+def visible_side_series(left, right, visibility, left_idx: int = 23, right_idx: int = 24):
+    """
+    Pick the left or right angle series per frame, mirroring getLandmarkIndices.
+
+    Args:
+        left, right: (N,) angle series for each side.
+        visibility:  (N, 33) landmark visibility scores.
+        left_idx, right_idx: landmarks compared to choose the side (hips by default).
+    """
+    visibility = np.asarray(visibility)
+    use_left = visibility[:, left_idx] > visibility[:, right_idx]
+    return np.where(use_left, left, right)
+
+
+def direction_from_angle(angle, descending_threshold, ascending_threshold, previous_angle, downward_movement=None):
+    """
+    Module-level form of ``PoseDetector.checkDirectionFromAngle``.
+
+    Needs no detector instance, so threshold sweeps can replay angle series
+    without building a MediaPipe graph.
+
+    Returns:
+        1 if ascending, 0 if descending, or None if the direction is not determined.
+    """
+    buffer_zone = 5
+    if downward_movement:
+        if angle > ascending_threshold - buffer_zone:
+            return 1  # Ascending
+        elif angle < descending_threshold + buffer_zone:
+            return 0  # Descending
+        # Check the trend when in the buffer zone
+        if previous_angle is not None:
+            if angle > previous_angle:
+                return 1  # Ascending
+            elif angle < previous_angle:
+                return 0  # Descending
+        return None  # Direction not determined
+
+    if angle < ascending_threshold - buffer_zone:
+        return 1  # Ascending
+    elif angle > descending_threshold + buffer_zone:
+        return 0  # Descending
+    # Check the trend when in the buffer zone
+    if previous_angle is not None:
+        if angle < previous_angle:
+            return 1  # Ascending
+        elif angle > previous_angle:
+            return 0  # Descending
+    return None  # Direction not determined
+
 
 class PoseProcessor:
     def __init__(self, detector):
@@ -213,6 +323,112 @@ class PoseProcessor:
         self.processing_thread.join()
 
 
+class LandmarkFrame:
+    """
+    Landmarks for a single frame, backed by a preallocated (33, 4) float32 array.
+
+    Indexing and iteration give the legacy ``[id, cx, cy, visibility]`` lists
+    with integer pixel coordinates, so existing code that passes ``lmList[i][1]``
+    to OpenCV or compares it with ints keeps working.  Vectorised code reads
+    the float array itself through ``data`` (or ``xy`` / ``visibility`` /
+    ``np.asarray()``).  PoseDetector reuses one instance across frames — call
+    ``copy()`` (or ``tolist()``) if the landmarks must outlive the current frame.
+    """
+
+    NUM_LANDMARKS = 33
+
+    def __init__(self):
+        self.data = np.zeros((self.NUM_LANDMARKS, 4), dtype=np.float32)
+        self.data[:, 0] = np.arange(self.NUM_LANDMARKS)
+        self.valid = False
+        # Float64 scratch space so pixel truncation matches int(lm.x * w) exactly.
+        self._scratch = np.zeros((self.NUM_LANDMARKS, 3), dtype=np.float64)
+
+    def fill(self, landmarks, width: int, height: int) -> None:
+        """Copy MediaPipe normalised landmarks into the buffer as pixel coordinates."""
+        scratch = self._scratch
+        for i, lm in enumerate(landmarks):
+            scratch[i, 0] = lm.x
+            scratch[i, 1] = lm.y
+            scratch[i, 2] = lm.visibility
+        scratch[:, 0] *= width
+        scratch[:, 1] *= height
+        np.trunc(scratch[:, :2], out=scratch[:, :2])
+        self.data[:, 1:] = scratch
+        self.valid = True
+
+    def set_rows(self, rows) -> None:
+        """Load a (33, 3) array of ``[cx, cy, visibility]`` rows (e.g. from a cached track)."""
+        self.data[:, 1:] = rows
+        self.valid = True
+
+    def clear(self) -> None:
+        self.valid = False
+
+    def copy(self) -> 'LandmarkFrame':
+        """Detached copy that is safe to keep after the detector moves on."""
+        frame = LandmarkFrame()
+        frame.data[:] = self.data
+        frame.valid = self.valid
+        return frame
+
+    def tolist(self) -> list:
+        """Legacy ``[[id, cx, cy, visibility], ...]`` list with integer pixel coordinates."""
+        if not self.valid:
+            return []
+        return [self._row(i) for i in range(self.NUM_LANDMARKS)]
+
+    @property
+    def xy(self) -> np.ndarray:
+        """(33, 2) view of the pixel coordinates."""
+        return self.data[:, 1:3]
+
+    @property
+    def visibility(self) -> np.ndarray:
+        """(33,) view of the visibility scores."""
+        return self.data[:, 3]
+
+    def __array__(self, dtype=None, copy=None):
+        data = self.data if self.valid else self.data[:0]
+        return data if dtype is None else data.astype(dtype, copy=False)
+
+    def __len__(self):
+        return self.NUM_LANDMARKS if self.valid else 0
+
+    def __bool__(self):
+        return self.valid
+
+    def __getitem__(self, idx):
+        if not self.valid:
+            raise IndexError("LandmarkFrame is empty (no pose detected)")
+        if isinstance(idx, slice):
+            return [self._row(i) for i in range(self.NUM_LANDMARKS)[idx]]
+        if not -self.NUM_LANDMARKS <= idx < self.NUM_LANDMARKS:
+            raise IndexError("landmark index out of range")
+        return self._row(idx % self.NUM_LANDMARKS)
+
+    def __iter__(self):
+        if self.valid:
+            for i in range(self.NUM_LANDMARKS):
+                yield self._row(i)
+
+    def _row(self, i: int) -> list:
+        _, cx, cy, vis = self.data[i].tolist()
+        return [i, int(cx), int(cy), vis]
+
+    def __repr__(self):
+        return f"LandmarkFrame({self.tolist()})"
+
+
+# Athlete-ROI tracking: padding around the previous frame's landmark box (fraction
+# of its longer side), the visibility needed to trust a crop's result, and the
+# frame fraction above which cropping is not worth it.
+_ROI_PADDING = 0.35
+_ROI_MIN_VISIBILITY = 0.5
+_ROI_MAX_AREA_FRACTION = 0.8
+_ROI_CORE_LANDMARKS = [11, 12, 23, 24]  # shoulders and hips
+
+
 class PoseDetector:
 
     def __init__(self, mode=False, model_complexity=1,
@@ -220,7 +436,21 @@ class PoseDetector:
                  enable_segmentation=False,
                  smooth_segmentation=True,
                  detectionConfidence=0.5,
-                 trackingConfidence=0.5):
+                 trackingConfidence=0.5,
+                 max_inference_side=None,
+                 roi_tracking=False):
+        """
+        Args:
+            max_inference_side: If set, frames whose longer side exceeds this many
+                pixels are downscaled before colour conversion and inference.
+                Landmarks are normalised, so getPosition() still returns them in
+                the original frame's pixel coordinates.
+            roi_tracking: Run inference on a padded crop around the previous
+                frame's landmarks instead of the whole frame, going back to
+                full frames after a crop loses the athlete.  Crops run on a
+                separate static-image graph.  Ignored when enable_segmentation
+                is set (the mask would be crop-sized).
+        """
 
         self.mode = mode
         self.model_complexity = model_complexity
@@ -229,6 +459,16 @@ class PoseDetector:
         self.smooth_segmentation = smooth_segmentation
         self.detectionConfidence = detectionConfidence
         self.trackingConfidence = trackingConfidence
+        self.max_inference_side = max_inference_side
+        self.roi_tracking = roi_tracking and not enable_segmentation
+        # (x1, y1, x2, y2) crop the current results were computed on, or None for the full frame.
+        self.roi = None
+        # The last crop lost the athlete, so the next frame runs on the full frame.
+        self._roi_lost = False
+        # Static-image graph for ROI crops, created on first use.
+        self._crop_pose = None
+        # Previous frame written by detect_into(); seeds ROI tracking in pipelined mode.
+        self._pipeline_prev = None
 
         self.mpPose = mp.solutions.pose
         self.mpDraw = mp.solutions.drawing_utils
@@ -237,9 +477,189 @@ class PoseDetector:
                                      self.smooth_segmentation, self.detectionConfidence,
                                      self.trackingConfidence)
 
-    def getPose(self, img, draw=True):
-        imgRGB = cv2.cvtColor(img, cv2.COLOR_BGRA2RGB)
-        self.results = self.pose.process(imgRGB)
+        self.results = None
+        self._landmark_frame = LandmarkFrame()
+        self.lmList = self._landmark_frame
+        # Optional sink that receives every frame's landmarks (see pose_cache.TrackRecorder).
+        self.recorder = None
+
+    def get_settings(self) -> dict:
+        """MediaPipe model settings — part of the pose-track cache key."""
+        return {
+            'mode': self.mode,
+            'model_complexity': self.model_complexity,
+            'smooth_landmarks': self.smooth_landmarks,
+            'enable_segmentation': self.enable_segmentation,
+            'smooth_segmentation': self.smooth_segmentation,
+            'detectionConfidence': self.detectionConfidence,
+            'trackingConfidence': self.trackingConfidence,
+            'max_inference_side': self.max_inference_side,
+            'roi_tracking': self.roi_tracking,
+        }
+
+    def seek(self, frame_no: int) -> None:
+        """Tell the detector the next frame is ``frame_no``. Only replay detectors need this."""
+
+    def reset(self) -> None:
+        """Forget all per-video state so the MediaPipe graph can be reused for another video."""
+        self.pose.reset()
+        self.results = None
+        self._landmark_frame.clear()
+        self.lmList = self._landmark_frame
+        self.recorder = None
+        self.roi = None
+        self._roi_lost = False
+        self._pipeline_prev = None
+
+    def _inference_image(self, img):
+        """``img`` downscaled (aspect preserved) so its longer side fits max_inference_side."""
+        if not self.max_inference_side:
+            return img
+        h, w = img.shape[:2]
+        longest = max(h, w)
+        if longest <= self.max_inference_side:
+            return img
+        scale = self.max_inference_side / longest
+        size = (max(1, round(w * scale)), max(1, round(h * scale)))
+        return cv2.resize(img, size, interpolation=cv2.INTER_AREA)
+
+    def _process(self, img, rgb=False, pose=None):
+        pose = pose or self.pose
+        if isinstance(img, FramePacket):
+            # Shared per-frame views: the scaled RGB copy is computed once per frame.
+            return pose.process(img.scaled(self.max_inference_side).rgb)
+        img = self._inference_image(img)
+        # Frame sources that already decode to RGB (frame_source.FFmpegFrameSource) skip the conversion.
+        imgRGB = img if rgb else cv2.cvtColor(img, cv2.COLOR_BGRA2RGB)
+        return pose.process(imgRGB)
+
+    def _crop_graph(self):
+        """
+        Static-image MediaPipe graph for ROI crops.
+
+        A crop moves every frame, so the video-mode graph's landmark smoothing
+        and its own ROI tracking would mix coordinate spaces from frame to frame.
+        """
+        if self._crop_pose is None:
+            self._crop_pose = self.mpPose.Pose(
+                static_image_mode=True,
+                model_complexity=self.model_complexity,
+                smooth_landmarks=False,
+                enable_segmentation=False,
+                min_detection_confidence=self.detectionConfidence,
+            )
+        return self._crop_pose
+
+    def _next_roi(self, img, frame, frame_size=None):
+        """Padded athlete box around ``frame``'s landmarks, or None to use the full frame."""
+        if not frame:
+            return None
+        visible = frame.visibility >= _ROI_MIN_VISIBILITY
+        if visible.sum() < 4:
+            return None
+
+        h, w = img.shape[:2]
+        pts = frame.xy[visible]
+        if frame_size is not None and frame_size != (w, h):
+            # Landmarks are in source pixels; the crop is taken from a downscaled decode.
+            pts = pts * (w / frame_size[0], h / frame_size[1])
+        x1, y1 = pts.min(axis=0)
+        x2, y2 = pts.max(axis=0)
+        pad = max(x2 - x1, y2 - y1) * _ROI_PADDING
+        x1, y1 = max(0, int(x1 - pad)), max(0, int(y1 - pad))
+        x2, y2 = min(w, int(x2 + pad)), min(h, int(y2 + pad))
+        if x2 - x1 < 32 or y2 - y1 < 32 or (x2 - x1) * (y2 - y1) > _ROI_MAX_AREA_FRACTION * w * h:
+            return None
+        return x1, y1, x2, y2
+
+    def _roi_confident(self, results) -> bool:
+        if not results.pose_landmarks:
+            return False
+        landmarks = results.pose_landmarks.landmark
+        core = [landmarks[i].visibility for i in _ROI_CORE_LANDMARKS]
+        return sum(core) / len(core) >= _ROI_MIN_VISIBILITY
+
+    @staticmethod
+    def _remap_from_roi(results, roi, width, height) -> None:
+        """Rewrite crop-normalised landmarks in place as full-frame normalised coordinates."""
+        x1, y1, x2, y2 = roi
+        sx, sy = (x2 - x1) / width, (y2 - y1) / height
+        ox, oy = x1 / width, y1 / height
+        for lm in results.pose_landmarks.landmark:
+            lm.x = ox + lm.x * sx
+            lm.y = oy + lm.y * sy
+            lm.z = lm.z * sx  # z shares the x scale in MediaPipe
+
+    def _detect(self, img, previous, rgb=False, frame_size=None):
+        """
+        Run MediaPipe on ``img`` (or an ROI around ``previous``) and return the results.
+
+        Each frame gets exactly one inference.  Crops go through _crop_graph();
+        the video-mode graph only ever sees full frames and is reset when it
+        resumes after a run of crops, so its smoothing never spans a gap.
+        """
+        roi = None
+        if self.roi_tracking and not self._roi_lost:
+            roi = self._next_roi(img, previous, frame_size)
+        if roi is not None:
+            x1, y1, x2, y2 = roi
+            crop = img.region(y1, y2, x1, x2) if isinstance(img, FramePacket) else img[y1:y2, x1:x2]
+            results = self._process(crop, rgb, pose=self._crop_graph())
+            if results.pose_landmarks:
+                h, w = img.shape[:2]
+                self._remap_from_roi(results, roi, w, h)
+            # Tracking lost (athlete left the crop or low confidence) — the next frame runs full size.
+            self._roi_lost = not self._roi_confident(results)
+        else:
+            if self.roi is not None:
+                self.pose.reset()
+            self._roi_lost = False
+            results = self._process(img, rgb)
+        self.roi = roi
+        return results
+
+    def detect_into(self, img, frame, rgb=False, frame_size=None):
+        """
+        getPose() + getPosition() for pipelined use (see frame_pipeline.FramePipeline).
+
+        Writes the landmarks into the caller-owned LandmarkFrame ``frame`` and leaves
+        ``self.results`` / ``self.lmList`` alone, so another thread can keep using
+        them for the frame it is counting.  Drawing is not supported.
+
+        Args:
+            img:        BGR/RGB ndarray or a frame_packet.FramePacket.
+            rgb:        ``img`` is an RGB ndarray (skip the colour conversion).
+            frame_size: (width, height) to express landmarks in when ``img`` was
+                        decoded at a reduced size; defaults to ``img``'s own size.
+        """
+        results = self._detect(img, self._pipeline_prev, rgb, frame_size)
+        frame.clear()
+        if results.pose_landmarks:
+            w, h = frame_size or (img.shape[1], img.shape[0])
+            frame.fill(results.pose_landmarks.landmark, w, h)
+        self._pipeline_prev = frame
+        if self.recorder is not None:
+            self.recorder.append(frame)
+        return frame
+
+    def repeat_into(self, frame):
+        """
+        detect_into() without inference: ``frame`` repeats the previous frame's landmarks.
+
+        Used for frames motion_sampler.MotionSampler judged static; the recorder
+        still gets one entry per frame.
+        """
+        previous = self._pipeline_prev
+        frame.clear()
+        if previous:
+            frame.set_rows(previous.data[:, 1:])
+        self._pipeline_prev = frame
+        if self.recorder is not None:
+            self.recorder.append(frame)
+        return frame
+
+    def getPose(self, img, draw=True, rgb=False):
+        self.results = self._detect(img, self._landmark_frame, rgb)
         # print(results.pose_landmarks)
 
         if self.results.pose_landmarks and draw:
@@ -248,23 +668,28 @@ class PoseDetector:
         return img
 
     def getPosition(self, img, draw=True):
-        self.lmList = []
+        """
+        Return this frame's landmarks as a LandmarkFrame (list-compatible).
+
+        The returned object is reused on the next call, so copy it if needed later.
+        """
+        self.lmList = self._landmark_frame
+        self.lmList.clear()
         if self.results.pose_landmarks:
-            for id, lm in enumerate(self.results.pose_landmarks.landmark):
-                h, w, c = img.shape
-                cx, cy = int(lm.x * w), int(lm.y * h)
-                cz = lm.z  # Depth value
-                visibility = lm.visibility
-                self.lmList.append([id, cx, cy, visibility])
-                if draw:
-                    cv2.circle(img, (cx, cy), 3, (255, 0, 0), cv2.FILLED)
+            h, w = img.shape[:2]
+            self.lmList.fill(self.results.pose_landmarks.landmark, w, h)
+            if draw:
+                for _, cx, cy, _ in self.lmList:
+                    cv2.circle(img, (int(cx), int(cy)), 3, (255, 0, 0), cv2.FILLED)
+        if self.recorder is not None:
+            self.recorder.append(self.lmList)
         return self.lmList
 
     def getAngle(self, img, p1, p2, p3, draw=True):
         # Get the points
-        x1, y1 = self.lmList[p1][1], self.lmList[p1][2]
-        x2, y2 = self.lmList[p2][1], self.lmList[p2][2]
-        x3, y3 = self.lmList[p3][1], self.lmList[p3][2]
+        x1, y1 = int(self.lmList[p1][1]), int(self.lmList[p1][2])
+        x2, y2 = int(self.lmList[p2][1]), int(self.lmList[p2][2])
+        x3, y3 = int(self.lmList[p3][1]), int(self.lmList[p3][2])
 
         # Calculate vectors
         v1 = (x1 - x2, y1 - y2)
@@ -282,7 +707,7 @@ class PoseDetector:
         cosine_angle = max(min(dot / (mag1 * mag2), 1), -1)
 
         # Calculate the angle in radians and then convert to degrees
-        angle = math.degrees(math.acos(cosine_angle))
+        angle = float(np.round(math.degrees(math.acos(cosine_angle)), _ANGLE_DECIMALS))
 
         if draw:
             # draws white line from points for visibility
@@ -327,35 +752,9 @@ class PoseDetector:
                 Returns:
                 string: '1' if ascending, '0' if descending, or None if the direction is not determined.
                 """
-        buffer_zone = 5
-        if downward_movement:
-            if angle > ascending_threshold - buffer_zone:
-                return 1  # Ascending
-            elif angle < descending_threshold + buffer_zone:
-                return 0  # Descending
-            else:
-                # Check the trend when in the buffer zone
-                if previous_angle is not None:
-                    if angle > previous_angle:
-                        return 1  # Ascending
-                    elif angle < previous_angle:
-                        return 0  # Descending
-
-                return None  # Direction not determined
-        else:
-            if angle < ascending_threshold - buffer_zone:
-                return 1  # Ascending
-            elif angle > descending_threshold + buffer_zone:
-                return 0  # Descending
-            else:
-                # Check the trend when in the buffer zone
-                if previous_angle is not None:
-                    if angle < previous_angle:
-                        return 1  # Ascending
-                    elif angle > previous_angle:
-                        return 0  # Descending
-
-                return None  # Direction not determined
+        return direction_from_angle(
+            angle, descending_threshold, ascending_threshold, previous_angle, downward_movement,
+        )
 
     def getLandmarkIndices(self, lmList, is_squat=False, is_arm_extension=False, is_burpee=False):
         """
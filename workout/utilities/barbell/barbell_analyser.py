@@ -11,13 +11,19 @@ Flow per frame
 5. counter.process(angle, lmList, detector, direction) — every frame.
 """
 import logging
+import warnings
 
 import cv2
 
-import workout.utilities.PoseModule as pm
-from vision.vision_client import VisionClient
 from workout.utilities.barbell.barbell_counters import CleanAndJerkCounter, SnatchCounter
-from workout.utilities.utils import download_youtube_video, load_movement_criteria
+from workout.utilities.frame_packet import FramePacket
+from workout.utilities.frame_pipeline import FramePipeline
+from workout.utilities.frame_source import open_frame_source
+from workout.utilities.model_registry import get_model_registry
+from workout.utilities.movement_counters import REFERENCE_FPS, seconds_to_frames
+from workout.utilities.pose_cache import PoseTrackSession
+from workout.utilities.utils import analysis_stop_reason, analysis_stopped_entry, load_movement_criteria
+from workout.utilities.video_cache import open_video
 
 logger = logging.getLogger(__name__)
 
@@ -39,6 +45,9 @@ _VISION_PROMPTS = {
     ),
 }
 
+# Shortened vision cooldown after a confirmed phase change (5 frames at 30 fps).
+_VISION_RECHECK_SECONDS = 5 / 30
+
 _MOVEMENT_COUNTERS = {
     'clean_and_jerk':      (CleanAndJerkCounter, False),
     'hang_clean_and_jerk': (CleanAndJerkCounter, True),
@@ -57,7 +66,13 @@ class BarbellAnalyser:
                        'snatch', 'hang_snatch'.
         expected_reps: Target rep count (or None).
         criteria:      Full movement_analysis_criteria dict.
-        vision_cooldown_frames: Minimum frames between vision model calls.
+        vision_cooldown_seconds: Minimum video time between vision model calls.
+        time_cap:      Workout.time_cap in seconds from the start of the video;
+                       analysis stops once it has elapsed.
+        stop_at_expected_reps: Stop once ``expected_reps`` good reps are counted
+                       (For Time workouts).
+        vision_cooldown_frames: Deprecated; the cooldown in frames at 30 fps.  Use
+                       ``vision_cooldown_seconds`` instead.
     """
 
     def __init__(
@@ -66,7 +81,11 @@ class BarbellAnalyser:
         movement_type: str,
         expected_reps: int | None,
         criteria: dict,
-        vision_cooldown_frames: int = 30,
+        vision_cooldown_seconds: float = 1.0,
+        time_cap: int | None = None,
+        stop_at_expected_reps: bool = False,
+        *,
+        vision_cooldown_frames: int | None = None,
     ):
         if movement_type not in _MOVEMENT_COUNTERS:
             raise ValueError(f"Unknown movement type: {movement_type!r}. "
@@ -75,20 +94,37 @@ class BarbellAnalyser:
         self.video_path = video_path
         self.movement_type = movement_type
         self.expected_reps = expected_reps
-        self._vision_cooldown_frames = vision_cooldown_frames
+        self.time_cap = time_cap
+        self.stop_at_expected_reps = stop_at_expected_reps
+        # Why analysis stopped before the end of the video, if it did.
+        self.stop_reason: str | None = None
 
         counter_cls, hang = _MOVEMENT_COUNTERS[movement_type]
         movement_criteria = criteria.get(movement_type, {})
         self.counter = counter_cls(movement_criteria, hang=hang)
 
-        self.video = cv2.VideoCapture(video_path)
+        if vision_cooldown_frames is not None:
+            warnings.warn(
+                "vision_cooldown_frames is deprecated; pass vision_cooldown_seconds instead",
+                DeprecationWarning,
+                stacklevel=2,
+            )
+            vision_cooldown_seconds = vision_cooldown_frames / REFERENCE_FPS
+
+        self.video = open_frame_source(video_path)
         fps = self.video.get(cv2.CAP_PROP_FPS)
-        self.counter.set_fps(fps if fps > 0 else 30.0)
+        fps = fps if fps > 0 else 30.0
+        self._fps = fps
+        self.counter.set_fps(fps)
+        self._vision_cooldown_frames = seconds_to_frames(vision_cooldown_seconds, fps)
+        # After a phase change the next check may come this soon (see _maybe_call_vision).
+        self._vision_recheck_frames = seconds_to_frames(_VISION_RECHECK_SECONDS, fps)
 
-        self.pose_detector = pm.PoseDetector()
-        self.vision_client = VisionClient()
+        self._pose_session = PoseTrackSession(video_path)
+        self.pose_detector = self._pose_session.begin()
+        self.vision_client = get_model_registry().vision_client()
 
-        self._last_vision_frame = -vision_cooldown_frames
+        self._last_vision_frame = -self._vision_cooldown_frames
 
     # ------------------------------------------------------------------
     # Public API
@@ -106,25 +142,30 @@ class BarbellAnalyser:
             raise RuntimeError(f"Could not open video: {self.video_path}")
 
         frame_idx = 0
-        while True:
-            success, img = self.video.read()
-            if not success or img is None:
-                break
-
-            img = self.pose_detector.getPose(img, draw=False)
-            lmList = self.pose_detector.getPosition(img, draw=False)
-
-            if lmList:
-                self._maybe_call_vision(img, lmList, frame_idx)
-
-                angle = self._hip_knee_ankle_angle(lmList)
-                direction = self.pose_detector.checkDirectionFromAngle(
-                    angle, 110, 110, self.counter.previous_angle, downward_movement=True
-                )
-                self.counter.process(angle, lmList, self.pose_detector, direction)
-
-            frame_idx += 1
-
+        with FramePipeline(self.video, self.pose_detector) as frames:
+            for img, lmList in frames:
+                self.pose_detector.lmList = lmList
+
+                if lmList:
+                    self._maybe_call_vision(img, lmList, frame_idx)
+
+                    angle = self._hip_knee_ankle_angle(lmList)
+                    direction = self.pose_detector.checkDirectionFromAngle(
+                        angle, 110, 110, self.counter.previous_angle, downward_movement=True
+                    )
+                    self.counter.process(angle, lmList, self.pose_detector, direction)
+
+                if self._check_stop(frame_idx):
+                    break
+                frame_idx += 1
+
+        self._pose_session.finish(
+            self.video.get(cv2.CAP_PROP_FPS),
+            (int(self.video.get(cv2.CAP_PROP_FRAME_WIDTH)), int(self.video.get(cv2.CAP_PROP_FRAME_HEIGHT))),
+            complete=self.stop_reason is None,
+            # frame_idx is the last frame read when analysis stopped early, else the count read.
+            frames=frame_idx + 1 if self.stop_reason is not None else frame_idx,
+        )
         self.video.release()
 
         stats = self.counter.get_stats()
@@ -140,7 +181,10 @@ class BarbellAnalyser:
             'good_reps': good,
             'is_valid': is_valid,
             'is_scaled': False,
-            'breakdown': [],
+            'breakdown': (
+                [analysis_stopped_entry(self.stop_reason, frame_idx, self._fps)]
+                if self.stop_reason is not None else []
+            ),
             'rep_log': stats.get('rep_log', []),
             'rounds_completed': 1 if is_valid else 0,
         }
@@ -149,6 +193,21 @@ class BarbellAnalyser:
     # Internal helpers
     # ------------------------------------------------------------------
 
+    def _check_stop(self, frame_idx: int) -> bool:
+        """
+        True once the expected reps are in (For Time) or the time cap has
+        elapsed since the start of the video.
+        """
+        self.stop_reason = analysis_stop_reason(
+            bool(self.stop_at_expected_reps and self.expected_reps and self.counter.count >= self.expected_reps),
+            frame_idx,
+            self._fps,
+            self.time_cap,
+        )
+        if self.stop_reason is not None:
+            logger.info("Stopping barbell analysis at frame %d: %s", frame_idx, self.stop_reason)
+        return self.stop_reason is not None
+
     def _maybe_call_vision(self, img, lmList: list, frame_idx: int) -> None:
         check = self.counter.get_vision_check_needed(lmList)
         if not check:
@@ -158,8 +217,8 @@ class BarbellAnalyser:
 
         self._last_vision_frame = frame_idx
         prompt = _VISION_PROMPTS[check]
-        _, buf = cv2.imencode('.jpg', img)
-        confirmed, raw = self.vision_client.ask_yes_no([bytes(buf)], prompt)
+        jpeg = FramePacket.wrap(img).jpeg()
+        confirmed, raw = self.vision_client.ask_yes_no([jpeg], prompt)
         logger.info("Vision check '%s' frame=%d confirmed=%s raw=%s", check, frame_idx, confirmed, raw)
 
         if confirmed:
@@ -168,7 +227,7 @@ class BarbellAnalyser:
             # Phase changed — allow next check almost immediately so fast movements
             # (e.g. the jerk after front rack) aren't blocked by the full cooldown.
             if self.counter._phase != prev_phase:
-                self._last_vision_frame = frame_idx - self._vision_cooldown_frames + 5
+                self._last_vision_frame = frame_idx - self._vision_cooldown_frames + self._vision_recheck_frames
 
     def _hip_knee_ankle_angle(self, lmList: list) -> float:
         """Hip-knee-ankle angle on the more visible side."""
@@ -189,6 +248,7 @@ def analyse_barbell_video(
     video_url: str,
     movement_type: str,
     expected_reps: int | None = None,
+    time_cap: int | None = None,
 ) -> dict:
     """
     Download (if needed) and analyse a barbell movement video.
@@ -198,13 +258,9 @@ def analyse_barbell_video(
         movement_type: 'clean_and_jerk', 'hang_clean_and_jerk',
                        'snatch', or 'hang_snatch'.
         expected_reps: Target rep count for validity check.
+        time_cap:      Workout.time_cap in seconds; analysis stops once it has elapsed.
     """
     criteria = load_movement_criteria()
-    is_local = video_url and __import__('os').path.exists(video_url)
-    video_path = video_url if is_local else download_youtube_video(video_url)
-    try:
-        analyser = BarbellAnalyser(video_path, movement_type, expected_reps, criteria)
+    with open_video(video_url) as video_path:
+        analyser = BarbellAnalyser(video_path, movement_type, expected_reps, criteria, time_cap=time_cap)
         return analyser.analyse()
-    finally:
-        if not is_local and __import__('os').path.exists(video_path):
-            __import__('os').unlink(video_path)
@@ -18,7 +18,7 @@ construction flags (requires_ground_touch, requires_front_rack).
 import logging
 
 from workout.utilities.movement_validators import check_hip_extension, check_overhead_lockout
-from workout.utilities.movement_counters import BaseCounter
+from workout.utilities.movement_counters import REFERENCE_FPS, BaseCounter, seconds_to_frames
 
 logger = logging.getLogger(__name__)
 
@@ -30,7 +30,10 @@ class BaseBarbellCounter(BaseCounter):
     AT_SHOULDER = 'at_shoulder'  # C&J only: bar confirmed in front rack
     OVERHEAD = 'overhead'        # bar overhead; checking arm lockout
 
-    _OVERHEAD_TIMEOUT_FRAMES = 60
+    # Seconds to wait for lockout once overhead; converted to frames by set_fps().
+    _OVERHEAD_TIMEOUT_SECONDS = 2.0
+    # Seconds overhead before a wrist drop counts as the bar coming down (10 frames at 30 fps).
+    _OVERHEAD_SETTLE_SECONDS = 1 / 3
 
     def __init__(self, criteria: dict, requires_ground_touch: bool = True, requires_front_rack: bool = False):
         super().__init__(criteria)
@@ -42,6 +45,8 @@ class BaseBarbellCounter(BaseCounter):
         self.ground_tolerance_px = criteria.get('ground_tolerance_px', 60)
         self.shoulder_tolerance_px = criteria.get('shoulder_tolerance_px', 70)
         self.overhead_threshold_px = criteria.get('overhead_threshold_px', 100)
+        # How far below the shoulders the wrists must drop to end an overhead phase.
+        self.overhead_drop_px = criteria.get('overhead_drop_px', 40)
 
         self._phase = self.IDLE
         self._phase_frames = 0
@@ -51,10 +56,13 @@ class BaseBarbellCounter(BaseCounter):
         self._lockout_confirmed = False
         self._rep_log: list[dict] = []
         self._frame_counter = 0
-        self._video_fps = 30.0
+        self.set_fps(REFERENCE_FPS)
 
     def set_fps(self, fps: float) -> None:
-        self._video_fps = fps if fps > 0 else 30.0
+        """Set the rate frames are fed at; used for rep timestamps and timeouts."""
+        self._video_fps = fps if fps > 0 else REFERENCE_FPS
+        self._overhead_timeout_frames = seconds_to_frames(self._OVERHEAD_TIMEOUT_SECONDS, self._video_fps)
+        self._overhead_settle_frames = seconds_to_frames(self._OVERHEAD_SETTLE_SECONDS, self._video_fps)
 
     def get_stats(self) -> dict:
         stats = super().get_stats()
@@ -169,10 +177,10 @@ class BaseBarbellCounter(BaseCounter):
             if lockout_ok and hip_ok:
                 self._lockout_confirmed = True
                 self._finalise_rep()
-            elif self._phase_frames > self._OVERHEAD_TIMEOUT_FRAMES:
+            elif self._phase_frames > self._overhead_timeout_frames:
                 logger.info("[%s] Overhead timeout — finalising without lockout", self.__class__.__name__)
                 self._finalise_rep()
-            elif wrist_y > shoulder_y + 40 and self._phase_frames > 10:
+            elif wrist_y > shoulder_y + self.overhead_drop_px and self._phase_frames > self._overhead_settle_frames:
                 # Wrist dropped back below shoulder — bar came down without lockout
                 logger.info("[%s] Wrist descended from overhead — finalising", self.__class__.__name__)
                 self._finalise_rep()
@@ -0,0 +1,285 @@
+"""
+Headless threshold-sweep calibrator for the angle-driven movement counters.
+
+The interactive legacy AngleCalibrator tunes one threshold on one video by
+eye.  This module instead scores a whole grid of
+``descending_threshold`` / ``end_point`` / ``start_point`` candidates against
+a folder of labelled clips and reports the accuracy of every grid point.
+
+Each clip's landmarks come from the PoseTrackCache (MediaPipe only runs on a
+cache miss) and are reduced to a single angle series up front, so evaluating
+a candidate is a pure replay of the counter state machine.  Candidates are
+spread over a spawn-based process pool.
+
+Folder layout::
+
+    clips/
+        labels.json       {"clip01.mp4": {"good_reps": 10, "no_reps": 2}, ...}
+        clip01.mp4
+        ...
+
+Supported movements are those whose counters only need the joint angle:
+squat, push_up, pull_up and toes_to_bar.
+"""
+import itertools
+import json
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+import numpy as np
+
+import workout.utilities.PoseModule as pm
+from workout.utilities.frame_pipeline import FramePipeline
+from workout.utilities.frame_source import open_frame_source
+from workout.utilities.movement_counters import (
+    PullUpCounter, PushUpCounter, SquatCounter, ToesToBarCounter,
+)
+from workout.utilities.model_registry import get_model_registry
+from workout.utilities.pose_cache import PoseTrack, PoseTrackSession, TrackRecorder
+from workout.utilities.workout_analyser import movement_angle_series
+
+logger = logging.getLogger(__name__)
+
+LABELS_FILE = 'labels.json'
+SWEEP_PARAMS = ('descending_threshold', 'end_point', 'start_point')
+
+# movement -> (counter class, key in movement_analysis_criteria.json)
+_SWEEP_COUNTERS = {
+    'squat': (SquatCounter, 'squat'),
+    'push_up': (PushUpCounter, 'pushup'),
+    'pull_up': (PullUpCounter, 'pull_up'),
+    'toes_to_bar': (ToesToBarCounter, 'toes_to_bar'),
+}
+
+# Same as WorkoutAnalyser.process_frame's downward_movement list.
+_DOWNWARD_MOVEMENTS = {'squat', 'push_up'}
+
+_CANDIDATES_PER_TASK = 16
+
+
+# ------------------------------------------------------------------
+# Clip loading
+# ------------------------------------------------------------------
+
+def criteria_key(movement: str) -> str:
+    """Key of ``movement`` in movement_analysis_criteria.json."""
+    if movement not in _SWEEP_COUNTERS:
+        raise ValueError(
+            f"Cannot sweep '{movement}'; supported movements: {', '.join(sorted(_SWEEP_COUNTERS))}"
+        )
+    return _SWEEP_COUNTERS[movement][1]
+
+
+def load_labels(folder: str) -> dict:
+    """Read ``labels.json`` from ``folder`` and validate every entry."""
+    path = os.path.join(folder, LABELS_FILE)
+    with open(path) as fh:
+        labels = json.load(fh)
+
+    for clip, label in labels.items():
+        if not os.path.exists(os.path.join(folder, clip)):
+            raise ValueError(f"{LABELS_FILE} references missing clip '{clip}'")
+        if not isinstance(label.get('good_reps'), int) or not isinstance(label.get('no_reps', 0), int):
+            raise ValueError(f"Label for '{clip}' needs integer 'good_reps' (and optional 'no_reps')")
+    return labels
+
+
+def _pose_track_for(video_path: str) -> PoseTrack:
+    """Cached pose track for a clip; runs MediaPipe over it on a cache miss."""
+    session = PoseTrackSession(video_path, pose_only=True)
+    if session.track is not None and session.track.complete and session.track.start_frame == 0:
+        return session.track
+
+    detector = get_model_registry().pose_detector(**session.detector_kwargs)
+    detector.recorder = TrackRecorder()
+    video = open_frame_source(video_path, color=session.decode['color'], max_side=session.decode['max_side'])
+    try:
+        # detect_into() appends every frame to detector.recorder.
+        with FramePipeline(video, detector) as frames:
+            for _ in frames:
+                pass
+        fps = video.get(cv2.CAP_PROP_FPS)
+        frame_size = video.source_size
+    finally:
+        video.release()
+
+    track = detector.recorder.to_track(fps, frame_size, session.settings)
+    if session.key is not None:
+        try:
+            session.cache.store(session.key, track)
+        except OSError as exc:
+            logger.warning("Could not cache pose track for %s: %s", video_path, exc)
+    return track
+
+
+def clip_angle_series(video_path: str, movement: str) -> np.ndarray:
+    """
+    Primary joint angle for every frame of a clip that has a detected pose.
+
+    Frames without a pose are dropped, exactly as WorkoutAnalyser skips them.
+    """
+    track = _pose_track_for(video_path)
+    angles = movement_angle_series(movement, track.xy, track.visibility)
+    return np.ascontiguousarray(angles[track.present], dtype=np.float64)
+
+
+# ------------------------------------------------------------------
+# Candidate evaluation
+# ------------------------------------------------------------------
+
+def replay_counter(movement: str, angles, criteria: dict) -> tuple[int, int]:
+    """
+    Run a fresh counter over an angle series.
+
+    Args:
+        movement: Internal movement key.
+        angles:   Sequence of per-frame angles (frames with a pose only).
+        criteria: Criteria for this movement only.
+
+    Returns:
+        (good_reps, no_reps)
+    """
+    counter_cls, _ = _SWEEP_COUNTERS[movement]
+    counter = counter_cls(criteria)
+    descending = criteria.get('descending_threshold', 110)
+    ascending = criteria.get('ascending_threshold', 110)
+    downward = movement in _DOWNWARD_MOVEMENTS
+    direction_from_angle = pm.direction_from_angle
+
+    for angle in angles:
+        direction = direction_from_angle(angle, descending, ascending, counter.previous_angle, downward)
+        counter.process(angle, None, None, direction)
+    return counter.count, counter.no_rep
+
+
+def score_candidate(movement: str, series: list, labels: list, criteria: dict) -> dict:
+    """Accuracy of one criteria candidate over every labelled clip."""
+    exact = 0
+    good_error = 0
+    no_rep_error = 0
+    for angles, label in zip(series, labels):
+        good, no_rep = replay_counter(movement, angles, criteria)
+        good_error += abs(good - label['good_reps'])
+        no_rep_error += abs(no_rep - label.get('no_reps', 0))
+        if good == label['good_reps'] and no_rep == label.get('no_reps', 0):
+            exact += 1
+
+    n = max(len(series), 1)
+    return {
+        **{name: criteria.get(name) for name in SWEEP_PARAMS},
+        'exact_match_rate': exact / n,
+        'good_rep_mae': good_error / n,
+        'no_rep_mae': no_rep_error / n,
+    }
+
+
+# Worker-process state, set once by _init_worker so clips are not re-sent per task.
+_worker_state: dict = {}
+
+
+def _init_worker(movement: str, series: list, labels: list) -> None:
+    _worker_state['movement'] = movement
+    _worker_state['series'] = [np.asarray(s).tolist() for s in series]
+    _worker_state['labels'] = labels
+
+
+def _score_chunk(candidates: list) -> list:
+    return [
+        score_candidate(_worker_state['movement'], _worker_state['series'], _worker_state['labels'], criteria)
+        for criteria in candidates
+    ]
+
+
+# ------------------------------------------------------------------
+# Public API
+# ------------------------------------------------------------------
+
+def parse_grid_values(spec: str) -> list[float]:
+    """
+    Parse a CLI grid spec: ``"110"``, ``"100,105,110"`` or ``"start:stop:step"`` (inclusive).
+    """
+    spec = spec.strip()
+    if ':' in spec:
+        start, stop, step = (float(part) for part in spec.split(':'))
+        if step <= 0:
+            raise ValueError(f"Grid step must be positive: '{spec}'")
+        values = np.arange(start, stop + step / 2, step)
+    else:
+        values = [float(part) for part in spec.split(',') if part.strip()]
+    return [int(v) if float(v).is_integer() else round(float(v), 3) for v in values]
+
+
+def build_candidates(base_criteria: dict, grid: dict) -> list[dict]:
+    """
+    Cartesian product of ``grid`` values layered over ``base_criteria``.
+
+    Args:
+        base_criteria: Current criteria for the movement.
+        grid:          {param: [values]} for any of SWEEP_PARAMS; missing params
+                       keep their base value.
+    """
+    axes = [grid.get(name) or [base_criteria.get(name)] for name in SWEEP_PARAMS]
+    candidates = []
+    for values in itertools.product(*axes):
+        candidate = dict(base_criteria)
+        candidate.update({name: value for name, value in zip(SWEEP_PARAMS, values) if value is not None})
+        candidates.append(candidate)
+    return candidates
+
+
+def sweep(
+    folder: str,
+    movement: str,
+    base_criteria: dict,
+    grid: dict,
+    workers: int | None = None,
+) -> list[dict]:
+    """
+    Score every grid point against the labelled clips in ``folder``.
+
+    Args:
+        folder:        Directory containing the clips and ``labels.json``.
+        movement:      Internal movement key (see _SWEEP_COUNTERS).
+        base_criteria: Current criteria for the movement; non-swept values are kept.
+        grid:          {param: [values]} for descending_threshold/end_point/start_point.
+        workers:       Process pool size (default: CPU count).
+
+    Returns:
+        One row per candidate, best first: the three thresholds plus
+        exact_match_rate, good_rep_mae and no_rep_mae.
+    """
+    criteria_key(movement)  # validates the movement
+    labels = load_labels(folder)
+    clips = sorted(labels)
+
+    series = []
+    for clip in clips:
+        angles = clip_angle_series(os.path.join(folder, clip), movement)
+        logger.info("Loaded %s: %d frames with pose", clip, len(angles))
+        series.append(angles)
+    clip_labels = [labels[clip] for clip in clips]
+
+    candidates = build_candidates(base_criteria, grid)
+    chunks = [
+        candidates[i:i + _CANDIDATES_PER_TASK]
+        for i in range(0, len(candidates), _CANDIDATES_PER_TASK)
+    ]
+    logger.info(
+        "Sweeping %d candidates over %d clips (%d tasks)",
+        len(candidates), len(clips), len(chunks),
+    )
+
+    # spawn, not fork: MediaPipe/OpenCV state does not survive fork (see celery solo pool).
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=_init_worker,
+        initargs=(movement, series, clip_labels),
+    ) as pool:
+        rows = [row for chunk_rows in pool.map(_score_chunk, chunks) for row in chunk_rows]
+
+    rows.sort(key=lambda r: (-r['exact_match_rate'], r['good_rep_mae'] + r['no_rep_mae']))
+    return rows
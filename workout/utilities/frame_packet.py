@@ -0,0 +1,132 @@
+"""
+FramePacket: one decoded frame and its lazily derived views.
+
+Several perception modules look at every frame, and each used to derive its
+own input from the raw BGR image: MediaPipe wants a (possibly downscaled) RGB
+copy, TargetDetector a grey image, two Gaussian blurs of it and an HSV copy,
+the LLaVA/vision calls a JPEG.  A FramePacket computes each of those at most
+once per frame, on first use, and hands the same array to every reader.
+
+Views:
+    bgr / rgb / gray / hsv    colour conversions of the full frame
+    blurred_gray(ksize, s)    cv2.GaussianBlur of ``gray``
+    scaled(max_side)          FramePacket downscaled (INTER_AREA) to fit ``max_side``
+    region(y1, y2, x1, x2)    FramePacket for a crop; colour views of the parent
+                              are sliced rather than recomputed
+    jpeg(quality)             encoded JPEG bytes of ``bgr``
+
+Views are cached on the packet and must be treated as read-only.  Modules
+that accept a plain ndarray wrap it with ``FramePacket.wrap()``, so legacy
+callers keep working unchanged.
+"""
+import cv2
+import numpy as np
+
+# Pixel-wise views: a crop of the view equals the view of the crop.
+_PIXELWISE_VIEWS = ('bgr', 'rgb', 'gray', 'hsv')
+
+
+class FramePacket:
+    """
+    A frame plus its derived views.
+
+    Args:
+        image: Decoded frame, HxWx3 uint8.
+        color: Pixel order of ``image``: 'bgr' (OpenCV) or 'rgb'.
+    """
+
+    __slots__ = ('image', 'color', '_views', '_children')
+
+    def __init__(self, image: np.ndarray, color: str = 'bgr'):
+        self.image = image
+        self.color = color
+        self._views: dict = {color: image}
+        self._children: dict = {}
+
+    @classmethod
+    def wrap(cls, frame, color: str = 'bgr') -> 'FramePacket':
+        """``frame`` itself if it is already a FramePacket, else a new packet around it."""
+        return frame if isinstance(frame, cls) else cls(frame, color)
+
+    @property
+    def shape(self) -> tuple:
+        return self.image.shape
+
+    # ------------------------------------------------------------------
+    # Colour views
+    # ------------------------------------------------------------------
+
+    @property
+    def bgr(self) -> np.ndarray:
+        return self._view('bgr', lambda: cv2.cvtColor(self.image, cv2.COLOR_RGB2BGR))
+
+    @property
+    def rgb(self) -> np.ndarray:
+        return self._view('rgb', lambda: cv2.cvtColor(self.image, cv2.COLOR_BGR2RGB))
+
+    @property
+    def gray(self) -> np.ndarray:
+        code = cv2.COLOR_BGR2GRAY if self.color == 'bgr' else cv2.COLOR_RGB2GRAY
+        return self._view('gray', lambda: cv2.cvtColor(self.image, code))
+
+    @property
+    def hsv(self) -> np.ndarray:
+        code = cv2.COLOR_BGR2HSV if self.color == 'bgr' else cv2.COLOR_RGB2HSV
+        return self._view('hsv', lambda: cv2.cvtColor(self.image, code))
+
+    def blurred_gray(self, ksize: tuple, sigma: float = 0) -> np.ndarray:
+        return self._view(('blur', ksize, sigma), lambda: cv2.GaussianBlur(self.gray, ksize, sigma))
+
+    def jpeg(self, quality: int = 95) -> bytes:
+        """JPEG encoding of the frame (95 is OpenCV's default quality)."""
+        def encode():
+            _, buf = cv2.imencode('.jpg', self.bgr, [cv2.IMWRITE_JPEG_QUALITY, quality])
+            return bytes(buf)
+        return self._view(('jpeg', quality), encode)
+
+    # ------------------------------------------------------------------
+    # Geometric views
+    # ------------------------------------------------------------------
+
+    def scaled(self, max_side: int | None) -> 'FramePacket':
+        """This frame downscaled (aspect preserved) so its longer side fits ``max_side``."""
+        h, w = self.image.shape[:2]
+        if not max_side or max(h, w) <= max_side:
+            return self
+        key = ('scaled', max_side)
+        if key not in self._children:
+            scale = max_side / max(h, w)
+            size = (max(1, round(w * scale)), max(1, round(h * scale)))
+            self._children[key] = FramePacket(
+                cv2.resize(self.image, size, interpolation=cv2.INTER_AREA), self.color,
+            )
+        return self._children[key]
+
+    def region(self, y1: int, y2: int, x1: int = 0, x2: int | None = None) -> 'FramePacket':
+        """
+        Packet for ``image[y1:y2, x1:x2]``.
+
+        Pixel-wise views the parent has already computed are sliced into the
+        child, so e.g. a crop's ``gray`` costs nothing once the full frame's has
+        been computed.  Regions are cached by bounds.
+        """
+        key = ('region', y1, y2, x1, x2)
+        child = self._children.get(key)
+        if child is None:
+            child = FramePacket(self.image[y1:y2, x1:x2], self.color)
+            self._children[key] = child
+        for name in _PIXELWISE_VIEWS:
+            if name in self._views and name not in child._views:
+                child._views[name] = self._views[name][y1:y2, x1:x2]
+        return child
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    def _view(self, key, compute):
+        view = self._views.get(key)
+        if view is None:
+            view = compute()
+            self._views[key] = view
+        return view
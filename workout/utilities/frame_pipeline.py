@@ -0,0 +1,207 @@
+"""
+FramePipeline: overlap video decoding, pose inference and rep counting.
+
+The analysers used to run ``video.read()``, MediaPipe and the counters
+strictly one after another on a single thread.  FramePipeline splits that
+into three stages joined by bounded queues::
+
+    decoder thread ──► [decoded] ──► inference thread ──► [posed] ──► caller (counting)
+
+* Frames reach the caller in decode order; counting stays single-threaded.
+* Queues are bounded, so a slow stage back-pressures the ones before it and
+  memory stays at ~2 × ``queue_size`` frames (plus any a sampler holds back).
+* Each frame travels as a frame_packet.FramePacket, so the colour conversions
+  and resizes done for MediaPipe are reused by whatever the caller runs next.
+* With a motion_sampler.MotionSampler, frames it judges static skip pose
+  inference.  They are held until the next inspected frame, then either
+  repeat the previous landmarks or, if motion resumed, are back-filled with
+  their own inference.
+* An exception in any stage stops the others and is re-raised in the caller.
+  Leaving the ``with`` block early (break or exception) shuts both threads down.
+
+Usage::
+
+    with FramePipeline(video, detector) as frames:
+        for packet, lmList in frames:
+            detector.lmList = lmList      # getAngle() and friends read detector.lmList
+            ...count...
+
+The landmark frames come from a small ring that is reused, so each ``lmList``
+is only valid until the pipeline has moved about ``2 * queue_size`` frames on.
+Call ``lmList.copy()`` to keep one for longer.
+"""
+import logging
+import queue
+import threading
+
+import workout.utilities.PoseModule as pm
+from workout.utilities.frame_packet import FramePacket
+
+logger = logging.getLogger(__name__)
+
+_END = object()
+_POLL_SECONDS = 0.1
+
+
+class FramePipeline:
+    """
+    Decode and pose-detect video frames on background threads.
+
+    Args:
+        video:      Opened cv2.VideoCapture or frame_source source (anything with
+                    ``read()``), already positioned at the first frame to analyse.
+                    Frames are wrapped in FramePackets of the source's ``color``,
+                    and landmarks are expressed in its ``source_size``.
+        detector:   PoseDetector (or ReplayPoseDetector); only its ``detect_into``
+                    is called from the inference thread.
+        queue_size: Capacity of each inter-stage queue.
+        sampler:    Optional MotionSampler consulted (on the inference thread)
+                    before each frame's pose inference.
+    """
+
+    def __init__(self, video, detector, queue_size: int = 8, sampler=None):
+        self.video = video
+        self.detector = detector
+        self.sampler = sampler
+        if sampler is not None:
+            # The caller's ``hold`` reaches the inference thread up to a full queue (plus
+            # the frame in flight) late; the sampler's settle period must outlast that.
+            sampler.cover_lag(queue_size + 1)
+        self._color = getattr(video, 'color', 'bgr')
+        self._frame_size = getattr(video, 'source_size', None)
+        self._decoded: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._posed: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._stop = threading.Event()
+        self._error: BaseException | None = None
+        # Frames in flight are bounded by the two queues plus one per stage.
+        self._ring = [pm.LandmarkFrame() for _ in range(2 * queue_size + 4)]
+        self._threads = [
+            threading.Thread(target=self._decode_loop, name='frame-decode', daemon=True),
+            threading.Thread(target=self._inference_loop, name='pose-inference', daemon=True),
+        ]
+        self._started = False
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def start(self) -> 'FramePipeline':
+        if not self._started:
+            self._started = True
+            for thread in self._threads:
+                thread.start()
+        return self
+
+    def close(self) -> None:
+        """Stop both stages and wait for them; safe to call more than once."""
+        self._stop.set()
+        for thread in self._threads:
+            if thread.is_alive():
+                thread.join()
+
+    def __enter__(self) -> 'FramePipeline':
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def __iter__(self):
+        """Yield ``(packet, lmList)`` pairs in frame order; re-raises stage errors."""
+        self.start()
+        while True:
+            item = self._get(self._posed)
+            if item is _END:
+                break
+            yield item
+        if self._error is not None:
+            raise self._error
+
+    # ------------------------------------------------------------------
+    # Stages
+    # ------------------------------------------------------------------
+
+    def _decode_loop(self) -> None:
+        try:
+            while not self._stop.is_set():
+                success, img = self.video.read()
+                if not success or img is None:
+                    break
+                if not self._put(self._decoded, FramePacket(img, self._color)):
+                    return
+        except BaseException as exc:
+            self._fail(exc)
+        finally:
+            self._put(self._decoded, _END)
+
+    def _inference_loop(self) -> None:
+        slot = 0
+        # Frames the sampler skipped since its last inspection, in order.
+        held: list[FramePacket] = []
+
+        def emit(packet, infer: bool) -> bool:
+            nonlocal slot
+            frame = self._ring[slot]
+            slot = (slot + 1) % len(self._ring)
+            if not infer:
+                self.detector.repeat_into(frame)
+            else:
+                self.detector.detect_into(packet, frame, frame_size=self._frame_size)
+                if self.sampler is not None:
+                    self.sampler.observe(frame)
+            return self._put(self._posed, (packet, frame))
+
+        try:
+            while True:
+                packet = self._get(self._decoded)
+                if packet is _END or self._stop.is_set():
+                    break
+                if self.sampler is not None and not self.sampler.should_inspect(packet):
+                    held.append(packet)
+                    continue
+                # Motion since the last inspection means the held frames may hold a rep start.
+                backfill = self.sampler is not None and self.sampler.motion
+                if backfill and held:
+                    self.sampler.backfill(len(held))
+                for skipped in held:
+                    if not emit(skipped, backfill):
+                        return
+                held.clear()
+                if not emit(packet, True):
+                    return
+            if not self._stop.is_set():
+                for skipped in held:
+                    if not emit(skipped, False):
+                        return
+        except BaseException as exc:
+            self._fail(exc)
+        finally:
+            self._put(self._posed, _END)
+
+    # ------------------------------------------------------------------
+    # Queue helpers
+    # ------------------------------------------------------------------
+
+    def _fail(self, exc: BaseException) -> None:
+        if self._error is None:
+            self._error = exc
+            logger.error("Frame pipeline stage failed: %s", exc)
+        self._stop.set()
+
+    def _put(self, q: queue.Queue, item) -> bool:
+        """Blocking put that gives up (returns False) once the pipeline is stopping."""
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=_POLL_SECONDS)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, q: queue.Queue):
+        """Blocking get that returns _END once the pipeline is stopping and ``q`` is drained."""
+        while True:
+            try:
+                return q.get(timeout=_POLL_SECONDS)
+            except queue.Empty:
+                if self._stop.is_set():
+                    return _END
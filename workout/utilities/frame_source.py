@@ -0,0 +1,507 @@
+"""
+Pluggable video frame sources.
+
+Every analyser reads frames through the small ``cv2.VideoCapture`` surface
+(``read``, ``get``, ``set``, ``isOpened``, ``release``).  This module provides
+two interchangeable backends behind that surface:
+
+* OpenCVFrameSource — cv2.VideoCapture itself; BGR frames at full size.
+* FFmpegFrameSource — an ``ffmpeg`` subprocess writing raw frames to a pipe.
+  ffmpeg decodes on its own threads and can convert straight to RGB and
+  scale to a requested size/frame rate, so PoseDetector skips both its
+  BGR→RGB conversion and its resize.
+* StreamingFrameSource — FFmpegFrameSource fed from a download in progress
+  (utils.VideoStream), spooling a seekable copy as it goes.
+* SampledFrameSource — wraps another source and keeps every n-th frame, so a
+  high frame rate upload is analysed at ``ANALYSIS_TARGET_FPS``.  (The ffmpeg
+  backends drop frames with ffmpeg's ``fps`` filter instead.)
+
+A sampled source reports the reduced rate as CAP_PROP_FPS and counts
+CAP_PROP_POS_FRAMES / CAP_PROP_FRAME_COUNT in sampled frames, so frame
+indices, timestamps and seeks stay consistent for everything downstream.
+
+Each source reports its pixel order as ``color`` ('bgr' or 'rgb') and the
+un-scaled frame size as ``source_size``, so landmarks can always be mapped
+back to original pixel coordinates.
+
+FFmpegFrameSource decodes into a ring of preallocated NumPy buffers instead
+of allocating a frame per read; a returned frame stays valid until the ring
+wraps (``ring_size`` reads later), which covers FramePipeline's in-flight
+frames.  Copy a frame to keep it longer.
+
+Environment:
+    FRAME_SOURCE_BACKEND  'opencv' (default) or 'ffmpeg'.
+    FFMPEG_THREADS        Decoder threads for ffmpeg (default 0 = auto).
+    ANALYSIS_TARGET_FPS   Sample sources faster than this down to about this
+                          rate (default 0 = analyse every frame).
+"""
+import json
+import logging
+import os
+import shutil
+import subprocess
+import threading
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_DEFAULT_RING_SIZE = 32
+
+
+class OpenCVFrameSource:
+    """cv2.VideoCapture with the FrameSource attributes; always BGR at full size."""
+
+    color = 'bgr'
+
+    def __init__(self, video_path: str):
+        self.video_path = video_path
+        self._capture = cv2.VideoCapture(video_path)
+        self.source_size = (
+            int(self._capture.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            int(self._capture.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+        )
+
+    def read(self):
+        return self._capture.read()
+
+    def grab(self) -> bool:
+        return self._capture.grab()
+
+    def get(self, prop_id):
+        return self._capture.get(prop_id)
+
+    def set(self, prop_id, value) -> bool:
+        return self._capture.set(prop_id, value)
+
+    def isOpened(self) -> bool:
+        return self._capture.isOpened()
+
+    def release(self) -> None:
+        self._capture.release()
+
+
+def probe_video(video_path: str) -> dict:
+    """
+    Stream metadata from ffprobe: width/height (after rotation), fps and frame count.
+
+    Raises:
+        RuntimeError: if ffprobe fails or the file has no video stream.
+    """
+    cmd = [
+        'ffprobe', '-v', 'error', '-select_streams', 'v:0',
+        '-show_entries', 'stream=width,height,avg_frame_rate,r_frame_rate,nb_frames,duration'
+                         ':stream_tags=rotate:stream_side_data=rotation',
+        '-of', 'json', video_path,
+    ]
+    proc = subprocess.run(cmd, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"ffprobe failed for {video_path}: {proc.stderr.strip()}")
+    streams = json.loads(proc.stdout or '{}').get('streams') or []
+    if not streams:
+        raise RuntimeError(f"No video stream in {video_path}")
+    stream = streams[0]
+
+    width, height = int(stream['width']), int(stream['height'])
+    rotation = stream.get('tags', {}).get('rotate')
+    for side_data in stream.get('side_data_list', []):
+        rotation = side_data.get('rotation', rotation)
+    # ffmpeg auto-rotates its output, so report the displayed size.
+    if rotation is not None and abs(int(float(rotation))) % 180 == 90:
+        width, height = height, width
+
+    fps = 0.0
+    for key in ('avg_frame_rate', 'r_frame_rate'):
+        num, _, den = stream.get(key, '0/0').partition('/')
+        if float(den or 0) > 0 and float(num) > 0:
+            fps = float(num) / float(den)
+            break
+
+    frame_count = int(stream.get('nb_frames') or 0)
+    if not frame_count and stream.get('duration') and fps:
+        frame_count = int(float(stream['duration']) * fps)
+
+    return {'width': width, 'height': height, 'fps': fps, 'frame_count': frame_count}
+
+
+class FFmpegFrameSource:
+    """
+    Decode a video with an ffmpeg subprocess into reusable NumPy buffers.
+
+    Args:
+        video_path: Local path (or any input ffmpeg accepts).
+        color:      'rgb' or 'bgr' output pixel order.
+        max_side:   Downscale (aspect preserved) so the longer side is at most this.
+        fps:        Resample to this frame rate (default: the source's own frames).
+        threads:    ffmpeg decoder threads (0 = auto).
+        ring_size:  Number of frame buffers cycled through by read().
+        metadata:   Pre-computed probe_video() result, to skip ffprobe.
+    """
+
+    # Scale to ``size`` even when it equals the advertised source size: the ring
+    # buffers are sized from metadata, so output that differs would misalign every frame.
+    _force_size = False
+
+    def __init__(
+        self,
+        video_path: str,
+        color: str = 'bgr',
+        max_side: int | None = None,
+        fps: float | None = None,
+        threads: int | None = None,
+        ring_size: int = _DEFAULT_RING_SIZE,
+        metadata: dict | None = None,
+    ):
+        if color not in ('rgb', 'bgr'):
+            raise ValueError(f"color must be 'rgb' or 'bgr', got {color!r}")
+        self.video_path = video_path
+        self.color = color
+        self.threads = threads if threads is not None else int(os.environ.get('FFMPEG_THREADS', 0))
+
+        meta = metadata or probe_video(video_path)
+        self.source_size = (meta['width'], meta['height'])
+        self.source_fps = meta['fps']
+        self._source_frame_count = meta['frame_count']
+
+        width, height = self.source_size
+        if max_side and max(width, height) > max_side:
+            scale = max_side / max(width, height)
+            # Even dimensions keep every pixel format and scaler happy.
+            width, height = max(2, int(width * scale) // 2 * 2), max(2, int(height * scale) // 2 * 2)
+        self.size = (width, height)
+        self.fps = fps or self.source_fps
+
+        self._ring = [np.empty((height, width, 3), dtype=np.uint8) for _ in range(max(ring_size, 1))]
+        self._slot = 0
+        self._pos = 0
+        self._proc: subprocess.Popen | None = None
+        self._released = False
+        self._start(0)
+
+    # ------------------------------------------------------------------
+    # VideoCapture-compatible API
+    # ------------------------------------------------------------------
+
+    def read(self):
+        if self._proc is None:
+            return False, None
+        frame = self._ring[self._slot]
+        view = memoryview(frame).cast('B')
+        filled = 0
+        while filled < len(view):
+            n = self._proc.stdout.readinto(view[filled:])
+            if not n:
+                self._stop()
+                return False, None
+            filled += n
+        self._slot = (self._slot + 1) % len(self._ring)
+        self._pos += 1
+        return True, frame
+
+    def grab(self) -> bool:
+        success, _ = self.read()
+        return success
+
+    def get(self, prop_id):
+        if prop_id == cv2.CAP_PROP_FPS:
+            return self.fps
+        if prop_id == cv2.CAP_PROP_FRAME_COUNT:
+            if self.source_fps and self.fps != self.source_fps:
+                return int(self._source_frame_count * self.fps / self.source_fps)
+            return self._source_frame_count
+        if prop_id == cv2.CAP_PROP_FRAME_WIDTH:
+            return self.size[0]
+        if prop_id == cv2.CAP_PROP_FRAME_HEIGHT:
+            return self.size[1]
+        if prop_id == cv2.CAP_PROP_POS_FRAMES:
+            return self._pos
+        if prop_id == cv2.CAP_PROP_POS_MSEC:
+            return 1000.0 * self._pos / self.fps if self.fps else 0.0
+        return 0.0
+
+    def set(self, prop_id, value) -> bool:
+        """Only CAP_PROP_POS_FRAMES is supported; ffmpeg restarts at the new position."""
+        if prop_id != cv2.CAP_PROP_POS_FRAMES or self._released:
+            return False
+        frame_no = max(0, int(value))
+        if frame_no != self._pos or self._proc is None:
+            self._start(frame_no)
+        return True
+
+    def isOpened(self) -> bool:
+        return not self._released
+
+    def release(self) -> None:
+        self._released = True
+        self._stop()
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    def _input_args(self, frame_no: int) -> list[str]:
+        args = ['-nostdin']
+        if frame_no and self.fps:
+            # Input seeking decodes from the previous keyframe and discards up to the target.
+            args += ['-ss', f'{frame_no / self.fps:.6f}']
+        return args + ['-i', self.video_path]
+
+    def _command(self, frame_no: int) -> list[str]:
+        cmd = ['ffmpeg', '-v', 'error', '-threads', str(self.threads)]
+        cmd += self._input_args(frame_no) + ['-an', '-sn']
+
+        filters = []
+        if self.fps != self.source_fps:
+            filters.append(f'fps={self.fps}')
+        if self.size != self.source_size or self._force_size:
+            filters.append(f'scale={self.size[0]}:{self.size[1]}:flags=area')
+        if filters:
+            cmd += ['-vf', ','.join(filters)]
+        else:
+            cmd += ['-fps_mode', 'passthrough']
+
+        cmd += ['-f', 'rawvideo', '-pix_fmt', 'rgb24' if self.color == 'rgb' else 'bgr24', 'pipe:1']
+        return cmd
+
+    def _start(self, frame_no: int, stdin=None) -> None:
+        self._stop()
+        self._proc = subprocess.Popen(
+            self._command(frame_no),
+            stdin=stdin,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            bufsize=self.size[0] * self.size[1] * 3 * 2,
+        )
+        self._pos = frame_no
+
+    def _stop(self) -> None:
+        proc, self._proc = self._proc, None
+        if proc is None:
+            return
+        if proc.poll() is None:
+            proc.kill()
+        proc.stdout.close()
+        proc.wait()
+
+    def __del__(self):
+        self._stop()
+
+
+class StreamingFrameSource(FFmpegFrameSource):
+    """
+    FFmpegFrameSource fed from a byte stream (see utils.VideoStream) instead of a file.
+
+    A tee thread copies every chunk of the stream both into ffmpeg's stdin and
+    into ``stream.spool_path``, so frames are decoded while the download is
+    still arriving and a byte-identical, seekable copy exists once ``complete``
+    is True.  Seeking is not supported.
+
+    The frame size comes from yt-dlp's format metadata, not from the stream
+    itself, so ffmpeg is always told to scale to it: a rotated or differently
+    sized stream then still fills each buffer with exactly one frame.
+    """
+
+    _CHUNK_BYTES = 1 << 20
+    _force_size = True
+
+    def __init__(self, stream, color: str = 'bgr', max_side: int | None = None, **kwargs):
+        self.stream = stream
+        self.complete = False
+        self._tee: threading.Thread | None = None
+        super().__init__(stream.spool_path, color=color, max_side=max_side, metadata=stream.metadata, **kwargs)
+
+    def read(self):
+        success, frame = super().read()
+        if not success and self._tee is not None:
+            # ffmpeg only reaches EOF after the tee closed its stdin, i.e. after the spool is written.
+            self._tee.join()
+        return success, frame
+
+    def set(self, prop_id, value) -> bool:
+        return prop_id == cv2.CAP_PROP_POS_FRAMES and int(value) == self._pos
+
+    def _input_args(self, frame_no: int) -> list[str]:
+        return ['-i', 'pipe:0']
+
+    def _start(self, frame_no: int, stdin=None) -> None:
+        super()._start(frame_no, stdin=subprocess.PIPE)
+        self._tee = threading.Thread(target=self._tee_loop, args=(self._proc.stdin,), name='video-tee', daemon=True)
+        self._tee.start()
+
+    def _tee_loop(self, ffmpeg_stdin) -> None:
+        source = self.stream.process.stdout
+        decoding = True
+        try:
+            with open(self.stream.spool_path, 'wb') as spool:
+                while True:
+                    chunk = source.read(self._CHUNK_BYTES)
+                    if not chunk:
+                        break
+                    spool.write(chunk)
+                    if decoding:
+                        try:
+                            ffmpeg_stdin.write(chunk)
+                        except (BrokenPipeError, ValueError):
+                            # Decoder was released early; keep spooling the copy.
+                            decoding = False
+            self.complete = self.stream.process.wait() == 0
+        except (OSError, ValueError) as exc:
+            # ValueError: the stream was closed under us (VideoStream.close()).
+            logger.warning("Video stream tee failed for %s: %s", self.stream.spool_path, exc)
+        finally:
+            try:
+                ffmpeg_stdin.close()
+            except OSError:
+                pass
+
+
+class SampledFrameSource:
+    """
+    Every ``stride``-th frame of another frame source.
+
+    Frame numbers, frame count and fps are reported in sampled frames; sampled
+    frame ``k`` is source frame ``k * stride``.  Skipped frames are grabbed, not
+    retrieved.  Other attributes (``color``, ``source_size``, ``complete``, ...)
+    are those of the wrapped source.
+
+    Args:
+        source: Opened frame source.
+        stride: Keep one frame in ``stride``.
+    """
+
+    def __init__(self, source, stride: int):
+        self.source = source
+        self.stride = max(1, int(stride))
+        self._pos = 0
+        self._source_pos = int(source.get(cv2.CAP_PROP_POS_FRAMES))
+
+    def read(self):
+        if not self._skip_to_next():
+            return False, None
+        success, frame = self.source.read()
+        self._source_pos += 1
+        self._pos += 1
+        return success, frame
+
+    def grab(self) -> bool:
+        if not self._skip_to_next():
+            return False
+        success = self.source.grab()
+        self._source_pos += 1
+        self._pos += 1
+        return success
+
+    def get(self, prop_id):
+        if prop_id == cv2.CAP_PROP_FPS:
+            return self.source.get(prop_id) / self.stride
+        if prop_id == cv2.CAP_PROP_FRAME_COUNT:
+            return -(-int(self.source.get(prop_id)) // self.stride)
+        if prop_id == cv2.CAP_PROP_POS_FRAMES:
+            return self._pos
+        return self.source.get(prop_id)
+
+    def set(self, prop_id, value) -> bool:
+        if prop_id != cv2.CAP_PROP_POS_FRAMES:
+            return self.source.set(prop_id, value)
+        frame_no = max(0, int(value))
+        if not self.source.set(prop_id, frame_no * self.stride):
+            return False
+        self._pos, self._source_pos = frame_no, frame_no * self.stride
+        return True
+
+    def isOpened(self) -> bool:
+        return self.source.isOpened()
+
+    def release(self) -> None:
+        self.source.release()
+
+    def __getattr__(self, name):
+        return getattr(self.source, name)
+
+    def _skip_to_next(self) -> bool:
+        """Grab past the frames between the last one returned and the next sampled one."""
+        while self._source_pos < self._pos * self.stride:
+            if not self.source.grab():
+                return False
+            self._source_pos += 1
+        return True
+
+
+def analysis_target_fps() -> float | None:
+    """Analysis frame rate configured by ANALYSIS_TARGET_FPS, or None to use every frame."""
+    value = float(os.environ.get('ANALYSIS_TARGET_FPS') or 0)
+    return value if value > 0 else None
+
+
+def sample_stride(source_fps: float, target_fps: float | None) -> int:
+    """Keep-one-in-n stride bringing ``source_fps`` closest to ``target_fps``; 1 when no sampling is needed."""
+    if not target_fps or not source_fps or source_fps <= target_fps:
+        return 1
+    return max(1, round(source_fps / target_fps))
+
+
+def frame_source_backend() -> str:
+    """Configured backend, falling back to OpenCV when ffmpeg is not installed."""
+    backend = os.environ.get('FRAME_SOURCE_BACKEND', 'opencv').lower()
+    if backend == 'ffmpeg' and not (shutil.which('ffmpeg') and shutil.which('ffprobe')):
+        logger.warning("FRAME_SOURCE_BACKEND=ffmpeg but ffmpeg/ffprobe not found; using OpenCV")
+        return 'opencv'
+    return backend
+
+
+def decode_settings(color: str = 'bgr', max_side: int | None = None, stream: bool = False) -> dict:
+    """
+    How ``open_frame_source(..., color, max_side, stream)`` turns the file into pixels.
+
+    Backend, colour conversion, scaling and frame-rate sampling all change the
+    decoded frames, so anything cached from them (pose tracks) is keyed on this.
+    """
+    backend = 'ffmpeg' if stream else frame_source_backend()
+    if backend != 'ffmpeg':
+        # OpenCV always decodes BGR at full size.
+        color, max_side = 'bgr', None
+    return {'backend': backend, 'color': color, 'max_side': max_side, 'target_fps': analysis_target_fps()}
+
+
+def open_frame_source(
+    video_path: str,
+    color: str = 'bgr',
+    max_side: int | None = None,
+    stream=None,
+    target_fps: float | None = None,
+):
+    """
+    Open ``video_path`` with the configured backend.
+
+    Args:
+        video_path: Local video path.
+        color:      Preferred pixel order.  Only honoured by the ffmpeg backend;
+                    check the returned source's ``color``.
+        max_side:   Preferred longest side; only honoured by the ffmpeg backend.
+                    Use it only when the frames are used for pose alone.
+        stream:     utils.VideoStream to decode while it downloads; ``video_path``
+                    must then be its ``spool_path``.  Always uses ffmpeg.
+        target_fps: Analysis frame rate to sample down to; defaults to
+                    analysis_target_fps().  Sources at or below it are not sampled.
+    """
+    if target_fps is None:
+        target_fps = analysis_target_fps()
+    if stream is not None:
+        source_fps = stream.metadata['fps']
+        return StreamingFrameSource(
+            stream, color=color, max_side=max_side,
+            fps=source_fps / sample_stride(source_fps, target_fps),
+        )
+    if frame_source_backend() == 'ffmpeg':
+        try:
+            meta = probe_video(video_path)
+            return FFmpegFrameSource(
+                video_path, color=color, max_side=max_side, metadata=meta,
+                fps=meta['fps'] / sample_stride(meta['fps'], target_fps),
+            )
+        except (OSError, RuntimeError, ValueError, KeyError) as exc:
+            logger.warning("ffmpeg frame source failed for %s (%s); using OpenCV", video_path, exc)
+    source = OpenCVFrameSource(video_path)
+    stride = sample_stride(source.get(cv2.CAP_PROP_FPS), target_fps)
+    return SampledFrameSource(source, stride) if stride > 1 else source
@@ -0,0 +1,204 @@
+"""
+Keyframe index and random-access frame reader.
+
+A frame-accurate seek (``video.set(cv2.CAP_PROP_POS_FRAMES, n)``) makes the
+decoder jump to the keyframe before ``n`` and decode forward from there, so
+sampling one frame per second costs a GOP re-decode per sample — often more
+than simply decoding forward.
+
+KeyframeIndex lists a video's keyframes (from ffprobe's packet flags, which
+needs no decoding).  Indexes are cached by video content hash, like the pose
+tracks, so nothing is written next to the video and renamed or re-downloaded
+copies share one index::
+
+    <root>/<content_hash>.json    {"fps", "keyframes"}
+RandomAccessReader uses it to visit requested frames in ascending order: it
+only seeks when a keyframe lies between the current position and the next
+target, and otherwise decodes forward with ``grab()``.  A one-frame-per-second
+scan thus costs a single forward pass.
+
+Without ffprobe the index is empty and the reader always decodes forward,
+which is still one pass.  Index files are a few kilobytes each and are not evicted.
+
+Environment:
+    KEYFRAME_INDEX_CACHE_ENABLED  '0' disables the index cache (default '1').
+    KEYFRAME_INDEX_CACHE_DIR      Cache directory (default <tmp>/judgefit/keyframes).
+"""
+import json
+import logging
+import os
+import shutil
+import subprocess
+import tempfile
+from bisect import bisect_right
+
+import cv2
+
+from workout.utilities.pose_cache import video_content_hash
+
+logger = logging.getLogger(__name__)
+
+_DEFAULT_CACHE_DIR = os.path.join(tempfile.gettempdir(), 'judgefit', 'keyframes')
+
+
+class KeyframeIndex:
+    """
+    Sorted keyframe numbers of one video.
+
+    Args:
+        keyframes: Frame numbers of the keyframes (any order).
+        fps:       Frame rate the numbers were computed with.
+    """
+
+    def __init__(self, keyframes: list[int], fps: float):
+        self.keyframes = sorted(set(int(k) for k in keyframes))
+        self.fps = fps
+
+    def keyframe_at_or_before(self, frame_no: int) -> int | None:
+        i = bisect_right(self.keyframes, frame_no)
+        return self.keyframes[i - 1] if i else None
+
+    def has_keyframe_between(self, after: int, up_to: int) -> bool:
+        """True if a keyframe k satisfies ``after < k <= up_to``."""
+        k = self.keyframe_at_or_before(up_to)
+        return k is not None and k > after
+
+    def __len__(self):
+        return len(self.keyframes)
+
+    # ------------------------------------------------------------------
+    # Building and caching
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def for_video(cls, video_path: str, fps: float, cache_dir: str | None = None) -> 'KeyframeIndex':
+        """
+        Cached index for ``video_path``, probing (and caching) it on a miss.
+
+        Args:
+            video_path: Local video file.
+            fps:        Frame rate to number the keyframes with.
+            cache_dir:  Index cache directory; defaults to the environment
+                        configuration (None there means caching is disabled).
+        """
+        if cache_dir is None:
+            cache_dir = _cache_dir()
+        if cache_dir is None:
+            return cls(probe_keyframes(video_path, fps), fps)
+
+        index_path = os.path.join(cache_dir, video_content_hash(video_path) + '.json')
+        try:
+            with open(index_path) as fh:
+                cached = json.load(fh)
+            if cached['fps'] == fps:
+                return cls(cached['keyframes'], fps)
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+
+        keyframes = probe_keyframes(video_path, fps)
+        index = cls(keyframes, fps)
+        if keyframes:
+            try:
+                os.makedirs(cache_dir, exist_ok=True)
+                fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix='.json.tmp')
+                with os.fdopen(fd, 'w') as fh:
+                    json.dump({'fps': fps, 'keyframes': index.keyframes}, fh)
+                os.replace(tmp_path, index_path)
+            except OSError as exc:
+                logger.debug("Could not cache keyframe index for %s: %s", video_path, exc)
+        return index
+
+
+def _cache_dir() -> str | None:
+    """Index cache directory configured from the environment, or None when disabled."""
+    if os.environ.get('KEYFRAME_INDEX_CACHE_ENABLED', '1') == '0':
+        return None
+    return os.environ.get('KEYFRAME_INDEX_CACHE_DIR', _DEFAULT_CACHE_DIR)
+
+
+def probe_keyframes(video_path: str, fps: float) -> list[int]:
+    """
+    Keyframe numbers from ffprobe's packet flags; [] if ffprobe is unavailable.
+
+    Packet timestamps are converted to frame numbers relative to the first packet.
+    """
+    if not fps or not shutil.which('ffprobe'):
+        return []
+    cmd = [
+        'ffprobe', '-v', 'error', '-select_streams', 'v:0',
+        '-show_entries', 'packet=pts_time,flags', '-of', 'csv=p=0', video_path,
+    ]
+    proc = subprocess.run(cmd, capture_output=True, text=True)
+    if proc.returncode != 0:
+        logger.warning("ffprobe keyframe scan failed for %s: %s", video_path, proc.stderr.strip())
+        return []
+
+    times, key_times = [], []
+    for line in proc.stdout.splitlines():
+        pts_time, _, flags = line.partition(',')
+        try:
+            t = float(pts_time)
+        except ValueError:
+            continue
+        times.append(t)
+        if 'K' in flags:
+            key_times.append(t)
+    if not times:
+        return []
+    start = min(times)
+    return [round((t - start) * fps) for t in key_times]
+
+
+class RandomAccessReader:
+    """
+    Read selected frames of an open video in ascending order with minimal decoding.
+
+    Args:
+        video: Opened cv2.VideoCapture or frame_source source.
+        index: KeyframeIndex for the video, or None to always decode forward.
+    """
+
+    def __init__(self, video, index: KeyframeIndex | None = None):
+        self.video = video
+        self.index = index
+        self._pos = int(video.get(cv2.CAP_PROP_POS_FRAMES))
+
+    @classmethod
+    def for_video(cls, video, video_path: str) -> 'RandomAccessReader':
+        """Reader whose index is loaded (or built) for ``video_path``."""
+        fps = video.get(cv2.CAP_PROP_FPS) or 30.0
+        try:
+            index = KeyframeIndex.for_video(video_path, fps)
+        except OSError as exc:
+            logger.warning("No keyframe index for %s: %s", video_path, exc)
+            index = None
+        return cls(video, index)
+
+    def seek(self, frame_no: int) -> None:
+        """Position the video so the next ``read()`` returns ``frame_no``."""
+        self.video.set(cv2.CAP_PROP_POS_FRAMES, frame_no)
+        self._pos = frame_no
+
+    def read_frames(self, frame_numbers):
+        """
+        Yield ``(frame_no, img)`` for each requested frame, in ascending order.
+
+        Unreadable frames are skipped.  Stop iterating at any time; the video is
+        left positioned just after the last frame yielded.
+        """
+        # Other code may have read from the video since the last call.
+        self._pos = int(self.video.get(cv2.CAP_PROP_POS_FRAMES))
+        for target in sorted(set(int(f) for f in frame_numbers)):
+            if target < self._pos:
+                self.seek(target)
+            elif self.index is not None and self.index.has_keyframe_between(self._pos, target):
+                # Decoding can restart at that keyframe instead of walking the whole gap.
+                self.seek(target)
+            while self._pos < target:
+                if not self.video.grab():
+                    return
+                self._pos += 1
+            success, img = self.video.read()
+            self._pos += 1
+            if success and img is not None:
+                yield target, img
@@ -0,0 +1,93 @@
+"""
+ModelRegistry: per-process cache of warm perception models.
+
+Building a MediaPipe graph, loading YOLO weights and setting up the vision
+clients cost more than analysing a short clip.  The registry builds each
+model once per worker process and hands the same instance to every task,
+reset to a clean per-video state.
+
+Celery warms the registry when a worker process starts (see
+judgeFit/celery_app.py).  Instances are shared, so a process must analyse
+one video at a time — true for the solo pool the workers run with.
+"""
+import logging
+import os
+
+import workout.utilities.PoseModule as pm
+from workout.utilities.movement_classifier import MovementClassifier
+from workout.utilities.pose_cache import default_detector_kwargs, pose_settings
+from workout.utilities.wall_ball.object_detector import GymObjectDetector
+
+logger = logging.getLogger(__name__)
+
+
+class ModelRegistry:
+    """Hands out warm, reset perception models; one registry per process."""
+
+    def __init__(self):
+        self._pose_detectors: dict[tuple, pm.PoseDetector] = {}
+        self._object_detectors: dict[tuple, GymObjectDetector] = {}
+        self._classifiers: dict[int, MovementClassifier] = {}
+        self._vision_client = None
+
+    def pose_detector(self, **detector_kwargs) -> pm.PoseDetector:
+        """PoseDetector with the given settings, reset for a new video."""
+        key = tuple(sorted(pose_settings(**detector_kwargs).items()))
+        detector = self._pose_detectors.get(key)
+        if detector is None:
+            detector = pm.PoseDetector(**detector_kwargs)
+            self._pose_detectors[key] = detector
+        else:
+            detector.reset()
+        return detector
+
+    def object_detector(self, detect_every_n_frames: int = 3, **detector_kwargs) -> GymObjectDetector:
+        """GymObjectDetector (YOLO weights kept loaded) with a fresh tracker."""
+        key = tuple(sorted(detector_kwargs.items()))
+        detector = self._object_detectors.get(key)
+        if detector is None:
+            detector = GymObjectDetector(**detector_kwargs)
+            self._object_detectors[key] = detector
+        detector.detect_every_n_frames = detect_every_n_frames
+        detector.trajectory = None
+        detector.detection_interval = None
+        detector.reset_tracker()
+        return detector
+
+    def movement_classifier(self, buffer_size: int = 15) -> MovementClassifier:
+        classifier = self._classifiers.get(buffer_size)
+        if classifier is None:
+            classifier = MovementClassifier(buffer_size=buffer_size)
+            self._classifiers[buffer_size] = classifier
+        else:
+            classifier.reset()
+        return classifier
+
+    def vision_client(self):
+        """Shared VisionClient; it keeps no per-video state."""
+        if self._vision_client is None:
+            from vision.vision_client import VisionClient  # noqa: PLC0415
+            self._vision_client = VisionClient()
+        return self._vision_client
+
+    def warm_up(self) -> None:
+        """Build the default pose graph and load YOLO weights ahead of the first task."""
+        self.pose_detector(**default_detector_kwargs())
+        try:
+            self.object_detector().warm_up()
+        except ImportError as exc:
+            logger.warning("YOLO warm-up skipped: %s", exc)
+        logger.info("Model registry warmed in process %d", os.getpid())
+
+
+_registry: ModelRegistry | None = None
+_registry_pid: int | None = None
+
+
+def get_model_registry() -> ModelRegistry:
+    """The current process's registry (a forked child never inherits its parent's models)."""
+    global _registry, _registry_pid
+    if _registry is None or _registry_pid != os.getpid():
+        _registry = ModelRegistry()
+        _registry_pid = os.getpid()
+    return _registry
@@ -0,0 +1,159 @@
+"""
+MotionSampler: skip pose inference on static stretches of video.
+
+Competition videos spend a lot of time on an idle athlete — setup before the
+clock starts, rests between rounds, the cool-down tail — and MediaPipe costs
+the same on those frames as on the reps.  MotionSampler decides per frame
+whether pose inference is needed:
+
+* Every frame gets a cheap motion check: the share of pixels of a small grey
+  thumbnail (shared through the frame's FramePacket) that differ from the
+  last *inspected* frame.  Comparing against the last inspected frame rather
+  than the previous one means slow drift still adds up to motion.
+* After each inspected frame, the landmarks are compared with the previous
+  inspection's; a shift of more than a small fraction of the torso length
+  counts as motion too.
+* Once ``settle_seconds`` pass without motion, only one frame every
+  ``1 / idle_fps`` seconds is inspected.  The first frame with motion is
+  inspected again, at full rate.
+
+Frames skipped at the idle rate are held back by FramePipeline until the next
+inspection.  If that inspection was triggered by motion, the held frames are
+back-filled: pose inference runs on each of them, in order, before the moving
+frame.  Otherwise nothing changed between the two inspections and the held
+frames repeat the previous landmarks (PoseDetector.repeat_into).  Either way
+the pose track stays one entry per frame, and a rep that starts after a long
+idle stretch is seen from its first frame: the moving frame is compared with
+the last inspected one, so every frame since then is back-filled.  At most
+``idle_stride - 1`` frames are held at a time.
+
+The caller sets ``hold`` while a counter is mid-rep, which keeps the sampler
+at full rate for the rest of the rep.  ``hold`` is set on the counting thread,
+which trails the inference thread by up to the pipeline's queue lag, so it
+only takes effect that many frames late.  FramePipeline therefore calls
+``cover_lag()``: after any motion the sampler stays at full rate for longer
+than the lag, so the sampler cannot go idle before ``hold`` lands.
+
+Environment:
+    MOTION_SAMPLING           '1' enables it for WorkoutAnalyser (default '0').
+    MOTION_SAMPLING_IDLE_FPS  Inspection rate on static stretches (default 2).
+"""
+import logging
+import os
+
+import cv2
+import numpy as np
+
+from workout.utilities.movement_counters import seconds_to_frames
+
+logger = logging.getLogger(__name__)
+
+# Longest side of the grey thumbnail the frame difference is computed on.
+_THUMB_SIDE = 160
+# Grey-level change for a thumbnail pixel to count as changed.
+_PIXEL_DELTA = 15
+# Share of changed thumbnail pixels that counts as motion.
+_MOTION_FRACTION = 0.002
+# Landmark shift between inspections, as a fraction of torso length, that counts as motion.
+_LANDMARK_SHIFT = 0.05
+_MIN_VISIBILITY = 0.5
+# Shoulders, hips, knees, wrists, ankles.
+_CORE_LANDMARKS = [11, 12, 23, 24, 25, 26, 15, 16, 27, 28]
+
+_DEFAULT_IDLE_FPS = 2.0
+
+
+def motion_sampling_enabled() -> bool:
+    return os.environ.get('MOTION_SAMPLING', '0') == '1'
+
+
+class MotionSampler:
+    """
+    Per-frame decision whether to run pose inference.
+
+    Args:
+        fps:            Rate frames arrive at.
+        idle_fps:       Inspection rate once the scene is static.
+        settle_seconds: Time without motion before dropping to ``idle_fps``.
+    """
+
+    def __init__(self, fps: float, idle_fps: float | None = None, settle_seconds: float = 1.0):
+        if idle_fps is None:
+            idle_fps = float(os.environ.get('MOTION_SAMPLING_IDLE_FPS', _DEFAULT_IDLE_FPS))
+        self.idle_stride = seconds_to_frames(1.0 / idle_fps, fps)
+        self.settle_frames = seconds_to_frames(settle_seconds, fps)
+        # Set by the caller while a counter is mid-rep: inspect every frame.
+        self.hold = False
+        # Whether the frame last passed to should_inspect() moved (or was held).
+        self.motion = False
+        self.inspected = 0
+        self.skipped = 0
+        self.backfilled = 0
+
+        self._reference: np.ndarray | None = None
+        self._landmarks: np.ndarray | None = None
+        self._quiet = 0
+        self._since_inspected = 0
+
+    def cover_lag(self, frames: int) -> None:
+        """Keep full rate for more than ``frames`` after motion, so a ``hold`` set that late still lands."""
+        self.settle_frames = max(self.settle_frames, frames + 1)
+
+    def should_inspect(self, packet) -> bool:
+        """True if pose inference must run on this frame_packet.FramePacket."""
+        thumb = packet.scaled(_THUMB_SIDE).gray
+        self.motion = self.hold or self._reference is None or self._changed(thumb)
+        if self.motion:
+            self._quiet = 0
+        else:
+            self._quiet += 1
+
+        idle = self._quiet >= self.settle_frames
+        if idle and self._since_inspected + 1 < self.idle_stride:
+            self._since_inspected += 1
+            self.skipped += 1
+            return False
+
+        self._reference = thumb
+        self._since_inspected = 0
+        self.inspected += 1
+        return True
+
+    def backfill(self, frames: int) -> None:
+        """Count ``frames`` skipped frames that were inspected after all because motion resumed."""
+        self.skipped -= frames
+        self.backfilled += frames
+
+    def observe(self, lmList) -> None:
+        """Landmarks of the frame just inspected; significant movement resets the quiet period."""
+        if not lmList:
+            self._landmarks = None
+            return
+        current = lmList.data[_CORE_LANDMARKS, 1:4].copy()
+        previous, self._landmarks = self._landmarks, current
+        if previous is None:
+            return
+
+        visible = (current[:, 2] >= _MIN_VISIBILITY) & (previous[:, 2] >= _MIN_VISIBILITY)
+        if not visible.any():
+            return
+        # Torso length: shoulder midpoint to hip midpoint.
+        torso = np.linalg.norm(current[0:2, :2].mean(axis=0) - current[2:4, :2].mean(axis=0))
+        shift = np.linalg.norm(current[visible, :2] - previous[visible, :2], axis=1).max()
+        if torso > 0 and shift > _LANDMARK_SHIFT * torso:
+            self._quiet = 0
+
+    def log_summary(self) -> None:
+        inferred = self.inspected + self.backfilled
+        total = inferred + self.skipped
+        if total:
+            logger.info(
+                "Motion sampling: pose inference on %d of %d frames (%.0f%% skipped, %d back-filled)",
+                inferred, total, 100.0 * self.skipped / total, self.backfilled,
+            )
+
+    def _changed(self, thumb: np.ndarray) -> bool:
+        if thumb.shape != self._reference.shape:
+            return True
+        diff = cv2.absdiff(thumb, self._reference)
+        return np.count_nonzero(diff > _PIXEL_DELTA) > _MOTION_FRACTION * diff.size
@@ -5,6 +5,8 @@ Uses rule-based detection on MediaPipe pose landmarks
 import numpy as np
 from collections import deque
 
+from workout.utilities.movement_counters import REFERENCE_FPS, seconds_to_frames
+
 
 class MovementClassifier:
     """
@@ -12,16 +14,26 @@ class MovementClassifier:
     Uses a confidence buffer to avoid flickering between movements
     """
 
-    def __init__(self, buffer_size=15):
+    # Require 2/3 s of the same detection before switching
+    MIN_STABLE_SECONDS = 20 / REFERENCE_FPS
+
+    def __init__(self, buffer_size=15, fps=REFERENCE_FPS):
         """
         Args:
-            buffer_size: Number of frames to buffer for stable classification
+            buffer_size: Number of frames to buffer for stable classification,
+                         counted at REFERENCE_FPS (15 = 0.5 s) and rescaled by set_fps()
+            fps: Rate frames are classified at
         """
-        self.buffer_size = buffer_size
-        self.confidence_buffer = deque(maxlen=buffer_size)
+        self.buffer_seconds = buffer_size / REFERENCE_FPS
         self.current_movement = None
         self.frames_stable = 0
-        self.min_stable_frames = 20  # Require 20 frames of same detection before switching
+        self.set_fps(fps)
+
+    def set_fps(self, fps):
+        """Convert the time-based windows to frame counts at ``fps`` (resets the buffer)."""
+        self.buffer_size = seconds_to_frames(self.buffer_seconds, fps)
+        self.confidence_buffer = deque(maxlen=self.buffer_size)
+        self.min_stable_frames = seconds_to_frames(self.MIN_STABLE_SECONDS, fps)
 
     def classify(self, lmList, detector):
         """
@@ -6,6 +6,14 @@ import logging
 from abc import ABC, abstractmethod
 from collections import deque
 
+# Frame rate that the counters' thresholds were originally tuned at.
+REFERENCE_FPS = 30.0
+
+
+def seconds_to_frames(seconds: float, fps: float) -> int:
+    """Number of frames (at least 1) spanning ``seconds`` of video at ``fps``."""
+    return max(1, round(seconds * (fps if fps > 0 else REFERENCE_FPS)))
+
 
 class BaseCounter(ABC):
     """Base class for all movement counters"""
@@ -23,6 +31,10 @@ class BaseCounter(ABC):
         """Process a frame and update rep count"""
         pass
 
+    def in_rep(self):
+        """True while a rep is in progress (e.g. MotionSampler must not skip frames)"""
+        return self.is_started
+
     def get_stats(self):
         """Return current counting statistics"""
         return {
@@ -484,15 +496,21 @@ class WallBallCounter(BaseCounter):
     BALL_AT_TARGET = 'ball_at_target'
     CATCHING = 'catching'
 
-    # How many consecutive frames without a ball detection before we consider
-    # the ball dropped (during CATCHING phase).
-    _MAX_BALL_LOSS_FRAMES = 20
-    # If stuck in THROWING this many frames with no resolution, reset silently.
-    _THROWING_TIMEOUT_FRAMES = 120
+    # Durations are in seconds; set_fps() converts them to frame counts for
+    # the rate the counter is fed at, so behaviour does not depend on fps.
+    # How long without a ball detection before we consider the ball dropped
+    # (during CATCHING phase).
+    _MAX_BALL_LOSS_SECONDS = 20 / REFERENCE_FPS
+    # If stuck in THROWING this long with no resolution, reset silently.
+    _THROWING_TIMEOUT_SECONDS = 4.0
     # If stuck waiting for ball to descend from target this long, advance anyway.
-    _TARGET_TIMEOUT_FRAMES = 60
+    _TARGET_TIMEOUT_SECONDS = 2.0
     # If stuck in CATCHING this long, finalise the rep rather than hanging forever.
-    _CATCHING_TIMEOUT_FRAMES = 90
+    _CATCHING_TIMEOUT_SECONDS = 3.0
+    # YOLO polling interval while the ball is held (see ball_detection_interval).
+    _HOLD_POLL_SECONDS = 0.5
+    # A throw counts as near the apex within this many ball_height_tolerance_px of the target.
+    _APEX_WINDOW_TOLERANCES = 3
 
     def __init__(self, criteria: dict):
         super().__init__(criteria)
@@ -501,7 +519,10 @@ class WallBallCounter(BaseCounter):
         self.start_point = criteria.get('start_point', 165)
         self.end_point = criteria.get('end_point', 65)
         self.ball_height_tolerance_px = criteria.get('ball_height_tolerance_px', 40)
-        self.min_throw_frames = criteria.get('min_throw_frames', 3)
+        # 'min_throw_frames' is the legacy spelling, counted at REFERENCE_FPS.
+        self.min_throw_seconds = criteria.get(
+            'min_throw_seconds', criteria.get('min_throw_frames', 3) / REFERENCE_FPS,
+        )
 
         self.target_y_px: int | None = None
         self._phase = self.IDLE
@@ -512,10 +533,13 @@ class WallBallCounter(BaseCounter):
 
         # Ball tracking
         self._current_ball: dict | None = None
+        # Optional ball_trajectory.BallTrajectory, stepped with every ball update.
+        self.ball_trajectory = None
         self._ball_positions: deque = deque(maxlen=10)
         self._ball_loss_frames: int = 0
         self._throw_frame_count: int = 0
         self._phase_frames: int = 0
+        self._ascending = False
         # Minimum ball Y seen during the current throw — used for target check
         # so YOLO missing a few frames at the apex doesn't cause a false no-rep.
         self._throw_min_y: int | None = None
@@ -528,6 +552,7 @@ class WallBallCounter(BaseCounter):
         self._frame_counter: int = 0
         self._video_fps: float = 30.0
         self._squat_bottom_frame: int | None = None
+        self.set_fps(REFERENCE_FPS)
 
     # ------------------------------------------------------------------
     # Public API
@@ -538,8 +563,35 @@ class WallBallCounter(BaseCounter):
         self.target_y_px = target_y_px
 
     def set_fps(self, fps: float) -> None:
-        """Set video FPS so rep timestamps can be converted to seconds."""
-        self._video_fps = fps if fps > 0 else 30.0
+        """
+        Set the rate frames are fed at (the analysis rate, after any sampling).
+
+        Converts rep timestamps to seconds and the time-based thresholds to frames.
+        """
+        self._video_fps = fps if fps > 0 else REFERENCE_FPS
+        self.min_throw_frames = seconds_to_frames(self.min_throw_seconds, self._video_fps)
+        self._max_ball_loss_frames = seconds_to_frames(self._MAX_BALL_LOSS_SECONDS, self._video_fps)
+        self._throwing_timeout_frames = seconds_to_frames(self._THROWING_TIMEOUT_SECONDS, self._video_fps)
+        self._target_timeout_frames = seconds_to_frames(self._TARGET_TIMEOUT_SECONDS, self._video_fps)
+        self._catching_timeout_frames = seconds_to_frames(self._CATCHING_TIMEOUT_SECONDS, self._video_fps)
+        self._hold_poll_frames = seconds_to_frames(self._HOLD_POLL_SECONDS, self._video_fps)
+
+    def in_rep(self) -> bool:
+        return self._phase != self.IDLE
+
+    def ball_detection_interval(self) -> int | None:
+        """
+        How many frames the ball detector may wait between YOLO runs in the current phase.
+
+        Sparse polling while the ball is held (IDLE and the way down into the
+        squat), every frame while a throw is closing in on the target, and
+        None (the detector's own cadence) otherwise.
+        """
+        if self._phase == self.IDLE or (self._phase == self.SQUATTING and not self._ascending):
+            return self._hold_poll_frames
+        if self._phase == self.THROWING and self._near_apex():
+            return 1
+        return None
 
     def get_stats(self) -> dict:
         stats = super().get_stats()
@@ -555,6 +607,8 @@ class WallBallCounter(BaseCounter):
             ball_detection: dict with 'centroid' key, or None if not detected.
         """
         self._current_ball = ball_detection
+        if self.ball_trajectory is not None:
+            self.ball_trajectory.step(ball_detection)
         if ball_detection and ball_detection.get('centroid'):
             self._ball_positions.append(ball_detection['centroid'])
             self._ball_loss_frames = 0
@@ -587,6 +641,7 @@ class WallBallCounter(BaseCounter):
                 self._wrist_y_px = min(wrists)
 
         self._frame_counter += 1
+        self._ascending = direction == 1
         self._advance_state(angle, direction)
         self.previous_angle = int(angle)
         return self.get_stats()
@@ -604,6 +659,7 @@ class WallBallCounter(BaseCounter):
         self._ball_loss_frames = 0
         self._throw_frame_count = 0
         self._phase_frames = 0
+        self._ascending = False
         self._throw_min_y = None
         self._peak_samples = []
         self._rep_log = []
@@ -620,6 +676,17 @@ class WallBallCounter(BaseCounter):
             return self._current_ball['centroid'][1]
         return None
 
+    def _near_apex(self) -> bool:
+        """True while the thrown ball is within _APEX_WINDOW_TOLERANCES tolerances of the target (or unseen)."""
+        if self.target_y_px is None:
+            return True
+        ball_y = self._ball_y()
+        if ball_y is None:
+            ball_y = self._ball_positions[-1][1] if self._ball_positions else None
+        if ball_y is None:
+            return True
+        return ball_y <= self.target_y_px + self._APEX_WINDOW_TOLERANCES * self.ball_height_tolerance_px
+
     def _ball_moving_up(self) -> bool:
         """Return True if the ball's recent trajectory is upward (decreasing Y)."""
         if len(self._ball_positions) < 2:
@@ -725,7 +792,7 @@ class WallBallCounter(BaseCounter):
                 self._phase == self.THROWING
                 and not self._ball_at_target_achieved
                 and ball_y is None
-                and self._ball_loss_frames >= self._MAX_BALL_LOSS_FRAMES
+                and self._ball_loss_frames >= self._max_ball_loss_frames
             ):
                 logging.debug("Ball lost after throw — advancing to BALL_AT_TARGET optimistically")
                 self._ball_at_target_achieved = True
@@ -733,7 +800,7 @@ class WallBallCounter(BaseCounter):
                 self._phase_frames = 0
 
             # Safety timeout: stuck in THROWING with no resolution → reset silently.
-            if self._phase == self.THROWING and self._phase_frames > self._THROWING_TIMEOUT_FRAMES:
+            if self._phase == self.THROWING and self._phase_frames > self._throwing_timeout_frames:
                 logging.debug("THROWING timeout — resetting phase")
                 self._reset_phase()
 
@@ -749,14 +816,14 @@ class WallBallCounter(BaseCounter):
             if (
                 self._phase == self.BALL_AT_TARGET
                 and ball_y is None
-                and self._ball_loss_frames >= self._MAX_BALL_LOSS_FRAMES
+                and self._ball_loss_frames >= self._max_ball_loss_frames
             ):
                 logging.debug("→ CATCHING (ball lost at peak — assuming descent)")
                 self._phase = self.CATCHING
                 self._phase_frames = 0
 
             # Safety timeout.
-            if self._phase == self.BALL_AT_TARGET and self._phase_frames > self._TARGET_TIMEOUT_FRAMES:
+            if self._phase == self.BALL_AT_TARGET and self._phase_frames > self._target_timeout_frames:
                 logging.debug("→ CATCHING (BALL_AT_TARGET timeout)")
                 self._phase = self.CATCHING
                 self._phase_frames = 0
@@ -791,7 +858,7 @@ class WallBallCounter(BaseCounter):
                 self._finalise_rep()
                 self._reset_phase()
 
-            elif self._ball_loss_frames >= self._MAX_BALL_LOSS_FRAMES:
+            elif self._ball_loss_frames >= self._max_ball_loss_frames:
                 # Ball invisible while being held — count as good if criteria met.
                 if self._squat_achieved and self._ball_at_target_achieved:
                     logging.info(
@@ -802,7 +869,7 @@ class WallBallCounter(BaseCounter):
                     self._record_no_rep("ball dropped")
                 self._reset_phase()
 
-            elif self._phase_frames >= self._CATCHING_TIMEOUT_FRAMES:
+            elif self._phase_frames >= self._catching_timeout_frames:
                 # No catch signal detected — finalise based on what was achieved.
                 logging.info(
                     "CATCHING timeout after %d frames "
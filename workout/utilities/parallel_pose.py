@@ -0,0 +1,177 @@
+"""
+Segment-parallel pose extraction.
+
+MediaPipe cannot survive a fork, so the Celery worker runs with the solo pool
+and a single video only ever keeps one core busy.  This module splits a video
+into contiguous time segments and runs each one in its own spawn-started
+process with its own PoseDetector, then stitches the landmark tracks back
+together in order.
+
+MediaPipe smooths landmarks over time, so a segment that starts cold would
+differ from a sequential run for its first few frames.  Each worker therefore
+decodes ``overlap_frames`` frames before its segment to re-warm the tracker
+and throws those landmarks away.
+
+PoseTrackSession uses this automatically on a cache miss when
+``POSE_EXTRACTION_WORKERS`` is greater than 1; the analysers then replay the
+stitched track.  Only usable from a non-daemonic process (the solo Celery
+pool, management commands); prefork pool children cannot start processes.
+"""
+import logging
+import math
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+import numpy as np
+
+import workout.utilities.PoseModule as pm
+from workout.utilities.frame_source import decode_settings, open_frame_source
+from workout.utilities.pose_cache import PoseTrack, TrackRecorder, pose_settings
+
+logger = logging.getLogger(__name__)
+
+_DEFAULT_OVERLAP_FRAMES = 30
+# Segments shorter than this are not worth a process start-up and model load.
+_MIN_SEGMENT_SECONDS = 20.0
+
+
+def extraction_workers() -> int:
+    """Process count configured by POSE_EXTRACTION_WORKERS (default 1 = sequential)."""
+    value = os.environ.get('POSE_EXTRACTION_WORKERS', '1')
+    if value == 'auto':
+        return os.cpu_count() or 1
+    return max(1, int(value))
+
+
+def plan_segments(
+    total_frames: int,
+    fps: float,
+    workers: int,
+    start_frame: int = 0,
+    min_segment_seconds: float = _MIN_SEGMENT_SECONDS,
+) -> list[tuple[int, int]]:
+    """
+    Split ``[start_frame, total_frames)`` into at most ``workers`` contiguous segments.
+
+    Returns:
+        List of (first_frame, stop_frame) pairs; the last one's stop is ``total_frames``.
+    """
+    span = total_frames - start_frame
+    if span <= 0:
+        return []
+    min_len = max(1, int(min_segment_seconds * (fps or 30.0)))
+    count = max(1, min(workers, span // min_len))
+    length = math.ceil(span / count)
+    return [
+        (first, min(first + length, total_frames))
+        for first in range(start_frame, total_frames, length)
+    ]
+
+
+def _extract_segment(
+    video_path: str,
+    read_from: int,
+    record_from: int,
+    stop: int | None,
+    decode: dict,
+    detector_kwargs: dict,
+) -> np.ndarray:
+    """
+    Worker: pose-detect frames ``[read_from, stop)`` and keep those from ``record_from`` on.
+
+    ``stop`` of None reads to the end of the video.
+    """
+    detector = pm.PoseDetector(**detector_kwargs)
+    recorder = TrackRecorder(start_frame=record_from, capacity=(stop - record_from) if stop else 1024)
+    video = open_frame_source(video_path, color=decode['color'], max_side=decode['max_side'])
+    rgb = video.color == 'rgb'
+    lmList = pm.LandmarkFrame()
+    try:
+        if read_from:
+            video.set(cv2.CAP_PROP_POS_FRAMES, read_from)
+        frame_no = read_from
+        while stop is None or frame_no < stop:
+            success, img = video.read()
+            if not success or img is None:
+                break
+            detector.detect_into(img, lmList, rgb=rgb, frame_size=video.source_size)
+            if frame_no >= record_from:
+                recorder.append(lmList)
+            frame_no += 1
+    finally:
+        video.release()
+    return recorder.to_track(0.0, (0, 0), {}).landmarks
+
+
+def extract_pose_track(
+    video_path: str,
+    workers: int,
+    start_frame: int = 0,
+    overlap_frames: int = _DEFAULT_OVERLAP_FRAMES,
+    decode: dict | None = None,
+    **detector_kwargs,
+) -> PoseTrack | None:
+    """
+    Pose-detect a whole video across a process pool.
+
+    Args:
+        video_path:      Local path of the video.
+        workers:         Maximum number of worker processes.
+        start_frame:     First frame to extract.
+        overlap_frames:  Warm-up frames decoded (and discarded) before each segment.
+        decode:          frame_source.decode_settings() the segments decode with, so
+                         the track matches the run it stands in for; defaults
+                         to RGB at the inference size.
+        detector_kwargs: PoseDetector settings, identical in every worker.
+
+    Returns:
+        The stitched PoseTrack, or None if the video is too short or its frame
+        count is unknown (callers then fall back to sequential detection).
+    """
+    if decode is None:
+        decode = decode_settings('rgb', detector_kwargs.get('max_inference_side'))
+    video = open_frame_source(video_path)
+    fps = video.get(cv2.CAP_PROP_FPS)
+    total_frames = int(video.get(cv2.CAP_PROP_FRAME_COUNT))
+    frame_size = video.source_size
+    video.release()
+
+    segments = plan_segments(total_frames, fps, workers, start_frame=start_frame)
+    if len(segments) < 2:
+        return None
+
+    logger.info(
+        "Parallel pose extraction: %d frames in %d segments (overlap=%d)",
+        total_frames - start_frame, len(segments), overlap_frames,
+    )
+    jobs = []
+    for i, (first, stop) in enumerate(segments):
+        read_from = max(start_frame, first - overlap_frames)
+        # The last segment reads to EOF in case CAP_PROP_FRAME_COUNT under-reports.
+        read_to = None if i == len(segments) - 1 else stop
+        jobs.append((video_path, read_from, first, read_to, decode, detector_kwargs))
+
+    with ProcessPoolExecutor(
+        max_workers=len(jobs),
+        mp_context=multiprocessing.get_context('spawn'),
+    ) as pool:
+        parts = list(pool.map(_extract_segment, *zip(*jobs)))
+
+    for (first, stop), part in zip(segments[:-1], parts[:-1]):
+        if len(part) != stop - first:
+            logger.warning(
+                "Segment %d-%d returned %d frames (seek inaccuracy?); falling back to sequential",
+                first, stop, len(part),
+            )
+            return None
+
+    return PoseTrack(
+        np.concatenate(parts),
+        fps=fps,
+        frame_size=frame_size,
+        settings=pose_settings(**detector_kwargs),
+        start_frame=start_frame,
+        complete=True,
+    )
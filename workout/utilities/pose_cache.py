@@ -0,0 +1,674 @@
+"""
+PoseTrackCache: persistent per-video cache of MediaPipe landmark tracks.
+
+Running MediaPipe is the dominant cost of every analysis, yet the landmarks
+for a given clip never change unless the model settings do.  The first run
+over a video records every frame's landmarks; later runs over the same file
+(re-submissions, re-judging after a criteria change, retries after a vision
+model failure) replay them instead of re-running pose inference.
+
+Storage layout (one set of files per track)::
+
+    <root>/<content_hash>-<settings_digest>.npy       (N, 33, 3) float32 [cx, cy, visibility]
+    <root>/<content_hash>-<settings_digest>.ball.npy  (N, 6) float32 ball track (wall ball only)
+    <root>/<content_hash>-<settings_digest>.json      fps, frame size, settings, start frame, extras
+
+The settings digest covers the PoseDetector settings and how the frames were
+decoded (backend, pixel order, decode-side scaling, frame-rate sampling), since
+each of those changes the landmarks.  Only tracks that run to the end of the
+video are stored.  Frames without a detected pose are stored as NaN rows.  The optional ball
+track holds ``[x1, y1, x2, y2, confidence, target_y]`` per frame, so the
+counters can be re-run over a track with different criteria (see rescore.py).  The ``.npy`` file is
+opened memory-mapped, so replaying a long video does not load it all at once.
+The cache is capped at ``POSE_TRACK_CACHE_MAX_MB``; the least recently used
+tracks are evicted first.
+
+Environment:
+    POSE_TRACK_CACHE_ENABLED  '0' disables the cache (default '1').
+    POSE_TRACK_CACHE_DIR      Cache directory (default <tmp>/judgefit/pose_tracks).
+    POSE_TRACK_CACHE_MAX_MB   Size cap in megabytes (default 2048).
+    POSE_MAX_INFERENCE_SIDE   Longest frame side fed to MediaPipe; larger frames
+                              are downscaled first (default: full resolution).
+    POSE_ROI_TRACKING         '1' runs pose inference on a crop around the athlete
+                              (default '0').
+    POSE_EXTRACTION_WORKERS   Processes used to extract a missing track in
+                              parallel segments, or 'auto' (default 1 = sequential).
+"""
+import hashlib
+import inspect
+import json
+import logging
+import os
+import tempfile
+
+import numpy as np
+
+import workout.utilities.PoseModule as pm
+from workout.utilities.frame_source import decode_settings
+
+logger = logging.getLogger(__name__)
+
+_DEFAULT_CACHE_DIR = os.path.join(tempfile.gettempdir(), 'judgefit', 'pose_tracks')
+_DEFAULT_MAX_MB = 2048
+_HASH_CHUNK_BYTES = 1024 * 1024
+
+# (abspath, size, mtime_ns) -> sha256 hex, so a video is hashed at most once per process.
+_content_hash_memo: dict[tuple, str] = {}
+
+
+def video_content_hash(video_path: str) -> str:
+    """SHA-256 of the video file contents."""
+    path = os.path.abspath(video_path)
+    st = os.stat(path)
+    memo_key = (path, st.st_size, st.st_mtime_ns)
+    if memo_key in _content_hash_memo:
+        return _content_hash_memo[memo_key]
+
+    digest = hashlib.sha256()
+    with open(path, 'rb') as fh:
+        for chunk in iter(lambda: fh.read(_HASH_CHUNK_BYTES), b''):
+            digest.update(chunk)
+    _content_hash_memo[memo_key] = digest.hexdigest()
+    return _content_hash_memo[memo_key]
+
+
+def remember_content_hash(video_path: str, digest: str) -> None:
+    """Seed video_content_hash() for a file whose digest is already known (e.g. after a move)."""
+    path = os.path.abspath(video_path)
+    st = os.stat(path)
+    _content_hash_memo[(path, st.st_size, st.st_mtime_ns)] = digest
+
+
+def default_detector_kwargs() -> dict:
+    """PoseDetector kwargs configured through the environment."""
+    kwargs = {}
+    max_side = os.environ.get('POSE_MAX_INFERENCE_SIDE')
+    if max_side:
+        kwargs['max_inference_side'] = int(max_side)
+    if os.environ.get('POSE_ROI_TRACKING', '0') == '1':
+        kwargs['roi_tracking'] = True
+    return kwargs
+
+
+def pose_settings(**detector_kwargs) -> dict:
+    """PoseDetector settings for the given constructor kwargs, with defaults filled in."""
+    bound = inspect.signature(pm.PoseDetector.__init__).bind(None, **detector_kwargs)
+    bound.apply_defaults()
+    return {name: value for name, value in bound.arguments.items() if name != 'self'}
+
+
+# Column layout of PoseTrack.ball.
+BALL_COLUMNS = ('x1', 'y1', 'x2', 'y2', 'confidence', 'target_y')
+
+
+class PoseTrack:
+    """
+    Landmarks (and optionally ball positions) for a contiguous run of video frames.
+
+    Args:
+        landmarks:   (N, 33, 3) float32 array of [cx, cy, visibility]; NaN rows = no pose.
+        fps:         Source video frame rate.
+        frame_size:  (width, height) of the source video in pixels.
+        settings:    PoseDetector settings the track was produced with.
+        start_frame: Video frame number of ``landmarks[0]``.
+        complete:    True if the track runs to the end of the video.
+        ball:        Optional (N, 6) float32 array laid out as BALL_COLUMNS; NaN = not detected.
+        extras:      JSON-serialisable analyser outputs needed to re-score the track
+                     (e.g. equipment-check verdicts).
+    """
+
+    def __init__(
+        self,
+        landmarks: np.ndarray,
+        fps: float,
+        frame_size: tuple,
+        settings: dict,
+        start_frame: int = 0,
+        complete: bool = True,
+        ball: np.ndarray | None = None,
+        extras: dict | None = None,
+    ):
+        self.landmarks = landmarks
+        self.fps = fps
+        self.frame_size = tuple(frame_size)
+        self.settings = settings
+        self.start_frame = start_frame
+        self.complete = complete
+        self.ball = ball
+        self.extras = extras or {}
+
+    @property
+    def present(self) -> np.ndarray:
+        """(N,) bool mask of frames with a detected pose."""
+        return ~np.isnan(self.landmarks[:, 0, 0])
+
+    @property
+    def xy(self) -> np.ndarray:
+        """(N, 33, 2) pixel coordinates — input for PoseModule.batch_angles."""
+        return self.landmarks[:, :, :2]
+
+    @property
+    def visibility(self) -> np.ndarray:
+        """(N, 33) visibility scores."""
+        return self.landmarks[:, :, 2]
+
+    def frame(self, frame_no: int) -> np.ndarray | None:
+        """Landmark rows for absolute video frame ``frame_no``, or None if absent."""
+        i = frame_no - self.start_frame
+        if i < 0 or i >= len(self.landmarks):
+            return None
+        rows = self.landmarks[i]
+        if np.isnan(rows[0, 0]):
+            return None
+        return rows
+
+    def ball_at(self, frame_no: int) -> dict | None:
+        """Ball detection for ``frame_no`` in GymObjectDetector.detect() format, or None."""
+        i = frame_no - self.start_frame
+        if self.ball is None or i < 0 or i >= len(self.ball):
+            return None
+        row = self.ball[i]
+        if np.isnan(row[0]):
+            return None
+        x1, y1, x2, y2 = (int(v) for v in row[:4])
+        return {
+            'centroid': ((x1 + x2) // 2, (y1 + y2) // 2),
+            'bbox': (x1, y1, x2, y2),
+            'confidence': None if np.isnan(row[4]) else float(row[4]),
+        }
+
+    def target_at(self, frame_no: int) -> int | None:
+        """Calibrated wall ball target Y in effect at ``frame_no``, or None."""
+        i = frame_no - self.start_frame
+        if self.ball is None or i < 0 or i >= len(self.ball):
+            return None
+        value = self.ball[i, 5]
+        return None if np.isnan(value) else int(value)
+
+    def metadata(self) -> dict:
+        return {
+            'fps': self.fps,
+            'frame_size': list(self.frame_size),
+            'settings': self.settings,
+            'start_frame': self.start_frame,
+            'complete': self.complete,
+            'frames': len(self.landmarks),
+            'extras': self.extras,
+        }
+
+    def __len__(self):
+        return len(self.landmarks)
+
+
+class TrackRecorder:
+    """
+    Collects landmarks frame by frame into a growable (N, 33, 3) buffer.
+
+    Attach to ``PoseDetector.recorder``; getPosition() appends every frame.
+    """
+
+    def __init__(self, start_frame: int = 0, capacity: int = 1024):
+        self.start_frame = start_frame
+        self._buffer = np.empty((max(capacity, 1), pm.LandmarkFrame.NUM_LANDMARKS, 3), dtype=np.float32)
+        self._size = 0
+
+    def append(self, frame) -> None:
+        if self._size == len(self._buffer):
+            grown = np.empty((len(self._buffer) * 2,) + self._buffer.shape[1:], dtype=np.float32)
+            grown[:self._size] = self._buffer[:self._size]
+            self._buffer = grown
+        if frame:
+            self._buffer[self._size] = frame.data[:, 1:]
+        else:
+            self._buffer[self._size] = np.nan
+        self._size += 1
+
+    def to_track(
+        self,
+        fps: float,
+        frame_size: tuple,
+        settings: dict,
+        complete: bool = True,
+        frames: int | None = None,
+    ) -> PoseTrack:
+        """The first ``frames`` recorded frames (default: all) as a PoseTrack."""
+        size = self._size if frames is None else min(frames, self._size)
+        return PoseTrack(
+            self._buffer[:size].copy(),
+            fps=fps,
+            frame_size=frame_size,
+            settings=settings,
+            start_frame=self.start_frame,
+            complete=complete,
+        )
+
+    def __len__(self):
+        return self._size
+
+
+class BallRecorder:
+    """
+    Collects per-frame ball detections and the calibrated target into an (N, 6) array.
+
+    Call ``append()`` exactly once per analysed frame, with None when no ball was seen.
+    """
+
+    def __init__(self):
+        self._rows: list[tuple] = []
+
+    def append(self, ball: dict | None, target_y: int | None = None) -> None:
+        target = np.nan if target_y is None else target_y
+        if ball and ball.get('bbox'):
+            confidence = ball.get('confidence')
+            self._rows.append((*ball['bbox'], np.nan if confidence is None else confidence, target))
+        else:
+            self._rows.append((np.nan,) * 5 + (target,))
+
+    def to_array(self) -> np.ndarray:
+        return np.asarray(self._rows, dtype=np.float32).reshape(-1, len(BALL_COLUMNS))
+
+    def __len__(self):
+        return len(self._rows)
+
+
+class ReplayPoseDetector(pm.PoseDetector):
+    """
+    Drop-in PoseDetector that serves landmarks from a PoseTrack instead of MediaPipe.
+
+    getPose() and detect_into()/repeat_into() advance one frame per call, exactly
+    like the live detector being fed consecutive video frames.  Use ``seek()``
+    when the analyser starts mid-video.
+    """
+
+    def __init__(self, track: PoseTrack):
+        # Deliberately skips PoseDetector.__init__ — no MediaPipe graph is built.
+        for name, value in track.settings.items():
+            setattr(self, name, value)
+        self.track = track
+        # PoseDetector state that shared code paths may touch; there is no graph to run.
+        self.pose = None
+        self._crop_pose = None
+        self._roi_lost = False
+        self._pipeline_prev = None
+        self.results = None
+        self._landmark_frame = pm.LandmarkFrame()
+        self.lmList = self._landmark_frame
+        self.recorder = None
+        self.roi = None
+        self._cursor = track.start_frame
+        self._current = track.start_frame
+
+    def get_settings(self) -> dict:
+        return dict(self.track.settings)
+
+    def seek(self, frame_no: int) -> None:
+        self._cursor = frame_no
+
+    def reset(self) -> None:
+        """Rewind to the start of the track and forget per-frame state."""
+        self.results = None
+        self._landmark_frame.clear()
+        self.lmList = self._landmark_frame
+        self.recorder = None
+        self.roi = None
+        self._roi_lost = False
+        self._pipeline_prev = None
+        self._cursor = self._current = self.track.start_frame
+
+    def getPose(self, img, draw=True):
+        self._current = self._cursor
+        self._cursor += 1
+        return img
+
+    def getPosition(self, img, draw=True):
+        self.lmList = self._landmark_frame
+        rows = self.track.frame(self._current)
+        if rows is None:
+            self.lmList.clear()
+        else:
+            self.lmList.set_rows(rows)
+        return self.lmList
+
+    def detect_into(self, img, frame, rgb=False, frame_size=None):
+        rows = self.track.frame(self._cursor)
+        self._cursor += 1
+        if rows is None:
+            frame.clear()
+        else:
+            frame.set_rows(rows)
+        self._pipeline_prev = frame
+        return frame
+
+    def repeat_into(self, frame):
+        """The track holds every frame, including ones a live run repeated, so just read it."""
+        return self.detect_into(None, frame)
+
+    def getLandmarks(self):
+        return None
+
+
+class PoseTrackCache:
+    """
+    Content-addressed on-disk store of PoseTracks with an LRU size cap.
+
+    Args:
+        root:      Directory to keep tracks in.
+        max_bytes: Total size budget; least recently used tracks are evicted beyond it.
+    """
+
+    def __init__(self, root: str = _DEFAULT_CACHE_DIR, max_bytes: int = _DEFAULT_MAX_MB * 1024 * 1024):
+        self.root = root
+        self.max_bytes = max_bytes
+        os.makedirs(self.root, exist_ok=True)
+
+    def key_for(self, video_path: str, settings: dict) -> str:
+        settings_digest = hashlib.sha1(
+            json.dumps(settings, sort_keys=True, default=str).encode()
+        ).hexdigest()[:12]
+        return f"{video_content_hash(video_path)}-{settings_digest}"
+
+    def _paths(self, key: str) -> tuple[str, str, str]:
+        base = os.path.join(self.root, key)
+        return base + '.npy', base + '.json', base + '.ball.npy'
+
+    def load(self, key: str) -> PoseTrack | None:
+        """Return the cached track for ``key`` (memory-mapped), or None on a miss."""
+        npy_path, meta_path, ball_path = self._paths(key)
+        try:
+            with open(meta_path) as fh:
+                meta = json.load(fh)
+            landmarks = np.load(npy_path, mmap_mode='r')
+            ball = np.load(ball_path) if os.path.exists(ball_path) else None
+            track = PoseTrack(
+                landmarks,
+                fps=meta['fps'],
+                frame_size=meta['frame_size'],
+                settings=meta['settings'],
+                start_frame=meta.get('start_frame', 0),
+                complete=meta.get('complete', True),
+                ball=ball,
+                extras=meta.get('extras'),
+            )
+        except (OSError, ValueError, EOFError, KeyError, TypeError, AttributeError) as exc:
+            # Truncated or older-schema sidecars are misses too.
+            if os.path.exists(meta_path) or os.path.exists(npy_path):
+                logger.warning("Discarding unreadable pose track %s: %s", key, exc)
+                self._remove(key)
+            return None
+
+        # Touch every file so LRU eviction sees this track as recently used.
+        for path in (npy_path, meta_path, ball_path):
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+
+        logger.info("Pose track cache hit: %s (%d frames)", key, len(track))
+        return track
+
+    def store(self, key: str, track: PoseTrack) -> None:
+        """Write ``track`` atomically, then evict old tracks if over budget."""
+        npy_path, meta_path, ball_path = self._paths(key)
+        fd, tmp_npy = tempfile.mkstemp(dir=self.root, suffix='.npy.tmp')
+        os.close(fd)
+        tmp_meta = tmp_npy[:-len('.npy.tmp')] + '.json.tmp'
+        tmp_ball = tmp_npy[:-len('.npy.tmp')] + '.ball.npy.tmp'
+        try:
+            with open(tmp_npy, 'wb') as fh:
+                np.save(fh, np.ascontiguousarray(track.landmarks, dtype=np.float32), allow_pickle=False)
+            if track.ball is not None:
+                with open(tmp_ball, 'wb') as fh:
+                    np.save(fh, np.ascontiguousarray(track.ball, dtype=np.float32), allow_pickle=False)
+            with open(tmp_meta, 'w') as fh:
+                json.dump(track.metadata(), fh, default=str)
+            os.replace(tmp_npy, npy_path)
+            if track.ball is not None:
+                os.replace(tmp_ball, ball_path)
+            elif os.path.exists(ball_path):
+                os.unlink(ball_path)
+            os.replace(tmp_meta, meta_path)
+        finally:
+            for path in (tmp_npy, tmp_meta, tmp_ball):
+                if os.path.exists(path):
+                    os.unlink(path)
+
+        logger.info("Pose track cached: %s (%d frames)", key, len(track))
+        self.evict()
+
+    def evict(self) -> None:
+        """Delete least recently used tracks until the cache fits in ``max_bytes``."""
+        entries = {}
+        for name in os.listdir(self.root):
+            if not name.endswith(('.npy', '.json')):
+                continue
+            key = name.split('.', 1)[0]
+            try:
+                st = os.stat(os.path.join(self.root, name))
+            except OSError:
+                continue
+            size, mtime = entries.get(key, (0, 0))
+            entries[key] = (size + st.st_size, max(mtime, st.st_mtime))
+
+        total = sum(size for size, _ in entries.values())
+        for key, (size, _) in sorted(entries.items(), key=lambda item: item[1][1]):
+            if total <= self.max_bytes:
+                break
+            logger.info("Evicting pose track %s (%d bytes)", key, size)
+            self._remove(key)
+            total -= size
+
+    def _remove(self, key: str) -> None:
+        for path in self._paths(key):
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+
+
+_cache: PoseTrackCache | None = None
+
+
+def get_pose_cache() -> PoseTrackCache | None:
+    """Process-wide cache configured from the environment, or None when disabled."""
+    global _cache
+    if os.environ.get('POSE_TRACK_CACHE_ENABLED', '1') == '0':
+        return None
+    if _cache is None:
+        _cache = PoseTrackCache(
+            root=os.environ.get('POSE_TRACK_CACHE_DIR', _DEFAULT_CACHE_DIR),
+            max_bytes=int(os.environ.get('POSE_TRACK_CACHE_MAX_MB', _DEFAULT_MAX_MB)) * 1024 * 1024,
+        )
+    return _cache
+
+
+class PoseTrackSession:
+    """
+    Picks a replay or live PoseDetector for one analysis run and caches the result.
+
+    Usage inside an analyser::
+
+        session = PoseTrackSession(video_path)
+        detector = session.begin()
+        detector = session.seek(start_frame)   # only if the loop starts mid-video
+        ... run the frame loop with ``detector`` ...
+        session.finish(fps, (width, height))   # stores the track only if it reached the end
+
+    ``session.key`` identifies the stored track; persist it to re-score the video later.
+
+    Args:
+        video_path:      Local path of the video being analysed.
+        cache:           PoseTrackCache to use; defaults to ``get_pose_cache()``.
+        streaming:       ``video_path`` is still being written (a stream spool):
+                         skip the cache lookup and compute the key in finish().
+        motion_sampling: The run skips static frames (motion_sampler), so the
+                         recorded track is cached under its own key.
+        pose_only:       The frames only feed pose detection, so they may be
+                         decoded as RGB at the inference size.  Open the video
+                         with ``decode['color']`` / ``decode['max_side']``.
+        detector_kwargs: Passed to PoseDetector on a cache miss, on top of
+                         default_detector_kwargs().
+    """
+
+    def __init__(
+        self,
+        video_path: str,
+        cache: PoseTrackCache | None = None,
+        streaming: bool = False,
+        motion_sampling: bool = False,
+        pose_only: bool = False,
+        **detector_kwargs,
+    ):
+        self.cache = cache if cache is not None else get_pose_cache()
+        self.detector_kwargs = {**default_detector_kwargs(), **detector_kwargs}
+        self.decode = decode_settings(
+            'rgb' if pose_only else 'bgr',
+            self.detector_kwargs.get('max_inference_side') if pose_only else None,
+            stream=streaming,
+        )
+        self.settings = pose_settings(**self.detector_kwargs)
+        # Decoded pixels (and, when sampled, frame numbering) change the landmarks.
+        self.settings['decode'] = self.decode
+        if motion_sampling:
+            self.settings['motion_sampling'] = True
+        self.video_path = video_path
+        self.streaming = streaming
+        self.key: str | None = None
+        self.track: PoseTrack | None = None
+        self.detector = None
+
+        if self.cache is not None and not streaming:
+            try:
+                self.key = self.cache.key_for(video_path, self.settings)
+                self.track = self.cache.load(self.key)
+            except OSError as exc:
+                logger.warning("Pose track cache unavailable for %s: %s", video_path, exc)
+                self.key = None
+
+    @property
+    def is_replay(self) -> bool:
+        return isinstance(self.detector, ReplayPoseDetector)
+
+    def begin(self, start_frame: int = 0):
+        """Return the detector to use for a frame loop starting at ``start_frame``."""
+        if not self._can_replay(start_frame) and not self.streaming:
+            self._extract_in_parallel(start_frame)
+        if self._can_replay(start_frame):
+            self.detector = ReplayPoseDetector(self.track)
+            self.detector.seek(start_frame)
+            return self.detector
+
+        from workout.utilities.model_registry import get_model_registry  # noqa: PLC0415
+
+        self.detector = get_model_registry().pose_detector(**self.detector_kwargs)
+        if self.key is not None or (self.streaming and self.cache is not None):
+            self.detector.recorder = TrackRecorder(start_frame=start_frame)
+        return self.detector
+
+    def _can_replay(self, start_frame: int) -> bool:
+        track = self.track
+        return track is not None and track.complete and track.start_frame <= start_frame
+
+    def _extract_in_parallel(self, start_frame: int) -> None:
+        """On a miss, build the track with parallel_pose when POSE_EXTRACTION_WORKERS > 1."""
+        from workout.utilities.parallel_pose import extract_pose_track, extraction_workers  # noqa: PLC0415
+
+        workers = extraction_workers()
+        if workers <= 1:
+            return
+        try:
+            track = extract_pose_track(
+                self.video_path, workers, start_frame=start_frame, decode=self.decode, **self.detector_kwargs,
+            )
+        except Exception as exc:
+            logger.warning("Parallel pose extraction failed, running sequentially: %s", exc)
+            return
+        if track is None:
+            return
+        track.settings = self.settings
+        self.track = track
+        if self.key is not None:
+            try:
+                self.cache.store(self.key, track)
+            except OSError as exc:
+                logger.warning("Could not cache pose track %s: %s", self.key, exc)
+
+    def seek(self, start_frame: int):
+        """
+        Position the detector at ``start_frame`` before the frame loop starts.
+
+        Falls back to a live detector if the cached track starts later than requested.
+        Returns the detector to use.
+        """
+        if self.detector is None:
+            return self.begin(start_frame)
+        if self.is_replay and self.detector.track.start_frame > start_frame:
+            return self.begin(start_frame)
+        self.detector.seek(start_frame)
+        if self.detector.recorder is not None:
+            self.detector.recorder = TrackRecorder(start_frame=start_frame)
+        return self.detector
+
+    def finish(
+        self,
+        fps: float,
+        frame_size: tuple,
+        complete: bool = True,
+        ball: np.ndarray | None = None,
+        extras: dict | None = None,
+        frames: int | None = None,
+    ) -> None:
+        """
+        Store the recorded track (no-op when caching is disabled).
+
+        When replaying, the cached track is only rewritten to attach a ball
+        track it was stored without.  A streaming session must only finish
+        once its spool file is complete, since that is when the key is computed.
+
+        Incomplete tracks (early stop, failed run) are not stored: they can
+        never be replayed, so they would only take cache space.
+
+        ``frames`` is how many frames the analyser consumed.  After an early
+        stop the frame pipeline has already posed a few frames further; those
+        are dropped so the track ends where the analysis did.
+        """
+        if self.streaming and self.key is None and self.cache is not None and complete:
+            try:
+                self.key = self.cache.key_for(self.video_path, self.settings)
+            except OSError as exc:
+                logger.warning("Pose track cache unavailable for %s: %s", self.video_path, exc)
+        if self.detector is None or self.key is None:
+            return
+        if not complete:
+            logger.info("Not caching pose track %s: the run stopped before the end of the video", self.key)
+            self.detector.recorder = None
+            return
+
+        if self.is_replay:
+            cached = self.detector.track
+            if ball is None or cached.ball is not None or len(ball) != len(cached):
+                return
+            track = PoseTrack(
+                np.array(cached.landmarks),
+                fps=cached.fps,
+                frame_size=cached.frame_size,
+                settings=cached.settings,
+                start_frame=cached.start_frame,
+                complete=cached.complete,
+                ball=ball,
+                extras={**cached.extras, **(extras or {})},
+            )
+        else:
+            recorder = self.detector.recorder
+            if recorder is None:
+                return
+            self.detector.recorder = None
+            if not len(recorder):
+                return
+            track = recorder.to_track(fps, frame_size, self.settings, complete=complete, frames=frames)
+            if ball is not None and len(ball) == len(track):
+                track.ball = ball
+            track.extras = extras or {}
+        try:
+            self.cache.store(self.key, track)
+        except OSError as exc:
+            logger.warning("Could not cache pose track %s: %s", self.key, exc)
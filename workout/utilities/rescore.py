@@ -0,0 +1,124 @@
+"""
+Re-score engine: re-judge an analysed video under new criteria without decoding it.
+
+Every analysis stores the video's landmark track (and, for wall balls, the
+per-frame ball positions and calibrated target) in the PoseTrackCache under
+``Video.pose_track_key``.  Re-scoring loads that track and replays it through
+fresh movement counters built from the new criteria — the expensive stages
+(download, decode, MediaPipe, YOLO, LLaVA) never run again.
+
+Barbell workouts are not supported: their counters depend on vision-model
+confirmations that are not part of the track.  Nor are analyses that stopped
+early (plan complete or time cap): their tracks end at the old stop, so new
+criteria could not judge the footage after it, and they are not cached at all.
+Those videos need a full re-analysis.
+"""
+import copy
+import logging
+
+from workout.utilities.pose_cache import PoseTrack, get_pose_cache
+from workout.utilities.workout_analyser import (
+    _BARBELL_MOVEMENTS, WorkoutAnalyser, WorkoutPlan, normalise_movement_name,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class RescoreError(Exception):
+    """Raised when a video cannot be re-scored from its stored track."""
+
+
+class TrackUnavailableError(RescoreError):
+    """Raised when the stored track cannot stand in for the video; it needs a full re-analysis."""
+
+
+def merge_criteria(base: dict, overrides: dict | None) -> dict:
+    """
+    Apply per-movement criteria overrides on top of ``base``.
+
+    Args:
+        base:      Full movement_analysis_criteria dict.
+        overrides: {movement_key: {criterion: value}}, e.g. {'squat': {'end_point': 75}}.
+
+    Returns:
+        A new criteria dict; ``base`` is left untouched.
+    """
+    merged = copy.deepcopy(base)
+    for movement, values in (overrides or {}).items():
+        if isinstance(values, dict) and isinstance(merged.get(movement), dict):
+            merged[movement].update(values)
+        else:
+            merged[movement] = values
+    return merged
+
+
+def load_track(pose_track_key: str) -> PoseTrack:
+    """Load the stored track for a video, raising TrackUnavailableError if it is not cached."""
+    cache = get_pose_cache()
+    if cache is None:
+        raise TrackUnavailableError("Pose track cache is disabled (POSE_TRACK_CACHE_ENABLED=0)")
+    track = cache.load(pose_track_key)
+    if track is None:
+        raise TrackUnavailableError(f"Pose track {pose_track_key} is not in the cache (evicted, or the analysis stopped early)")
+    return track
+
+
+def rescore_track(
+    track: PoseTrack,
+    workout_components: list,
+    workout_type: str,
+    criteria: dict,
+    time_cap: int | None = None,
+) -> dict:
+    """
+    Re-run the movement counters over a stored track.
+
+    Args:
+        track:              PoseTrack produced by the original analysis.
+        workout_components: Same shape as analyse_workout_video()'s argument.
+        workout_type:       'FT', 'AMRAP' or 'FW'.
+        criteria:           Full criteria dict to judge with (see merge_criteria).
+        time_cap:           Workout.time_cap in seconds, applied as in the original run.
+
+    Returns:
+        Result dict in the same shape as analyse_workout_video().
+
+    Raises:
+        TrackUnavailableError: The track does not run to the end of the video.
+        RescoreError:          The workout cannot be re-scored from a track.
+    """
+    if not track.complete:
+        raise TrackUnavailableError(
+            "Stored track ends where the original analysis stopped early; re-run the full analysis"
+        )
+
+    normalised = [
+        {
+            'movement': normalise_movement_name(c['movement']),
+            'expected_reps': c.get('expected_reps') or c.get('reps'),
+            'sequence': c['sequence'],
+        }
+        for c in workout_components
+    ]
+
+    if normalised and all(c['movement'] in _BARBELL_MOVEMENTS for c in normalised):
+        raise RescoreError("Barbell workouts cannot be re-scored from a pose track")
+
+    if normalised and all(c['movement'] == 'wall_ball' for c in normalised):
+        if track.ball is None:
+            raise RescoreError("Stored track has no ball positions; re-run the full analysis")
+        from workout.utilities.wall_ball.wall_ball_analyser import WallBallAnalyser  # noqa: PLC0415
+        total_expected = sum(c['expected_reps'] for c in normalised if c.get('expected_reps'))
+        analyser = WallBallAnalyser(
+            None,
+            expected_reps=total_expected or None,
+            criteria=criteria,
+            pose_track=track,
+            time_cap=time_cap,
+            stop_at_expected_reps=workout_type != 'AMRAP',
+        )
+        return analyser.analyse()
+
+    plan = WorkoutPlan(normalised, workout_type=workout_type, time_cap=time_cap)
+    analyser = WorkoutAnalyser(None, plan, criteria, pose_track=track)
+    return analyser.analyse()
@@ -1,5 +1,7 @@
 import json
+import shutil
 import subprocess
+import tempfile
 import yt_dlp
 import os
 from pathlib import Path
@@ -18,6 +20,35 @@ def load_movement_criteria():
     return criteria
 
 
+def analysis_stop_reason(plan_complete, elapsed_frames, fps, time_cap):
+    """
+    Why an analyser should stop reading frames early, or None to carry on.
+
+    ``elapsed_frames`` counts from the frame analysis started on (the detected
+    workout start, or the start of the video), so pre-start setup counts
+    towards ``time_cap`` only when no workout start was detected.
+    """
+    if plan_complete:
+        return 'plan_complete'
+    if time_cap and elapsed_frames / fps >= time_cap:
+        return 'time_cap'
+    return None
+
+
+def analysis_stopped_entry(reason, frame_no, fps):
+    """
+    movement_breakdown entry recording that an analyser stopped reading early.
+
+    ``reason`` is 'plan_complete' or 'time_cap'; ``frame_no`` is the analysed
+    frame (from the start of analysis) it stopped after.
+    """
+    return {
+        'event': 'analysis_stopped',
+        'reason': reason,
+        'frame': frame_no,
+        'timestamp': round(frame_no / fps, 2) if fps else None,
+    }
+
 
 def get_youtube_stream_url(youtube_url):
     ydl_opts = {
@@ -31,27 +62,114 @@ def get_youtube_stream_url(youtube_url):
         return info['url']
 
 
-def download_youtube_video(youtube_url):
-    output_path = '/tmp/yt_video.mp4'
-
-    if os.path.exists(output_path):
-        os.remove(output_path)
-
+def _yt_dlp_env():
     env = os.environ.copy()
     env['PATH'] = '/opt/homebrew/bin:' + env.get('PATH', '')
+    return env
+
+
+_YT_DLP_ARGS = [
+    'yt-dlp',
+    '--extractor-args', 'youtube:player_client=android_vr',
+]
+_YT_DLP_FORMAT = 'best[ext=mp4]/best'
+
+
+def spool_path(suffix='.mp4'):
+    """
+    Create a unique, empty spool file for one task's copy of a video.
+
+    Files live in VIDEO_SPOOL_DIR (default: the system temp dir) so concurrent
+    tasks on one host never share a path.  The caller deletes the file.
+    """
+    spool_dir = os.environ.get('VIDEO_SPOOL_DIR') or tempfile.gettempdir()
+    os.makedirs(spool_dir, exist_ok=True)
+    fd, path = tempfile.mkstemp(prefix='judgefit_', suffix=suffix, dir=spool_dir)
+    os.close(fd)
+    return path
+
+
+def download_youtube_video(youtube_url):
+    output_path = spool_path()
 
     result = subprocess.run([
-        'yt-dlp',
-        '--extractor-args', 'youtube:player_client=android_vr',
-        '--format', 'best[ext=mp4]/best',
+        *_YT_DLP_ARGS,
+        '--format', _YT_DLP_FORMAT,
+        '--force-overwrites',
         '--output', output_path,
         youtube_url
-    ], capture_output=True, env=env)
+    ], capture_output=True, env=_yt_dlp_env())
 
     if result.returncode != 0:
+        os.remove(output_path)
         raise Exception(f"yt-dlp download failed: {result.stderr.decode()}")
 
     if not os.path.exists(output_path) or os.path.getsize(output_path) == 0:
+        if os.path.exists(output_path):
+            os.remove(output_path)
         raise Exception("Downloaded file is empty or missing")
 
     return output_path
+
+
+def video_ingest_mode():
+    """
+    'download' (default) fetches the whole video before analysis; 'stream' pipes
+    it into an ffmpeg frame source so analysis starts while bytes are arriving.
+    Set with VIDEO_INGEST_MODE; streaming needs the ffmpeg backend's binaries.
+    """
+    mode = os.environ.get('VIDEO_INGEST_MODE', 'download').lower()
+    if mode == 'stream' and not shutil.which('ffmpeg'):
+        return 'download'
+    return mode
+
+
+class VideoStream:
+    """
+    A yt-dlp download written to stdout, plus the spool file that will hold a copy.
+
+    ``metadata`` has the selected format's width, height, fps and frame_count.
+    Pass it to frame_source.open_frame_source(stream=...); close() when done.
+    """
+
+    def __init__(self, youtube_url):
+        self.url = youtube_url
+        self.metadata = _probe_youtube_format(youtube_url)
+        self.spool_path = spool_path('.' + self.metadata['ext'])
+        self.process = subprocess.Popen([
+            *_YT_DLP_ARGS,
+            '--format', self.metadata['format_id'],
+            '--quiet',
+            '--output', '-',
+            youtube_url
+        ], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, env=_yt_dlp_env())
+
+    def close(self):
+        if self.process.poll() is None:
+            self.process.kill()
+        self.process.stdout.close()
+        self.process.wait()
+        if os.path.exists(self.spool_path):
+            os.remove(self.spool_path)
+
+
+def _probe_youtube_format(youtube_url):
+    """Resolve the format yt-dlp would download and return its stream metadata."""
+    result = subprocess.run(
+        [*_YT_DLP_ARGS, '--format', _YT_DLP_FORMAT, '--dump-json', '--no-download', youtube_url],
+        capture_output=True, env=_yt_dlp_env(),
+    )
+    if result.returncode != 0:
+        raise Exception(f"yt-dlp probe failed: {result.stderr.decode()}")
+    info = json.loads(result.stdout)
+    if not info.get('width') or not info.get('height'):
+        raise Exception("yt-dlp did not report the video dimensions")
+    fps = float(info.get('fps') or 30.0)
+    return {
+        'format_id': info['format_id'],
+        'ext': info.get('ext') or 'mp4',
+        'width': int(info['width']),
+        'height': int(info['height']),
+        'fps': fps,
+        'frame_count': int((info.get('duration') or 0) * fps),
+    }
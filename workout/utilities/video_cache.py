@@ -0,0 +1,250 @@
+"""
+VideoCache: shared on-disk cache of downloaded source videos.
+
+Re-analysis, retries after a failed run and repeat submissions of the same
+``videoURL`` used to download the video again every time, and the analysers
+deleted it as soon as they finished.  VideoCache keeps downloads on disk,
+keyed by URL and stored by content hash, so identical videos behind different
+URLs share one copy.
+
+Storage layout::
+
+    <root>/objects/<sha256>.<ext>          the video
+    <root>/urls/<sha1(url)>.json           {"url", "object"} pointer for a URL
+    <root>/locks/<sha1(url)>.lock          serialises downloads of one URL
+
+Concurrency:
+
+* A task that misses takes an exclusive lock on the URL for the duration of
+  the download; other tasks asking for the same URL block on that lock and
+  then find the finished object instead of downloading it again.
+* ``checkout()`` holds a shared lock on the object while it is in use, and
+  eviction skips objects it cannot lock exclusively, so a video is never
+  deleted under a running analysis.
+
+Locks are ``fcntl`` file locks, so they work across Celery worker processes on
+one host (the cache directory should not be on NFS).
+
+Environment:
+    VIDEO_CACHE_ENABLED  '0' disables the cache (default '1').
+    VIDEO_CACHE_DIR      Cache directory (default <tmp>/judgefit/videos).
+    VIDEO_CACHE_MAX_MB   Size budget in megabytes (default 4096).
+"""
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+
+from workout.utilities.pose_cache import remember_content_hash, video_content_hash
+from workout.utilities.utils import download_youtube_video
+
+logger = logging.getLogger(__name__)
+
+_DEFAULT_CACHE_DIR = os.path.join(tempfile.gettempdir(), 'judgefit', 'videos')
+_DEFAULT_MAX_MB = 4096
+
+
+class VideoCache:
+    """
+    Content-addressed video store with URL lookup, LRU eviction and download locks.
+
+    Args:
+        root:      Directory to keep videos in.
+        max_bytes: Total size budget; least recently used videos are evicted beyond it.
+    """
+
+    def __init__(self, root: str = _DEFAULT_CACHE_DIR, max_bytes: int = _DEFAULT_MAX_MB * 1024 * 1024):
+        self.root = root
+        self.max_bytes = max_bytes
+        for sub in ('objects', 'urls', 'locks'):
+            os.makedirs(os.path.join(self.root, sub), exist_ok=True)
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def get(self, url: str) -> str | None:
+        """Path of the cached video for ``url`` (marking it recently used), or None."""
+        try:
+            with open(self._url_path(url)) as fh:
+                pointer = json.load(fh)
+            path = os.path.join(self.root, 'objects', pointer['object'])
+            os.utime(path)
+        except (OSError, ValueError, KeyError):
+            return None
+        return path
+
+    def fetch(self, url: str, download=download_youtube_video) -> str:
+        """
+        Return the cached video for ``url``, downloading it on a miss.
+
+        Concurrent callers for the same URL wait for a single download.
+        """
+        path = self.get(url)
+        if path is not None:
+            logger.info("Video cache hit: %s", url)
+            return path
+
+        with self._locked(os.path.join(self.root, 'locks', self._url_digest(url) + '.lock'), fcntl.LOCK_EX):
+            # Another task may have finished the download while we waited.
+            path = self.get(url)
+            if path is not None:
+                logger.info("Video cache hit after waiting for download: %s", url)
+                return path
+            spooled = download(url)
+            return self.add(url, spooled)
+
+    def add(self, url: str, video_path: str) -> str:
+        """
+        Move a fully downloaded ``video_path`` into the cache under ``url``.
+
+        Returns the cached path.  If identical content is already stored, the
+        new file is dropped and the URL points at the existing copy.
+        """
+        digest = video_content_hash(video_path)
+        ext = os.path.splitext(video_path)[1] or '.mp4'
+        name = digest + ext
+        path = os.path.join(self.root, 'objects', name)
+        if os.path.exists(path):
+            os.unlink(video_path)
+            os.utime(path)
+        else:
+            shutil.move(video_path, path)
+            remember_content_hash(path, digest)
+
+        tmp_pointer = self._url_path(url) + '.tmp'
+        with open(tmp_pointer, 'w') as fh:
+            json.dump({'url': url, 'object': name}, fh)
+        os.replace(tmp_pointer, self._url_path(url))
+        logger.info("Video cached: %s -> %s", url, name)
+
+        self.evict(keep=path)
+        return path
+
+    @contextmanager
+    def checkout(self, url: str, download=download_youtube_video):
+        """Fetch ``url`` and keep it safe from eviction while the ``with`` block runs."""
+        for _ in range(2):
+            path = self.fetch(url, download)
+            try:
+                fd = os.open(path, os.O_RDONLY)
+            except FileNotFoundError:
+                continue  # evicted between lookup and lock; the retry downloads it again
+            try:
+                fcntl.flock(fd, fcntl.LOCK_SH)
+                if os.path.exists(path):
+                    yield path
+                    return
+            finally:
+                os.close(fd)
+        raise OSError(f"Cached video for {url} kept disappearing")
+
+    def evict(self, keep: str | None = None) -> None:
+        """Delete least recently used videos until the cache fits in ``max_bytes``."""
+        objects_dir = os.path.join(self.root, 'objects')
+        entries = []
+        for name in os.listdir(objects_dir):
+            path = os.path.join(objects_dir, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if path == keep or not self._try_remove(path):
+                continue
+            logger.info("Evicting cached video %s (%d bytes)", os.path.basename(path), size)
+            total -= size
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _url_digest(url: str) -> str:
+        return hashlib.sha1(url.encode()).hexdigest()
+
+    def _url_path(self, url: str) -> str:
+        return os.path.join(self.root, 'urls', self._url_digest(url) + '.json')
+
+    @staticmethod
+    @contextmanager
+    def _locked(path: str, mode: int):
+        fd = os.open(path, os.O_RDONLY | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, mode)
+            yield
+        finally:
+            os.close(fd)
+
+    @staticmethod
+    def _try_remove(path: str) -> bool:
+        """Delete ``path`` unless a checkout holds it; URL pointers go stale harmlessly."""
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except FileNotFoundError:
+            return True
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        try:
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+        finally:
+            os.close(fd)
+        return True
+
+
+_cache: VideoCache | None = None
+
+
+def get_video_cache() -> VideoCache | None:
+    """Process-wide cache configured from the environment, or None when disabled."""
+    global _cache
+    if os.environ.get('VIDEO_CACHE_ENABLED', '1') == '0':
+        return None
+    if _cache is None:
+        _cache = VideoCache(
+            root=os.environ.get('VIDEO_CACHE_DIR', _DEFAULT_CACHE_DIR),
+            max_bytes=int(os.environ.get('VIDEO_CACHE_MAX_MB', _DEFAULT_MAX_MB)) * 1024 * 1024,
+        )
+    return _cache
+
+
+@contextmanager
+def open_video(video_url: str):
+    """
+    Local path for ``video_url`` for the duration of a ``with`` block.
+
+    Local files are used in place.  Remote videos come from the VideoCache
+    (downloading on a miss); with the cache disabled they are downloaded to a
+    spool file that is deleted afterwards.
+    """
+    if os.path.exists(video_url):
+        yield video_url
+        return
+
+    cache = get_video_cache()
+    if cache is not None:
+        with cache.checkout(video_url) as path:
+            yield path
+        return
+
+    path = download_youtube_video(video_url)
+    try:
+        yield path
+    finally:
+        if os.path.exists(path):
+            os.unlink(path)
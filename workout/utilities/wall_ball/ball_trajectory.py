@@ -0,0 +1,131 @@
+"""
+BallTrajectory: constant-acceleration Kalman filter over the ball centroid.
+
+A thrown wall ball follows a near-parabolic path, so position, velocity and
+(roughly constant) acceleration predict the next few frames well.
+WallBallCounter feeds the filter one step per frame from
+``update_ball_position()``.  GymObjectDetector asks it where the ball will be
+on its next YOLO frame, and runs YOLO on a small crop around that point
+instead of the whole image.
+
+``predict()`` also returns the position uncertainty.  It grows with every
+frame the ball is not seen and with how far ahead the prediction reaches.
+The detector uses it to size the crop, and falls back to a full-frame scan
+once the crop would no longer be small.
+
+Both axes share the same dynamics and noise, so a single 3x3 covariance
+(position, velocity, acceleration) serves x and y.  Time is measured in
+frames at REFERENCE_FPS, so the noise settings do not depend on the video's
+frame rate.
+
+Environment:
+    BALL_SEARCH_WINDOW  '1' enables the search window in WallBallAnalyser and
+                        WorkoutAnalyser (default '0').
+"""
+import os
+
+import numpy as np
+
+from workout.utilities.movement_counters import REFERENCE_FPS, seconds_to_frames
+
+# Measurement noise of a YOLO/CSRT centroid, px (1 sigma).
+_MEASUREMENT_STD = 6.0
+# Random-jerk process noise, px / frame^3 (1 sigma).  It absorbs the throw and catch,
+# where the hands change the ball's acceleration.
+_JERK_STD = 1.0
+# Initial velocity / acceleration uncertainty when a track starts, px/frame and px/frame^2.
+_INITIAL_VELOCITY_STD = 30.0
+_INITIAL_ACCELERATION_STD = 5.0
+# A measurement this many sigmas off the prediction starts a new track.
+_GATE_SIGMAS = 5.0
+# Without a measurement for this long, the track is dropped.
+_MAX_COAST_SECONDS = 0.5
+
+
+def ball_search_window_enabled() -> bool:
+    return os.environ.get('BALL_SEARCH_WINDOW', '0') == '1'
+
+
+class BallTrajectory:
+    """
+    Ball centroid tracker that predicts ahead.
+
+    Args:
+        fps: Rate ``step()`` is called at (the analysis frame rate).
+    """
+
+    def __init__(self, fps: float = REFERENCE_FPS):
+        dt = REFERENCE_FPS / fps if fps > 0 else 1.0
+        self._F = np.array([
+            [1.0, dt, dt * dt / 2],
+            [0.0, 1.0, dt],
+            [0.0, 0.0, 1.0],
+        ])
+        g = np.array([dt ** 3 / 6, dt ** 2 / 2, dt])
+        self._Q = np.outer(g, g) * _JERK_STD ** 2
+        self._R = _MEASUREMENT_STD ** 2
+        self._max_coast_steps = seconds_to_frames(_MAX_COAST_SECONDS, fps)
+        self.reset()
+
+    def reset(self) -> None:
+        # Frames stepped through so far.
+        self.steps = 0
+        # Rows: position, velocity, acceleration; columns: x, y.  None while no track.
+        self._x: np.ndarray | None = None
+        self._P: np.ndarray | None = None
+        self._coast = 0
+        # Larger side of the last measured ball bbox, px.
+        self.ball_extent = 0
+
+    def step(self, ball: dict | None) -> None:
+        """Advance one frame and fold in this frame's ball detection (if any)."""
+        self.steps += 1
+        if self._x is not None:
+            self._x = self._F @ self._x
+            self._P = self._F @ self._P @ self._F.T + self._Q
+
+        centroid = ball.get('centroid') if ball else None
+        if centroid is None:
+            self._coast += 1
+            if self._coast > self._max_coast_steps:
+                self._x = self._P = None
+            return
+
+        self._coast = 0
+        bbox = ball.get('bbox')
+        if bbox:
+            self.ball_extent = max(bbox[2] - bbox[0], bbox[3] - bbox[1])
+        z = np.asarray(centroid, dtype=float)
+        if self._x is None:
+            self._start(z)
+            return
+
+        innovation = z - self._x[0]
+        s = self._P[0, 0] + self._R
+        if np.abs(innovation).max() > _GATE_SIGMAS * np.sqrt(s):
+            self._start(z)  # not the ball we were following
+            return
+        gain = self._P[:, 0] / s
+        self._x = self._x + np.outer(gain, innovation)
+        self._P = self._P - np.outer(gain, self._P[0])
+
+    def predict(self, ahead: int = 1) -> tuple[float, float, float] | None:
+        """
+        Predicted ball centroid ``ahead`` frames after the last step.
+
+        Returns:
+            (x, y, sigma) with sigma the position uncertainty in px, or None
+            when there is no track.
+        """
+        if self._x is None or ahead < 1:
+            return None
+        x, P = self._x, self._P
+        for _ in range(ahead):
+            x = self._F @ x
+            P = self._F @ P @ self._F.T + self._Q
+        return float(x[0, 0]), float(x[0, 1]), float(np.sqrt(P[0, 0]))
+
+    def _start(self, z: np.ndarray) -> None:
+        self._x = np.zeros((3, 2))
+        self._x[0] = z
+        self._P = np.diag([self._R, _INITIAL_VELOCITY_STD ** 2, _INITIAL_ACCELERATION_STD ** 2])
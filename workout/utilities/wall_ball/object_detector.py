@@ -3,17 +3,57 @@ GymObjectDetector: YOLOv8-based gym equipment detection.
 
 Uses YOLOv8n with COCO pre-trained weights.  COCO class 32 ("sports ball")
 covers wall balls / medicine balls well enough for a first implementation.
-A CSRT tracker bridges detection gaps between YOLO runs to handle brief
-occlusions (e.g. when the athlete catches the ball).
+A tracker (CSRT by default; see trackers.py) bridges detection gaps between
+YOLO runs to handle brief occlusions (e.g. when the athlete catches the ball).
+
+For offline analysis, ``detect_batch()`` takes a run of consecutive frames,
+sends all of their scheduled YOLO frames through the model in one call
+(``batch_size`` of them per forward pass), and then walks the run in order
+to apply each detection and bridge the frames in between with the tracker,
+so the per-frame results match calling ``detect()`` frame by frame.
+
+The model runs on one of three backends:
+
+    'torch'     ultralytics + PyTorch on the .pt weights (default)
+    'onnx'      ONNX Runtime on the exported .onnx model
+    'openvino'  OpenVINO on the exported IR model
+
+The exported backends need no torch at inference time (see yolo_runtime;
+export with ``manage.py export_yolo``).  Loading the model doubles as a
+self-check: if the export is missing or fails a test inference, the
+detector logs a warning and falls back to torch.
+
+The caller may also set ``detection_interval`` before each frame (e.g. from
+WallBallCounter.ball_detection_interval()) to change the cadence with the
+rep phase.  YOLO then runs once that many frames have passed since its last
+run, instead of on every ``detect_every_n_frames``-th frame.
+
+With a BallTrajectory attached (``trajectory``), YOLO frames search a crop
+around the predicted ball position, sized by the prediction's uncertainty
+and run at a reduced input size.  A frame goes back to a full-image scan
+when there is no track, when the crop would cover too much of the frame, or
+when the crop holds no ball.
+
+Environment:
+    YOLO_BATCH_SIZE  Scheduled detection frames per YOLO forward pass in
+                     detect_batch() (default 1).
+    YOLO_BACKEND     'torch', 'onnx' or 'openvino' (default 'torch').
+    BALL_TRACKER     Tracker between YOLO runs: 'csrt', 'kcf', 'mosse' or
+                     'optical_flow' (default 'csrt').
+    ADAPTIVE_DETECTION  '1' lets the wall ball counter set the YOLO cadence
+                     in WallBallAnalyser and WorkoutAnalyser (default '0').
 
 Future: swap in fine-tuned weights for barbells, dumbbells, kettlebells.
 """
 import logging
 import os
 
-import cv2
 import numpy as np
 
+from workout.utilities.frame_packet import FramePacket
+from workout.utilities.wall_ball.trackers import DEFAULT_TRACKER, TRACKERS, create_tracker
+from workout.utilities.wall_ball.yolo_runtime import EXPORT_BACKENDS, load_exported_model
+
 logger = logging.getLogger(__name__)
 
 # COCO class index for sports ball (wall ball / medicine ball proxy).
@@ -25,6 +65,26 @@ _DEFAULT_MODEL_PATH = os.path.join(
     '..', '..', 'static', 'models', 'yolov8n.pt',
 )
 
+_BACKENDS = ('torch',) + EXPORT_BACKENDS
+# Side of the blank frame the exported backends are test-run on at load time.
+_SELF_CHECK_SIDE = 64
+
+# Trajectory search window: crop side = ball size * _CROP_BALL_SIZES plus
+# _CROP_SIGMAS prediction sigmas each way, at least _MIN_CROP_SIDE px.
+_CROP_BALL_SIZES = 3
+_CROP_SIGMAS = 3
+_MIN_CROP_SIDE = 160
+# Crops larger than this share of the frame's shorter side are not worth it.
+_MAX_CROP_FRACTION = 0.5
+# YOLO input size for crops (full frames run at the model's default, 640).
+_CROP_IMGSZ = 320
+# A box this close to a crop edge may be a ball cut in half; rescan the full frame.
+_WINDOW_EDGE_PX = 2
+
+
+def adaptive_detection_enabled() -> bool:
+    return os.environ.get('ADAPTIVE_DETECTION', '0') == '1'
+
 
 class GymObjectDetector:
     """
@@ -41,9 +101,15 @@ class GymObjectDetector:
     Args:
         model_path:            Path to YOLOv8 .pt weights file.
         confidence_threshold:  Minimum YOLO confidence to accept a detection.
-        detect_every_n_frames: Run YOLO only on every Nth frame; use CSRT tracker
+        detect_every_n_frames: Run YOLO only on every Nth frame; use the tracker
                                on the frames in between.
         device:                Torch device string ('cpu', 'cuda', 'mps').
+        batch_size:            YOLO frames per forward pass in detect_batch()
+                               (default from YOLO_BATCH_SIZE, else 1).
+        backend:               'torch', 'onnx' or 'openvino' (default from
+                               YOLO_BACKEND, else 'torch').
+        tracker:               Tracker between YOLO runs, one of trackers.TRACKERS
+                               (default from BALL_TRACKER, else 'csrt').
     """
 
     def __init__(
@@ -52,19 +118,46 @@ class GymObjectDetector:
         confidence_threshold: float = 0.35,
         detect_every_n_frames: int = 3,
         device: str = 'cpu',
+        batch_size: int | None = None,
+        backend: str | None = None,
+        tracker: str | None = None,
     ):
+        backend = backend or os.environ.get('YOLO_BACKEND', 'torch')
+        if backend not in _BACKENDS:
+            raise ValueError(f"Unknown YOLO backend '{backend}'; expected one of {', '.join(_BACKENDS)}")
+        self.backend = backend
+        tracker = tracker or os.environ.get('BALL_TRACKER', DEFAULT_TRACKER)
+        if tracker not in TRACKERS:
+            raise ValueError(f"Unknown ball tracker '{tracker}'; expected one of {', '.join(TRACKERS)}")
+        self.tracker_name = tracker
         self.confidence_threshold = confidence_threshold
         self.detect_every_n_frames = detect_every_n_frames
         self.device = device
+        if batch_size is None:
+            batch_size = int(os.environ.get('YOLO_BATCH_SIZE', 1))
+        self.batch_size = max(1, batch_size)
 
         self._model = None
         self._model_path = os.path.abspath(model_path)
 
-        # CSRT tracker state
+        # Tracker state
         self._tracker = None
         self._tracker_active = False
         self._last_bbox = None   # (x, y, w, h) in OpenCV tracker format
 
+        # Trajectory search window (set per video; see ball_trajectory).  The
+        # trajectory is stepped once per frame by the counter, so frames passed
+        # here minus its steps is how far ahead it must predict.
+        self.trajectory = None
+        self._frames_seen = 0
+        self.crop_scans = 0
+        self.full_scans = 0
+
+        # Phase-driven cadence: frames between YOLO runs, or None for every Nth frame.
+        self.detection_interval: int | None = None
+        self._last_yolo_frame: int | None = None
+        self.yolo_frames = 0
+
     # ------------------------------------------------------------------
     # Public API
     # ------------------------------------------------------------------
@@ -79,7 +172,7 @@ class GymObjectDetector:
         Run detection on a single frame.
 
         Args:
-            frame:              BGR image as NumPy array.
+            frame:              BGR image as NumPy array, or a frame_packet.FramePacket.
             frame_idx:          Current frame number (used for N-frame scheduling).
             athlete_torso_bbox: Optional (x1, y1, x2, y2) bounding box of the
                                 athlete's torso.  Ball detections whose centroid
@@ -92,27 +185,79 @@ class GymObjectDetector:
                         or None if no ball detected.
                 'frame_idx': int
         """
-        ball = None
-
-        if frame_idx % self.detect_every_n_frames == 0:
-            ball = self._run_yolo(frame, athlete_torso_bbox)
-            if ball:
-                x1, y1, x2, y2 = ball['bbox']
-                w, h = x2 - x1, y2 - y1
-                self._last_bbox = (x1, y1, w, h)
-                self._init_tracker(frame, self._last_bbox)
+        return self.detect_batch([frame], [frame_idx], [athlete_torso_bbox])[0]
+
+    def detect_batch(
+        self,
+        frames: list,
+        frame_indices: list[int],
+        athlete_torso_bboxes: list | None = None,
+    ) -> list[dict]:
+        """
+        detect() over consecutive frames, with the YOLO frames run as batches.
+
+        Args:
+            frames:               Consecutive BGR images or FramePackets.
+            frame_indices:        Frame number of each frame.
+            athlete_torso_bboxes: Per-frame torso box (or None) for each frame.
+
+        Returns:
+            One detect() result dict per frame, in order.
+        """
+        frames = [FramePacket.wrap(frame).bgr for frame in frames]  # YOLO and the trackers take BGR
+        torsos = athlete_torso_bboxes or [None] * len(frames)
+        first_frame, self._frames_seen = self._frames_seen + 1, self._frames_seen + len(frames)
+        scheduled = [i for i, frame_idx in enumerate(frame_indices) if self._yolo_due(frame_idx)]
+        self.yolo_frames += len(scheduled)
+        yolo_balls = {}
+        for start in range(0, len(scheduled), self.batch_size):
+            chunk = scheduled[start:start + self.batch_size]
+            balls = self._run_yolo(
+                [frames[i] for i in chunk],
+                [torsos[i] for i in chunk],
+                [self._search_window(frames[i], first_frame + i) for i in chunk],
+            )
+            yolo_balls.update(zip(chunk, balls))
+
+        # Reconcile in frame order: YOLO hits (re)seed the tracker, which bridges the rest.
+        detections = []
+        for i, (frame, frame_idx) in enumerate(zip(frames, frame_indices)):
+            if i in yolo_balls:
+                ball = yolo_balls[i]
+                if ball:
+                    x1, y1, x2, y2 = ball['bbox']
+                    w, h = x2 - x1, y2 - y1
+                    self._last_bbox = (x1, y1, w, h)
+                    self._init_tracker(frame, self._last_bbox)
+                else:
+                    self._tracker_active = False
             else:
-                self._tracker_active = False
-        else:
-            ball = self._update_tracker(frame)
+                ball = self._update_tracker(frame)
+            detections.append({'ball': ball, 'frame_idx': frame_idx})
+        return detections
 
-        return {'ball': ball, 'frame_idx': frame_idx}
+    def batch_span(self) -> int:
+        """Consecutive frames to pass to detect_batch() at a time (1 when unbatched)."""
+        if self.batch_size == 1:
+            return 1
+        return self.batch_size * self.detect_every_n_frames
 
     def reset_tracker(self) -> None:
-        """Reset the CSRT tracker (call between reps or at start of new set)."""
+        """Reset the tracker (call between reps or at start of new set)."""
         self._tracker = None
         self._tracker_active = False
         self._last_bbox = None
+        self._frames_seen = 0
+        self.crop_scans = 0
+        self.full_scans = 0
+        self._last_yolo_frame = None
+        self.yolo_frames = 0
+        if self.trajectory is not None:
+            self.trajectory.reset()
+
+    def warm_up(self) -> None:
+        """Load the YOLO weights now instead of on the first detection."""
+        self._load_model()
 
     # ------------------------------------------------------------------
     # Internal helpers
@@ -122,6 +267,17 @@ class GymObjectDetector:
         """Lazy-load the YOLO model on first use."""
         if self._model is not None:
             return
+        if self.backend != 'torch':
+            try:
+                model = load_exported_model(self._model_path, self.backend)
+                model([np.zeros((_SELF_CHECK_SIDE, _SELF_CHECK_SIDE, 3), dtype=np.uint8)])
+            except Exception as exc:
+                logger.warning("YOLO %s backend unavailable (%s); falling back to torch", self.backend, exc)
+                self.backend = 'torch'
+            else:
+                self._model = model
+                logger.info("YOLOv8 model loaded with the %s backend", self.backend)
+                return
         try:
             from ultralytics import YOLO  # noqa: PLC0415
         except ImportError as exc:
@@ -135,62 +291,126 @@ class GymObjectDetector:
         self._model.to(self.device)
         logger.info("YOLOv8 model loaded on device=%s", self.device)
 
+    def _yolo_due(self, frame_idx: int) -> bool:
+        """Whether YOLO runs on ``frame_idx`` (recorded as the last YOLO frame if so)."""
+        if self.detection_interval is None:
+            due = frame_idx % self.detect_every_n_frames == 0
+        else:
+            due = self._last_yolo_frame is None or frame_idx - self._last_yolo_frame >= self.detection_interval
+        if due:
+            self._last_yolo_frame = frame_idx
+        return due
+
     def _run_yolo(
         self,
-        frame: np.ndarray,
-        athlete_torso_bbox: tuple | None,
-    ) -> dict | None:
-        """Run YOLO inference and return the best sports-ball detection."""
+        frames: list[np.ndarray],
+        athlete_torso_bboxes: list,
+        search_windows: list | None = None,
+    ) -> list[dict | None]:
+        """
+        Run YOLO on ``frames`` and return each frame's best sports-ball detection.
+
+        Frames with a search window are scanned on that crop first (all crops in
+        one call); the others, and crops without a whole ball in them, get one
+        full-frame call.
+        """
         self._load_model()
 
-        results = self._model(frame, verbose=False, device=self.device)
-        if not results:
+        windows = search_windows or [None] * len(frames)
+        boxes = [None] * len(frames)
+        cropped = [i for i, window in enumerate(windows) if window]
+        if cropped:
+            crops = [frames[i][windows[i][1]:windows[i][3], windows[i][0]:windows[i][2]] for i in cropped]
+            for i, crop_boxes in zip(cropped, self._infer(crops, _CROP_IMGSZ)):
+                crop_boxes[:, [0, 2]] += windows[i][0]
+                crop_boxes[:, [1, 3]] += windows[i][1]
+                ball = self._best_ball(crop_boxes, athlete_torso_bboxes[i])
+                if ball is not None and not _cut_by_window(ball['bbox'], windows[i], frames[i].shape):
+                    boxes[i] = crop_boxes
+                    self.crop_scans += 1
+
+        full = [i for i, frame_boxes in enumerate(boxes) if frame_boxes is None]
+        if full:
+            self.full_scans += len(full)
+            for i, frame_boxes in zip(full, self._infer([frames[i] for i in full])):
+                boxes[i] = frame_boxes
+        return [
+            self._best_ball(frame_boxes, torso)
+            for frame_boxes, torso in zip(boxes, athlete_torso_bboxes)
+        ]
+
+    def _infer(self, images: list[np.ndarray], imgsz: int | None = None) -> list[np.ndarray]:
+        """One model call over ``images``; per image, ``[x1, y1, x2, y2, conf, cls]`` rows."""
+        if self.backend != 'torch':
+            return self._model(images, imgsz) if imgsz else self._model(images)
+        kwargs = {'imgsz': imgsz} if imgsz else {}
+        results = self._model(images, verbose=False, device=self.device, **kwargs)
+        return [_boxes_array(result) for result in results]
+
+    def _search_window(self, frame: np.ndarray, frame_number: int) -> tuple | None:
+        """
+        (x1, y1, x2, y2) crop around the trajectory's prediction for the
+        ``frame_number``-th frame since the last reset, or None for a full scan.
+        """
+        if self.trajectory is None:
             return None
+        prediction = self.trajectory.predict(frame_number - self.trajectory.steps)
+        if prediction is None:
+            return None
+        px, py, sigma = prediction
+        h, w = frame.shape[:2]
+        side = int(max(_MIN_CROP_SIDE, _CROP_BALL_SIZES * self.trajectory.ball_extent + 2 * _CROP_SIGMAS * sigma))
+        if side > _MAX_CROP_FRACTION * min(h, w):
+            return None
+        x1 = min(max(int(px) - side // 2, 0), w - side)
+        y1 = min(max(int(py) - side // 2, 0), h - side)
+        return x1, y1, x1 + side, y1 + side
 
-        best = None
-        best_conf = self.confidence_threshold
-
-        for result in results:
-            if result.boxes is None:
-                continue
-            for box in result.boxes:
-                cls = int(box.cls[0].item())
-                conf = float(box.conf[0].item())
-                if cls != _SPORTS_BALL_CLASS or conf < best_conf:
-                    continue
-                x1, y1, x2, y2 = [int(v) for v in box.xyxy[0].tolist()]
-                cx, cy = (x1 + x2) // 2, (y1 + y2) // 2
-
-                if athlete_torso_bbox and _inside_bbox((cx, cy), athlete_torso_bbox):
-                    continue
+    def _best_ball(self, boxes: np.ndarray, athlete_torso_bbox: tuple | None) -> dict | None:
+        """
+        Highest-confidence sports ball among one frame's ``[x1, y1, x2, y2, conf, cls]``
+        rows whose centroid is outside the torso box.
+        """
+        if not len(boxes):
+            return None
 
-                best_conf = conf
-                best = {
-                    'centroid': (cx, cy),
-                    'bbox': (x1, y1, x2, y2),
-                    'confidence': conf,
-                }
+        xyxy = boxes[:, :4].astype(int)
+        conf = boxes[:, 4]
+        cls = boxes[:, 5].astype(int)
+        cx = (xyxy[:, 0] + xyxy[:, 2]) // 2
+        cy = (xyxy[:, 1] + xyxy[:, 3]) // 2
+
+        keep = (cls == _SPORTS_BALL_CLASS) & (conf >= self.confidence_threshold)
+        if athlete_torso_bbox:
+            tx1, ty1, tx2, ty2 = athlete_torso_bbox
+            keep &= ~((tx1 <= cx) & (cx <= tx2) & (ty1 <= cy) & (cy <= ty2))
+        candidates = np.flatnonzero(keep)
+        if not len(candidates):
+            return None
 
-        return best
+        # Last of the equally confident boxes, as the box-by-box scan picked.
+        best = candidates[len(candidates) - 1 - np.argmax(conf[candidates][::-1])]
+        x1, y1, x2, y2 = (int(v) for v in xyxy[best])
+        return {
+            'centroid': (int(cx[best]), int(cy[best])),
+            'bbox': (x1, y1, x2, y2),
+            'confidence': float(conf[best]),
+        }
 
     def _init_tracker(self, frame: np.ndarray, bbox_xywh: tuple) -> None:
-        """Initialise (or re-initialise) the CSRT tracker."""
-        try:
-            self._tracker = cv2.legacy.TrackerCSRT_create()
-        except AttributeError:
-            try:
-                self._tracker = cv2.TrackerCSRT_create()
-            except AttributeError:
-                logger.warning("CSRT tracker unavailable; falling back to YOLO-only mode.")
-                self._tracker = None
-                self._tracker_active = False
-                return
+        """Initialise (or re-initialise) the tracker on a YOLO detection."""
+        if self._tracker is None:
+            self._tracker = create_tracker(self.tracker_name)
+        if self._tracker is None:
+            logger.warning("%s tracker unavailable; falling back to YOLO-only mode.", self.tracker_name.upper())
+            self._tracker_active = False
+            return
 
         self._tracker.init(frame, bbox_xywh)
         self._tracker_active = True
 
     def _update_tracker(self, frame: np.ndarray) -> dict | None:
-        """Update the CSRT tracker and return ball position if tracking is active."""
+        """Update the tracker and return ball position if tracking is active."""
         if not self._tracker_active or self._tracker is None:
             return None
 
@@ -206,7 +426,7 @@ class GymObjectDetector:
         return {
             'centroid': (cx, cy),
             'bbox': (x, y, x2, y2),
-            'confidence': None,   # CSRT does not produce confidence scores
+            'confidence': None,   # trackers do not produce confidence scores
         }
 
 
@@ -214,6 +434,31 @@ class GymObjectDetector:
 # Utility
 # ------------------------------------------------------------------
 
+def _boxes_array(result) -> np.ndarray:
+    """An ultralytics result's boxes as an (n, 6) ``[x1, y1, x2, y2, conf, cls]`` array."""
+    boxes = result.boxes
+    if boxes is None or not len(boxes):
+        return np.zeros((0, 6), dtype=np.float32)
+    return np.concatenate([
+        boxes.xyxy.cpu().numpy(),
+        boxes.conf.cpu().numpy()[:, None],
+        boxes.cls.cpu().numpy()[:, None],
+    ], axis=1)
+
+
+def _cut_by_window(bbox: tuple, window: tuple, shape: tuple) -> bool:
+    """True if ``bbox`` touches an edge of the crop ``window`` that is not also an image edge."""
+    x1, y1, x2, y2 = bbox
+    wx1, wy1, wx2, wy2 = window
+    h, w = shape[:2]
+    return (
+        (x1 <= wx1 + _WINDOW_EDGE_PX and wx1 > 0)
+        or (y1 <= wy1 + _WINDOW_EDGE_PX and wy1 > 0)
+        or (x2 >= wx2 - _WINDOW_EDGE_PX and wx2 < w)
+        or (y2 >= wy2 - _WINDOW_EDGE_PX and wy2 < h)
+    )
+
+
 def _inside_bbox(point: tuple, bbox: tuple) -> bool:
     """Return True if (px, py) falls inside (x1, y1, x2, y2)."""
     px, py = point
@@ -10,12 +10,19 @@ Detection runs once during a short calibration phase (first N frames) while
 the athlete is standing still.  The detected target Y-coordinate is stored and
 reused for the full video.  If auto-detection fails, a ``manual_target_y``
 value can be provided as an override.
+
+``calibrate_from_background()`` is a one-shot alternative: the per-pixel
+median of a handful of frames sampled across the video is the empty scene
+(the athlete and the ball move, the wall does not), so the detectors run once,
+on that image at reduced resolution, with nothing occluding the target.
 """
 import logging
 
 import cv2
 import numpy as np
 
+from workout.utilities.frame_packet import FramePacket
+
 logger = logging.getLogger(__name__)
 
 # Approx. fraction of frame height above which the target is expected to be.
@@ -23,6 +30,9 @@ logger = logging.getLogger(__name__)
 # typical camera angle the target line appears in the upper ~40% of the frame.
 _TARGET_SEARCH_REGION_FRACTION = 0.60
 
+# Longest side the background image is reduced to before detection.
+_BACKGROUND_MAX_SIDE = 960
+
 # HSV colour ranges for common tape/target colours.
 # Each entry is ((h_lo, s_lo, v_lo), (h_hi, s_hi, v_hi)).
 _COLOUR_RANGES = [
@@ -89,7 +99,7 @@ class TargetDetector:
         Feed a frame during the calibration phase.
 
         Args:
-            frame:            BGR image.
+            frame:            BGR image or frame_packet.FramePacket.
             frame_idx:        Current frame index (used for logging only).
             athlete_wrist_y:  Y-pixel of the athlete's wrist when standing.
                               Used to sanity-check that the detected target is
@@ -102,9 +112,10 @@ class TargetDetector:
             return True
 
         self._frames_checked += 1
-        h, w = frame.shape[:2]
+        packet = FramePacket.wrap(frame)
+        h, w = packet.shape[:2]
         self._search_region_h = int(h * _TARGET_SEARCH_REGION_FRACTION)
-        search_region = frame[:self._search_region_h, :]
+        search_region = packet.region(0, self._search_region_h)
         self._debug_circles = []  # reset each frame
 
         y = (
@@ -127,6 +138,66 @@ class TargetDetector:
 
         return self.is_calibrated
 
+    def calibrate_from_background(
+        self,
+        frames: list,
+        athlete_wrist_y: int | None = None,
+        max_side: int | None = _BACKGROUND_MAX_SIDE,
+    ) -> bool:
+        """
+        Calibrate once on the temporal median background of ``frames``.
+
+        Args:
+            frames:          BGR images or FramePackets sampled sparsely across the video.
+            athlete_wrist_y: Median Y-pixel of the athlete's wrist over ``frames``.
+                             As in ``update()``, a target at or below it is rejected.
+            max_side:        Longest side the frames are reduced to before the median
+                             and detection (None keeps full resolution).
+
+        Returns:
+            True if a target was found; otherwise the detector stays uncalibrated
+            so per-frame ``update()`` calibration can still run.
+        """
+        if self.is_calibrated:
+            return True
+        if not frames:
+            return False
+
+        full_h = FramePacket.wrap(frames[0]).shape[0]
+        small = np.stack([FramePacket.wrap(frame).scaled(max_side).bgr for frame in frames])
+        background = FramePacket(np.median(small, axis=0).astype(np.uint8))
+        h, w = background.shape[:2]
+        scale = full_h / h
+        self._search_region_h = int(full_h * _TARGET_SEARCH_REGION_FRACTION)
+        search_region = background.region(0, int(h * _TARGET_SEARCH_REGION_FRACTION))
+        self._debug_circles = []
+        self.target_circle = None
+
+        y = (
+            self._detect_circle_target(search_region)
+            or self._detect_horizontal_line(search_region, w)
+            or self._detect_colour_target(search_region)
+        )
+        # Debug drawing works in full-frame coordinates.
+        self._debug_circles = [tuple(int(v * scale) for v in c) for c in self._debug_circles]
+        if self.target_circle:
+            self.target_circle = tuple(int(v * scale) for v in self.target_circle)
+        if y is None:
+            logger.info("No target found on the background of %d frames", len(frames))
+            return False
+        y = int(round(y * scale))
+        if athlete_wrist_y is not None and y >= athlete_wrist_y:
+            logger.info(
+                "Background target candidate y=%d is not above the athlete's wrist (y=%d); rejected",
+                y, athlete_wrist_y,
+            )
+            return False
+
+        self.target_y_px = y
+        self.is_calibrated = True
+        logger.info("Target calibrated at y=%d px from the background of %d frames", self.target_y_px, len(frames))
+        return True
+
     def is_target_reached(self, ball_centroid_y: int) -> bool:
         """
         Return True if the ball centroid is at or above the target line.
@@ -213,14 +284,13 @@ class TargetDetector:
             )
             self.is_calibrated = True   # Stop retrying even if we failed
 
-    def _detect_horizontal_line(self, region: np.ndarray, frame_width: int) -> int | None:
+    def _detect_horizontal_line(self, region, frame_width: int) -> int | None:
         """
         Use Canny edge detection + HoughLinesP to find a prominent horizontal
         tape line.  Returns the Y-coordinate of the best candidate line within
-        ``region``.
+        ``region`` (BGR image or FramePacket).
         """
-        gray = cv2.cvtColor(region, cv2.COLOR_BGR2GRAY)
-        blur = cv2.GaussianBlur(gray, (5, 5), 0)
+        blur = FramePacket.wrap(region).blurred_gray((5, 5), 0)
         edges = cv2.Canny(blur, 50, 150)
 
         min_length = int(frame_width * self.min_line_length_frac)
@@ -257,7 +327,7 @@ class TargetDetector:
                 cur_y, cur_count = y, 1
         return best_y
 
-    def _detect_circle_target(self, region: np.ndarray) -> int | None:
+    def _detect_circle_target(self, region) -> int | None:
         """
         Use HoughCircles to detect a circular rig/wall target.
 
@@ -265,8 +335,8 @@ class TargetDetector:
         in region-local coordinates.  All candidates are stored in
         ``self._debug_circles`` (full-frame coords) for visualisation.
         """
-        gray = cv2.cvtColor(region, cv2.COLOR_BGR2GRAY)
-        blur = cv2.GaussianBlur(gray, (9, 9), 2)
+        region = FramePacket.wrap(region)
+        blur = region.blurred_gray((9, 9), 2)
         h, w = region.shape[:2]
 
         # Try progressively looser thresholds so we don't miss a real target.
@@ -308,12 +378,13 @@ class TargetDetector:
         )
         return cy  # region-local Y; caller adds search_region offset if needed
 
-    def _detect_colour_target(self, region: np.ndarray) -> int | None:
+    def _detect_colour_target(self, region) -> int | None:
         """
         Segment common tape colours (green, yellow, red, blue) and find the
         topmost horizontal contour.
         """
-        hsv = cv2.cvtColor(region, cv2.COLOR_BGR2HSV)
+        region = FramePacket.wrap(region)
+        hsv = region.hsv
         combined_mask = np.zeros(hsv.shape[:2], dtype=np.uint8)
 
         for lo, hi in _COLOUR_RANGES:
@@ -0,0 +1,116 @@
+"""
+Ball trackers that bridge the frames between YOLO runs.
+
+GymObjectDetector seeds a tracker with every YOLO hit and asks it for the
+ball on the frames in between.  The trackers trade accuracy for speed
+differently, so the choice is per deployment (see benchmark_trackers.py):
+
+    'csrt'          OpenCV CSRT: most robust to blur and scale change, slowest
+    'kcf'           OpenCV KCF: several times faster, loses fast-moving balls sooner
+    'mosse'         OpenCV MOSSE (cv2.legacy): fastest correlation filter, fixed scale
+    'optical_flow'  Pyramidal Lucas-Kanade on corner points inside the box, moved
+                    by their median shift; seeding costs one corner search
+
+All of them implement ``init(frame, bbox)`` / ``update(frame)`` on BGR frames
+with (x, y, w, h) boxes, like OpenCV's trackers.
+"""
+import cv2
+import numpy as np
+
+DEFAULT_TRACKER = 'csrt'
+
+# Lucas-Kanade settings.
+_LK_PARAMS = dict(
+    winSize=(15, 15),
+    maxLevel=3,
+    criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 20, 0.03),
+)
+_MAX_CORNERS = 30
+_MIN_POINTS = 4
+# Forward-backward error above which a tracked point is discarded, px.
+_MAX_FB_ERROR = 1.5
+
+
+class OpenCVTracker:
+    """One of OpenCV's single-object trackers, created through ``factory`` on every seed."""
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._tracker = None
+
+    def init(self, frame: np.ndarray, bbox: tuple) -> None:
+        self._tracker = self._factory()
+        self._tracker.init(frame, bbox)
+
+    def update(self, frame: np.ndarray) -> tuple[bool, tuple]:
+        return self._tracker.update(frame)
+
+
+class OpticalFlowTracker:
+    """
+    Sparse pyramidal Lucas-Kanade tracker.
+
+    Tracks corner points inside the box from frame to frame, keeps those that
+    pass a forward-backward check, and moves the box by their median shift.
+    """
+
+    def __init__(self):
+        self._gray: np.ndarray | None = None
+        self._points: np.ndarray | None = None
+        self._bbox: tuple | None = None
+
+    def init(self, frame: np.ndarray, bbox: tuple) -> None:
+        self._gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        self._bbox = tuple(float(v) for v in bbox)
+        x, y, w, h = (int(v) for v in bbox)
+        mask = np.zeros_like(self._gray)
+        mask[max(y, 0):y + h, max(x, 0):x + w] = 255
+        self._points = cv2.goodFeaturesToTrack(
+            self._gray, maxCorners=_MAX_CORNERS, qualityLevel=0.01, minDistance=3, mask=mask,
+        )
+
+    def update(self, frame: np.ndarray) -> tuple[bool, tuple]:
+        if self._points is None or len(self._points) < _MIN_POINTS:
+            return False, (0, 0, 0, 0)
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        forward, status, _ = cv2.calcOpticalFlowPyrLK(self._gray, gray, self._points, None, **_LK_PARAMS)
+        backward, back_status, _ = cv2.calcOpticalFlowPyrLK(gray, self._gray, forward, None, **_LK_PARAMS)
+        fb_error = np.linalg.norm(self._points - backward, axis=2).reshape(-1)
+        good = (status.reshape(-1) == 1) & (back_status.reshape(-1) == 1) & (fb_error < _MAX_FB_ERROR)
+        if good.sum() < _MIN_POINTS:
+            self._points = None
+            return False, (0, 0, 0, 0)
+
+        dx, dy = np.median((forward - self._points).reshape(-1, 2)[good], axis=0)
+        x, y, w, h = self._bbox
+        self._bbox = (x + float(dx), y + float(dy), w, h)
+        self._gray = gray
+        self._points = forward[good].reshape(-1, 1, 2)
+        return True, self._bbox
+
+
+def _opencv_factory(name: str):
+    """``TrackerXXX_create`` from cv2.legacy or cv2, or None if this OpenCV build lacks it."""
+    for module in (getattr(cv2, 'legacy', None), cv2):
+        factory = getattr(module, f'Tracker{name}_create', None) if module is not None else None
+        if factory is not None:
+            return factory
+    return None
+
+
+_OPENCV_TRACKERS = {'csrt': 'CSRT', 'kcf': 'KCF', 'mosse': 'MOSSE'}
+TRACKERS = tuple(_OPENCV_TRACKERS) + ('optical_flow',)
+
+
+def create_tracker(name: str):
+    """
+    A new tracker of kind ``name`` (one of TRACKERS).
+
+    Returns None if this OpenCV build does not provide it.
+    """
+    if name == 'optical_flow':
+        return OpticalFlowTracker()
+    if name not in _OPENCV_TRACKERS:
+        raise ValueError(f"Unknown ball tracker '{name}'; expected one of {', '.join(TRACKERS)}")
+    factory = _opencv_factory(_OPENCV_TRACKERS[name])
+    return OpenCVTracker(factory) if factory is not None else None
@@ -4,24 +4,54 @@ detection specifically for wall ball shot analysis.
 
 Produces the same output dict shape as WorkoutAnalyser.analyse() so it
 is a drop-in replacement for the Celery task.
+
+Given a cached PoseTrack instead of a video, the analyser replays the recorded
+landmarks, ball positions and target through a fresh WallBallCounter — this
+is how rescore.py re-judges a video under new criteria without decoding it.
 """
 import logging
 import os
 from collections import deque
 
 import cv2
+import numpy as np
 
-import workout.utilities.PoseModule as pm
 from vision.llava_client import LLaVAClockDetectionError, LLaVATargetDetectionError
 from vision.vision_client import VisionClient
-from workout.utilities.movement_counters import WallBallCounter
-from workout.utilities.wall_ball.object_detector import GymObjectDetector
+from workout.utilities.frame_packet import FramePacket
+from workout.utilities.frame_pipeline import FramePipeline
+from workout.utilities.frame_source import open_frame_source
+from workout.utilities.keyframe_index import RandomAccessReader
+from workout.utilities.model_registry import get_model_registry
+from workout.utilities.movement_counters import WallBallCounter, seconds_to_frames
+from workout.utilities.pose_cache import (
+    BallRecorder, PoseTrack, PoseTrackSession, ReplayPoseDetector, default_detector_kwargs,
+)
+from workout.utilities.wall_ball.ball_trajectory import BallTrajectory, ball_search_window_enabled
+from workout.utilities.wall_ball.object_detector import adaptive_detection_enabled
 from workout.utilities.wall_ball.target_detector import TargetDetector
-from workout.utilities.utils import download_youtube_video, load_movement_criteria
+from workout.utilities.utils import analysis_stop_reason, analysis_stopped_entry, load_movement_criteria
+from workout.utilities.video_cache import open_video
+from workout.utilities.workout_analyser import movement_angle_series
 from vision.vision_utils import read_clock
 
 logger = logging.getLogger(__name__)
 
+_CALIBRATION_MODES = ('prescan', 'single_pass', 'background')
+
+# Ball-trajectory target estimate: seconds of video scanned, detections
+# needed to trust it, and the percentile of ball Y taken as the target height.
+_BALL_SCAN_SECONDS = 20.0
+_BALL_SCAN_MIN_DETECTIONS = 15
+_BALL_PEAK_PERCENTILE = 8.0
+
+# Background-model target estimate: frames sampled evenly over the first
+# _BACKGROUND_SPAN_SECONDS (or the whole video, if shorter) for the median image.
+_BACKGROUND_SAMPLES = 9
+_BACKGROUND_MIN_SAMPLES = 3
+_BACKGROUND_SPAN_SECONDS = 60.0
+_BACKGROUND_MIN_WRIST_VISIBILITY = 0.5
+
 
 class WallBallAnalyser:
     """
@@ -43,11 +73,36 @@ class WallBallAnalyser:
         target_y_px:            Manual target Y override (skips auto-detection).
         detect_every_n_frames:  YOLO runs every N frames; CSRT bridges the rest.
         calibration_frames:     Frames dedicated to target auto-detection.
+        pose_track:             Replay this cached track (with its ball track)
+                                instead of reading ``video_path``.
+        calibration_mode:       How the target is found when ``use_llava`` is False
+                                and no manual target is given (default from
+                                WALL_BALL_CALIBRATION_MODE, else 'prescan'):
+                                'prescan' runs a ball-only pass over the first
+                                ~20 s before the main pass; 'single_pass' buffers
+                                those frames during the main pass, resolves the
+                                target from them and replays them through the
+                                counter, so they are decoded and detected once;
+                                'background' runs the target detectors once on
+                                the median of a few frames sampled across the
+                                video and falls back to 'prescan' if that fails.
+        time_cap:               Workout.time_cap in seconds, measured from the
+                                frame analysis starts on (the workout start
+                                detected on the clock, or the start of the
+                                video); analysis stops there.
+        stop_at_expected_reps:  Stop once ``expected_reps`` good reps are counted
+                                (For Time workouts).
+        ball_search_window:     Run YOLO on a crop around the ball's predicted
+                                trajectory instead of the full frame (default
+                                from BALL_SEARCH_WINDOW, else off).
+        adaptive_detection:     Let the counter's rep phase set how often YOLO
+                                runs (default from ADAPTIVE_DETECTION, else off).
+                                Not combined with batched YOLO.
     """
 
     def __init__(
         self,
-        video_path: str,
+        video_path: str | None,
         expected_reps: int | None,
         criteria: dict,
         target_y_px: int | None = None,
@@ -55,16 +110,42 @@ class WallBallAnalyser:
         calibration_frames: int = 30,
         use_llava: bool = True,
         use_clock_detection: bool = False,
+        pose_track: PoseTrack | None = None,
+        calibration_mode: str | None = None,
+        time_cap: int | None = None,
+        stop_at_expected_reps: bool = False,
+        ball_search_window: bool | None = None,
+        adaptive_detection: bool | None = None,
     ):
+        calibration_mode = calibration_mode or os.environ.get('WALL_BALL_CALIBRATION_MODE', 'prescan')
+        if calibration_mode not in _CALIBRATION_MODES:
+            raise ValueError(
+                f"Unknown calibration_mode '{calibration_mode}'; expected one of {', '.join(_CALIBRATION_MODES)}"
+            )
         self.video_path = video_path
-        self.video = cv2.VideoCapture(video_path)
+        self.pose_track = pose_track
+        self.video = open_frame_source(video_path) if pose_track is None else None
         self.expected_reps = expected_reps
         self.criteria = criteria
         self.calibration_frames = calibration_frames
+        self.time_cap = time_cap
+        self.stop_at_expected_reps = stop_at_expected_reps
+        # Why analysis stopped before the end of the video, if it did.
+        self.stop_reason: str | None = None
 
         # Perception modules
-        self.pose_detector = pm.PoseDetector()
-        self.object_detector = GymObjectDetector(
+        if pose_track is None:
+            self._pose_session = PoseTrackSession(video_path)
+            self.pose_detector = self._pose_session.begin()
+        else:
+            self._pose_session = None
+            self.pose_detector = ReplayPoseDetector(pose_track)
+        # Replay: squat angle for every frame of the track in one vectorised pass.
+        self._replay_angles = (
+            movement_angle_series('wall_ball', pose_track.xy, pose_track.visibility)
+            if pose_track is not None else None
+        )
+        self.object_detector = get_model_registry().object_detector(
             detect_every_n_frames=detect_every_n_frames,
         )
         self.target_detector = TargetDetector(
@@ -86,31 +167,72 @@ class WallBallAnalyser:
         self._squat_ball_confidence: dict[int, dict] = {}
         self._last_squat_bottom_seen: int | None = None
 
+        # Re-scoring support: the ball track recorded alongside the pose track,
+        # the target as calibrated (before any ball-peak recalibration), and the
+        # video frame of each squat bottom so equipment verdicts can be replayed.
+        self._ball_recorder = BallRecorder()
+        self._calibrated_target_y: int | None = target_y_px
+        self._squat_bottom_video_frames: dict[int, int] = {}
+        self._equipment_verdicts: list[list] = []
+
         # Pass video FPS to the counter so it can convert frame numbers to seconds.
-        fps = self.video.get(cv2.CAP_PROP_FPS)
-        self.counter.set_fps(fps if fps > 0 else 30.0)
+        fps = pose_track.fps if pose_track is not None else self.video.get(cv2.CAP_PROP_FPS)
+        fps = fps if fps > 0 else 30.0
+        self._fps = fps
+        self.counter.set_fps(fps)
+        self._ball_scan_frames = seconds_to_frames(_BALL_SCAN_SECONDS, fps)
+
+        if ball_search_window is None:
+            ball_search_window = ball_search_window_enabled()
+        if ball_search_window and pose_track is None:
+            # The counter steps the trajectory; the detector searches around its prediction.
+            trajectory = BallTrajectory(fps)
+            self.counter.ball_trajectory = trajectory
+            self.object_detector.trajectory = trajectory
+
+        if adaptive_detection is None:
+            adaptive_detection = adaptive_detection_enabled()
+        if adaptive_detection and self.object_detector.batch_span() > 1:
+            # A batch is scheduled before the counter has seen its frames.
+            logger.warning("Adaptive detection cadence is not used with batched YOLO")
+            adaptive_detection = False
+        self._adaptive_detection = adaptive_detection
+        # Ball detections for the current batched window, by _frame_idx (see _analyse_window).
+        self._batched_balls: dict[int, dict | None] = {}
 
         self.llava_client: VisionClient | None = None
+        self._reader: RandomAccessReader | None = None
+
+        # Single-pass calibration: (frame_idx, landmarks, ball) for each frame seen
+        # before the target is resolved, or None once it is (or when not in use).
+        self._pending_frames: list[tuple] | None = None
+        self._pending_ball_ys: list[int] = []
 
-        if target_y_px is None:
+        if target_y_px is None and pose_track is None:
             if use_llava:
-                self.llava_client = VisionClient()
+                self.llava_client = get_model_registry().vision_client()
                 target_y = self._detect_target_with_llava()
-                self.target_detector.target_y_px = target_y
-                self.target_detector.is_calibrated = True
-                self.counter.set_target_y(target_y)
+                self._set_calibrated_target(target_y)
+            elif calibration_mode == 'single_pass':
+                self._pending_frames = []
+            elif calibration_mode == 'background' and self._background_target() is not None:
+                self._set_calibrated_target(self.target_detector.target_y_px)
             else:
                 scanned = self._pre_scan_target_from_ball()
                 if scanned is not None:
                     logger.info("Target detected from ball trajectory pre-scan: y=%d px", scanned)
-                    self.target_detector.target_y_px = scanned
-                    self.target_detector.is_calibrated = True
-                    self.counter.set_target_y(scanned)
+                    self._set_calibrated_target(scanned)
 
     # ------------------------------------------------------------------
     # LLaVA integration
     # ------------------------------------------------------------------
 
+    def _frame_reader(self) -> RandomAccessReader:
+        """Keyframe-aware reader over ``self.video`` for sparse, ascending frame samples."""
+        if self._reader is None:
+            self._reader = RandomAccessReader.for_video(self.video, self.video_path)
+        return self._reader
+
     def _find_workout_start_frame(self) -> int:
         """
         Scan the video every second looking for the 00:00 → 00:01 clock transition.
@@ -123,16 +245,9 @@ class WallBallAnalyser:
         max_seconds = 180
 
         prev_time = None
-        for second in range(max_seconds):
-            fn = int(fps * second)
-            if fn >= total_frames:
-                break
-
-            self.video.set(cv2.CAP_PROP_POS_FRAMES, fn)
-            ret, frame = self.video.read()
-            if not ret or frame is None:
-                continue
-
+        sample_frames = [int(fps * s) for s in range(max_seconds) if int(fps * s) < total_frames]
+        for fn, frame in self._frame_reader().read_frames(sample_frames):
+            second = round(fn / fps)
             clock_time = read_clock(frame, self.llava_client)
             logger.info("Clock scan at %ds: %s", second, clock_time)
 
@@ -173,23 +288,20 @@ class WallBallAnalyser:
 
         target_prompts = self.criteria.get('wall_ball', {}).get('target_location', {}).get('prompts', [])
 
+        reader = self._frame_reader()
         frame = None
         fraction = None
-        ret = False
-        for fn in retry_frames:
-            self.video.set(cv2.CAP_PROP_POS_FRAMES, fn)
-            ret, candidate = self.video.read()
-            if ret and candidate is not None:
-                frame = candidate
-                fraction = self.llava_client.ask_fraction(candidate, target_prompts)
-                if fraction is not None:
-                    logger.info("LLaVA target found at frame %d (fraction=%.2f)", fn, fraction)
-                    break
+        for fn, candidate in reader.read_frames(retry_frames):
+            frame = candidate
+            fraction = self.llava_client.ask_fraction(candidate, target_prompts)
+            if fraction is not None:
+                logger.info("LLaVA target found at frame %d (fraction=%.2f)", fn, fraction)
+                break
 
-        self.video.set(cv2.CAP_PROP_POS_FRAMES, getattr(self, '_workout_start_frame', 0))
+        reader.seek(getattr(self, '_workout_start_frame', 0))
         self._frame_idx = 0
 
-        if not ret or frame is None:
+        if frame is None:
             raise LLaVATargetDetectionError(
                 "Target could not be detected — could not read video frame."
             )
@@ -262,6 +374,9 @@ class WallBallAnalyser:
                 continue
 
             ball_dropped, raw_response = self.llava_client.ask_yes_no(jpeg_frames, prompt)
+            video_frame = self._squat_bottom_video_frames.get(squat_frame)
+            if video_frame is not None:
+                self._equipment_verdicts.append([video_frame, bool(ball_dropped)])
             entry['llava_equipment_response'] = raw_response
             entry['llava_equipment_present'] = not ball_dropped
 
@@ -280,6 +395,38 @@ class WallBallAnalyser:
 
         return stats
 
+    def _apply_recorded_equipment_checks(self, stats: dict) -> dict:
+        """
+        Replay counterpart of ``_run_equipment_checks``.
+
+        Re-applies the equipment verdicts stored with the pose track to the good
+        reps whose squat bottom falls within half a second of the original one.
+        New criteria can move a squat bottom by a few frames, but never by a rep.
+        """
+        verdicts = self.pose_track.extras.get('equipment_checks') or []
+        if not verdicts:
+            return stats
+
+        tolerance = (self.pose_track.fps or 30.0) / 2
+        for entry in stats.get('rep_log', []):
+            if not entry['is_good_rep']:
+                continue
+            video_frame = self._squat_bottom_video_frames.get(entry.get('squat_bottom_frame'))
+            if video_frame is None:
+                continue
+            nearest = min(verdicts, key=lambda v: abs(v[0] - video_frame))
+            if abs(nearest[0] - video_frame) > tolerance:
+                continue
+
+            entry['llava_equipment_present'] = not nearest[1]
+            if nearest[1]:
+                entry['is_good_rep'] = False
+                entry['no_rep_reason'] = 'Q'
+                stats['count'] = max(0, stats['count'] - 1)
+                stats['no_rep'] = stats['no_rep'] + 1
+
+        return stats
+
     # ------------------------------------------------------------------
     # Public API
     # ------------------------------------------------------------------
@@ -293,11 +440,18 @@ class WallBallAnalyser:
                 total_reps, no_reps, is_valid, is_scaled,
                 breakdown, rounds_completed, target_y_px.
         """
-        if not self.video.isOpened():
+        if self.pose_track is None and not self.video.isOpened():
             raise RuntimeError("Could not open video for wall ball analysis")
 
-        if hasattr(self, '_workout_start_frame'):
-            self.video.set(cv2.CAP_PROP_POS_FRAMES, self._workout_start_frame)
+        if self.pose_track is not None:
+            start_frame = self.pose_track.start_frame
+            self.pose_detector.seek(start_frame)
+        else:
+            start_frame = getattr(self, '_workout_start_frame', 0)
+            if hasattr(self, '_workout_start_frame'):
+                self.video.set(cv2.CAP_PROP_POS_FRAMES, self._workout_start_frame)
+            self.pose_detector = self._pose_session.seek(start_frame)
+        self._start_frame = start_frame
 
         has_frames = False
         _pose_detected = 0
@@ -306,16 +460,12 @@ class WallBallAnalyser:
         _min_angle = float('inf')
         _max_angle = float('-inf')
 
-        while True:
-            success, img = self.video.read()
-            if not success or img is None:
-                break
+        frames = self._replay_frames() if self.pose_track is not None else self._video_frames()
+        for results in frames:
             has_frames = True
 
-            result = self._process_frame(img)
-
             # Accumulate diagnostics returned from _process_frame
-            if result:
+            for result in results:
                 if result.get('pose_missing'):
                     _pose_missing += 1
                 elif result.get('angle_error'):
@@ -327,15 +477,36 @@ class WallBallAnalyser:
                         _min_angle = min(_min_angle, a)
                         _max_angle = max(_max_angle, a)
 
-            self._frame_idx += 1
-
-        self.video.release()
+            if self._check_stop():
+                break
+        # Shut the frame pipeline down before the video and the pose track are touched.
+        frames.close()
+
+        if self.video is not None:
+            fps = self.video.get(cv2.CAP_PROP_FPS)
+            frame_size = (
+                int(self.video.get(cv2.CAP_PROP_FRAME_WIDTH)),
+                int(self.video.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+            )
+            self.video.release()
 
         stats = self.counter.get_stats()
 
-        if self.llava_client and self._equipment_criteria:
+        if self.pose_track is not None:
+            stats = self._apply_recorded_equipment_checks(stats)
+        elif self.llava_client and self._equipment_criteria:
             stats = self._run_equipment_checks(stats)
 
+        if self._pose_session is not None:
+            self._pose_session.finish(
+                fps,
+                frame_size,
+                complete=self.stop_reason is None,
+                frames=len(self._ball_recorder),
+                ball=self._ball_recorder.to_array(),
+                extras={'equipment_checks': self._equipment_verdicts},
+            )
+
         # Diagnostic summary — always logged so you can see what happened
         logger.info(
             "Pose diagnostics: frames_with_pose=%d  frames_no_pose=%d  "
@@ -344,6 +515,15 @@ class WallBallAnalyser:
             _min_angle if _min_angle != float('inf') else -1,
             _max_angle if _max_angle != float('-inf') else -1,
         )
+        if self._adaptive_detection:
+            logger.info(
+                "Adaptive detection: YOLO ran on %d of %d frames", self.object_detector.yolo_frames, self._frame_idx,
+            )
+        if self.object_detector.trajectory is not None:
+            logger.info(
+                "Ball search window: %d YOLO frames found the ball in the crop, %d scanned the full frame",
+                self.object_detector.crop_scans, self.object_detector.full_scans,
+            )
         if _pose_detected == 0:
             logger.warning(
                 "No pose was detected in any frame. Check that the athlete is "
@@ -377,8 +557,10 @@ class WallBallAnalyser:
             'no_reps': total_no_reps,
             'good_reps': good_reps,
             'expected_reps': self.expected_reps,
-            'advance_reason': 'video_end',
+            'advance_reason': self.stop_reason or 'video_end',
         }]
+        if self.stop_reason is not None:
+            breakdown.append(analysis_stopped_entry(self.stop_reason, self._frame_idx, self._fps))
 
         return {
             'total_reps': total_reps,
@@ -390,6 +572,7 @@ class WallBallAnalyser:
             'rounds_completed': 1 if (is_valid and total_reps > 0) else 0,
             'target_y_px': self.target_detector.target_y_px,
             'rep_log': rep_log,
+            'pose_track_key': self._pose_session.key if self._pose_session is not None else None,
         }
 
     # ------------------------------------------------------------------
@@ -398,12 +581,12 @@ class WallBallAnalyser:
 
     def _pre_scan_target_from_ball(
         self,
-        max_frames: int = 600,
-        min_detections: int = 15,
-        peak_percentile: float = 8.0,
+        max_frames: int | None = None,
+        min_detections: int = _BALL_SCAN_MIN_DETECTIONS,
+        peak_percentile: float = _BALL_PEAK_PERCENTILE,
     ) -> int | None:
         """
-        Quick ball-only pass over the first ``max_frames`` frames.
+        Quick ball-only pass over the first ``max_frames`` frames (default: 20 s of video).
 
         Collects every ball centroid Y detected by YOLO, then takes the
         ``peak_percentile``-th percentile of those values as the target height.
@@ -413,68 +596,265 @@ class WallBallAnalyser:
         the ball's highest flight positions, which cluster around the target height.
 
         Args:
-            max_frames:       How many frames to scan (default 600 ≈ 20 s at 30 fps).
+            max_frames:       How many frames to scan (default: _BALL_SCAN_SECONDS' worth).
             min_detections:   Minimum ball detections required to trust the result.
             peak_percentile:  Percentile of ball-Y distribution used as target estimate.
 
         Returns:
             Target Y in pixels, or None if insufficient ball data was found.
         """
-        import numpy as np
 
         if not self.video.isOpened():
             return None
 
+        if max_frames is None:
+            max_frames = self._ball_scan_frames
         self.video.set(cv2.CAP_PROP_POS_FRAMES, 0)
         ball_ys: list[int] = []
         frame_idx = 0
 
         logger.info("Ball trajectory pre-scan: scanning up to %d frames…", max_frames)
 
-        while frame_idx < max_frames:
-            success, img = self.video.read()
-            if not success or img is None:
+        span = self.object_detector.batch_span()
+        exhausted = False
+        while frame_idx < max_frames and not exhausted:
+            chunk = []
+            while len(chunk) < span and frame_idx + len(chunk) < max_frames:
+                success, img = self.video.read()
+                if not success or img is None:
+                    exhausted = True
+                    break
+                chunk.append(img.copy() if span > 1 else img)
+            if not chunk:
                 break
 
             # Ball detection only — no pose needed here.
-            detection = self.object_detector.detect(img, frame_idx, athlete_torso_bbox=None)
-            ball = detection.get('ball')
-            if ball and ball.get('centroid'):
-                ball_ys.append(ball['centroid'][1])
+            detections = self.object_detector.detect_batch(
+                chunk, list(range(frame_idx, frame_idx + len(chunk))),
+            )
+            for detection in detections:
+                ball = detection.get('ball')
+                if ball and ball.get('centroid'):
+                    ball_ys.append(ball['centroid'][1])
 
-            frame_idx += 1
+            frame_idx += len(chunk)
 
         # Reset video to start for the main analysis loop.
         self.video.set(cv2.CAP_PROP_POS_FRAMES, 0)
         self._frame_idx = 0
         self.object_detector.reset_tracker()
 
-        if len(ball_ys) < min_detections:
-            logger.warning(
-                "Ball trajectory pre-scan: only %d detections in %d frames "
-                "(need %d) — falling back to image-based target detection.",
-                len(ball_ys), frame_idx, min_detections,
-            )
+        return _ball_peak_target(ball_ys, frame_idx, min_detections, peak_percentile)
+
+    def _background_target(self) -> int | None:
+        """
+        Target Y from TargetDetector's one-shot calibration on a median background.
+
+        Samples ``_BACKGROUND_SAMPLES`` frames evenly over the first
+        ``_BACKGROUND_SPAN_SECONDS`` of video.  The athlete and the ball are
+        elsewhere in most of them, so the per-pixel median is the empty wall
+        and the detectors need a single pass instead of up to
+        ``calibration_frames`` per-frame passes.
+
+        Returns:
+            Target Y in pixels, or None if too few frames were read or no
+            target was found on the background.
+        """
+        if not self.video.isOpened():
             return None
 
-        target_y = int(np.percentile(ball_ys, peak_percentile))
-        logger.info(
-            "Ball trajectory pre-scan complete: %d detections, "
-            "ball Y range [%d, %d], target estimate y=%d (p%.0f)",
-            len(ball_ys), min(ball_ys), max(ball_ys), target_y, peak_percentile,
+        span = seconds_to_frames(_BACKGROUND_SPAN_SECONDS, self._fps)
+        total_frames = int(self.video.get(cv2.CAP_PROP_FRAME_COUNT))
+        if total_frames > 0:
+            span = min(span, total_frames)
+        frame_numbers = np.linspace(0, span - 1, _BACKGROUND_SAMPLES).astype(int)
+        color = getattr(self.video, 'color', 'bgr')
+        frames = [FramePacket(img.copy(), color) for _, img in self._frame_reader().read_frames(frame_numbers)]
+
+        # Reset video to start for the main analysis loop.
+        self.video.set(cv2.CAP_PROP_POS_FRAMES, 0)
+
+        if len(frames) < _BACKGROUND_MIN_SAMPLES:
+            logger.info("Background target calibration: only %d frames read", len(frames))
+            return None
+        if not self.target_detector.calibrate_from_background(frames, self._median_wrist_y(frames)):
+            logger.info("No target on the background model; falling back to the ball pre-scan")
+            return None
+        logger.info("Target detected from background model: y=%d px", self.target_detector.target_y_px)
+        return self.target_detector.target_y_px
+
+    def _median_wrist_y(self, frames: list[FramePacket]) -> int | None:
+        """
+        Median left-wrist Y over ``frames`` (the check ``_update_target_detector`` does per frame).
+
+        Runs a static-image pose graph, separate from the session's detector,
+        so the main pass's pose state and recorded track are left untouched.
+        """
+        detector = get_model_registry().pose_detector(**{**default_detector_kwargs(), 'mode': True})
+        wrist_ys = []
+        for packet in frames:
+            detector.getPose(packet, draw=False)
+            lmList = detector.getPosition(packet, draw=False)
+            if lmList and lmList[15][3] >= _BACKGROUND_MIN_WRIST_VISIBILITY:
+                wrist_ys.append(lmList[15][2])
+        return int(np.median(wrist_ys)) if wrist_ys else None
+
+    def _set_calibrated_target(self, target_y: int) -> None:
+        """Adopt a calibrated target (LLaVA, pre-scan, TargetDetector or replay)."""
+        self.target_detector.target_y_px = target_y
+        self.target_detector.is_calibrated = True
+        self.counter.set_target_y(target_y)
+        self._calibrated_target_y = target_y
+
+    def _check_stop(self) -> bool:
+        """
+        True once further frames cannot change the score: the expected reps are
+        in (For Time) or the time cap has elapsed since the workout start.
+
+        Never stops while single-pass calibration still holds frames back, and
+        never on the rep count while equipment checks may still turn counted
+        reps into no-reps: the athlete's make-up reps must stay in the video.
+        """
+        if self._pending_frames is not None:
+            return False
+        # _frame_idx counts from _start_frame, the detected workout start.
+        self.stop_reason = analysis_stop_reason(
+            bool(
+                self.stop_at_expected_reps
+                and self.expected_reps
+                and self.counter.count >= self.expected_reps
+                and not self._equipment_checks_pending()
+            ),
+            self._frame_idx,
+            self._fps,
+            self.time_cap,
         )
-        return target_y
+        if self.stop_reason is not None:
+            logger.info("Stopping wall ball analysis %d frames after start: %s", self._frame_idx, self.stop_reason)
+        return self.stop_reason is not None
+
+    def _equipment_checks_pending(self) -> bool:
+        """True if a post-pass (LLaVA or recorded verdicts) may still override good reps."""
+        if self.pose_track is not None:
+            return bool(self.pose_track.extras.get('equipment_checks'))
+        return bool(self.llava_client and self._equipment_criteria)
+
+    def _video_frames(self):
+        """
+        Decode and pose-detect on the frame pipeline.
 
-    def _process_frame(self, img) -> dict:
+        Yields a list of diagnostic dicts per frame: empty while single-pass
+        calibration is buffering, and all buffered frames' results at once when
+        the target is resolved.
+        """
+        span = self.object_detector.batch_span()
+        window: list[tuple] = []
+        with FramePipeline(self.video, self.pose_detector) as frames:
+            for img, lmList in frames:
+                if span == 1:
+                    yield self._analyse_frame(img, lmList)
+                    self._frame_idx += 1
+                    continue
+                # Batched YOLO: hold frames back until a batch's worth is decoded.
+                # Copies, because the decoder and pose pipeline reuse their buffers.
+                packet = FramePacket.wrap(img)
+                window.append((FramePacket(packet.image.copy(), packet.color), lmList.copy()))
+                if len(window) == span:
+                    yield from self._analyse_window(window)
+                    window = []
+            if window:
+                yield from self._analyse_window(window)
+        if self._pending_frames is not None:
+            # Video shorter than the scan window.
+            yield self._resolve_pending_target()
+
+    def _analyse_frame(self, img, lmList) -> list[dict]:
+        if self._pending_frames is not None:
+            return self._buffer_frame(img, lmList)
+        return [self._process_frame(img, lmList)]
+
+    def _analyse_window(self, window: list[tuple]):
+        """Detect the ball on a window of frames in one batch, then analyse them in order."""
+        frame_indices = range(self._frame_idx, self._frame_idx + len(window))
+        detections = self.object_detector.detect_batch(
+            [img for img, _ in window],
+            list(frame_indices),
+            [_torso_bbox(lmList) if lmList else None for _, lmList in window],
+        )
+        self._batched_balls = {d['frame_idx']: d.get('ball') for d in detections}
+        for img, lmList in window:
+            yield self._analyse_frame(img, lmList)
+            self._frame_idx += 1
+        self._batched_balls = {}
+
+    def _replay_frames(self):
+        """Replay counterpart of _video_frames()."""
+        while self._frame_idx < len(self.pose_track):
+            yield [self._replay_frame()]
+            self._frame_idx += 1
+
+    def _process_frame(self, img, lmList) -> dict:
         """Process one frame. Returns a small diagnostic dict for the analyse() summary."""
-        _, buf = cv2.imencode(".jpg", img, [cv2.IMWRITE_JPEG_QUALITY, 85])
-        self._frame_deque.append(bytes(buf))
+        # JPEG windows only feed the LLaVA equipment checks.
+        if self.llava_client is not None and self._equipment_criteria:
+            self._frame_deque.append(FramePacket.wrap(img).jpeg(85))
 
-        # 1. Pose detection
-        img = self.pose_detector.getPose(img, draw=False)
-        lmList = self.pose_detector.getPosition(img, draw=False)
+        # 1. Pose detection — already run on the pipeline's inference thread.
+        self.pose_detector.lmList = lmList
 
         # 2. Target calibration — runs for the first N frames.
+        self._update_target_detector(img, lmList)
+
+        # 3. Ball detection — build athlete torso bbox from landmarks to filter FPs.
+        ball = self._detect_ball(img, lmList)
+        self._ball_recorder.append(ball, self._calibrated_target_y)
+        self.counter.update_ball_position(ball)
+
+        return self._count_frame(lmList)
+
+    def _buffer_frame(self, img, lmList) -> list[dict]:
+        """
+        Single-pass calibration: detect the ball and hold the counter inputs back.
+
+        Returns the buffered frames' diagnostics once the scan window is full,
+        otherwise an empty list.
+        """
+        self._update_target_detector(img, lmList)
+        ball = self._detect_ball(img, lmList)
+        if ball and ball.get('centroid'):
+            self._pending_ball_ys.append(ball['centroid'][1])
+        self._pending_frames.append((self._frame_idx, lmList.copy(), ball))
+        if len(self._pending_frames) >= self._ball_scan_frames:
+            return self._resolve_pending_target()
+        return []
+
+    def _resolve_pending_target(self) -> list[dict]:
+        """
+        Set the target from the buffered ball detections, then replay the
+        buffered frames through the counter.
+
+        Uses the same ball-peak percentile as the pre-scan; when there are too
+        few detections the image-based TargetDetector result (if any) stands.
+        """
+        pending, self._pending_frames = self._pending_frames, None
+        target_y = _ball_peak_target(self._pending_ball_ys, len(pending))
+        if target_y is not None:
+            logger.info("Target detected from buffered ball trajectory: y=%d px", target_y)
+            self._set_calibrated_target(target_y)
+
+        live_frame_idx = self._frame_idx
+        results = []
+        for frame_idx, lmList, ball in pending:
+            self._frame_idx = frame_idx
+            self.pose_detector.lmList = lmList
+            self._ball_recorder.append(ball, self._calibrated_target_y)
+            self.counter.update_ball_position(ball)
+            results.append(self._count_frame(lmList))
+        self._frame_idx = live_frame_idx
+        return results
+
+    def _update_target_detector(self, img, lmList) -> None:
+        """Feed the image-based TargetDetector until it has calibrated."""
         if not self.target_detector.is_calibrated:
             athlete_wrist_y = None
             if lmList and len(lmList) > 16:
@@ -482,27 +862,56 @@ class WallBallAnalyser:
             self.target_detector.update(img, self._frame_idx, athlete_wrist_y)
             if self.target_detector.is_calibrated and self.target_detector.target_y_px:
                 self.counter.set_target_y(self.target_detector.target_y_px)
+                self._calibrated_target_y = self.target_detector.target_y_px
                 logger.info(
                     "Target set at y=%d px after %d frames",
                     self.target_detector.target_y_px,
                     self._frame_idx,
                 )
 
-        # 3. Ball detection — build athlete torso bbox from landmarks to filter FPs.
+    def _detect_ball(self, img, lmList) -> dict | None:
+        """YOLO/tracker ball detection, filtered by the athlete's torso box."""
+        if self._frame_idx in self._batched_balls:
+            return self._batched_balls.pop(self._frame_idx)
+        if self._adaptive_detection:
+            # While single-pass calibration buffers, the counter lags: keep the fixed cadence.
+            self.object_detector.detection_interval = (
+                self.counter.ball_detection_interval() if self._pending_frames is None else None
+            )
         athlete_torso_bbox = _torso_bbox(lmList) if lmList else None
         detection = self.object_detector.detect(img, self._frame_idx, athlete_torso_bbox)
-        self.counter.update_ball_position(detection.get('ball'))
+        return detection.get('ball')
+
+    def _replay_frame(self) -> dict:
+        """Replay one recorded frame from ``self.pose_track`` through the counter."""
+        frame_no = self._start_frame + self._frame_idx
+        self.pose_detector.getPose(None, draw=False)
+        lmList = self.pose_detector.getPosition(None, draw=False)
+
+        target_y = self.pose_track.target_at(frame_no)
+        if target_y is not None and target_y != self._calibrated_target_y:
+            self._set_calibrated_target(target_y)
+
+        self.counter.update_ball_position(self.pose_track.ball_at(frame_no))
+        return self._count_frame(lmList, float(self._replay_angles[frame_no - self.pose_track.start_frame]))
 
+    def _count_frame(self, lmList, angle: float | None = None) -> dict:
+        """
+        Steps 4-5 of the per-frame pipeline; shared by live analysis and replay.
+
+        Replay passes the frame's ``angle`` from the precomputed series.
+        """
         # 4. Squat angle + counter
         if not lmList:
             return {'pose_missing': True}
 
-        try:
-            hip, knee, ankle = self.pose_detector.getLandmarkIndices(lmList, is_squat=True)
-            angle = self.pose_detector.getAngle(None, hip, knee, ankle)
-        except Exception as exc:
-            logger.debug("Angle computation failed on frame %d: %s", self._frame_idx, exc)
-            return {'angle_error': True}
+        if angle is None:
+            try:
+                hip, knee, ankle = self.pose_detector.getLandmarkIndices(lmList, is_squat=True)
+                angle = self.pose_detector.getAngle(None, hip, knee, ankle)
+            except Exception as exc:
+                logger.debug("Angle computation failed on frame %d: %s", self._frame_idx, exc)
+                return {'angle_error': True}
 
         wall_ball_criteria = self.criteria.get('wall_ball', {})
         direction = self.pose_detector.checkDirectionFromAngle(
@@ -524,6 +933,7 @@ class WallBallAnalyser:
                 'yolo_confidence': ball.get('confidence') if ball else None,
                 'loss_frames': self.counter._ball_loss_frames,
             }
+            self._squat_bottom_video_frames[new_squat_bottom] = self._start_frame + self._frame_idx
         self._last_squat_bottom_seen = new_squat_bottom
 
         # 5. Dynamic target recalibration from observed ball peaks.
@@ -566,6 +976,7 @@ def analyse_wall_ball_video(
     video_url: str,
     expected_reps: int | None = None,
     target_y_px: int | None = None,
+    time_cap: int | None = None,
 ) -> dict:
     """
     Download/locate a video and run wall ball analysis.
@@ -574,37 +985,56 @@ def analyse_wall_ball_video(
         video_url:      YouTube URL or local file path.
         expected_reps:  Target rep count for validity check.
         target_y_px:    Optional manual target Y coordinate (skips auto-detect).
+        time_cap:       Workout.time_cap in seconds; analysis stops once it has elapsed.
 
     Returns:
         Analysis result dict (same shape as WorkoutAnalyser.analyse()).
     """
     criteria = load_movement_criteria()
 
-    is_local = os.path.exists(video_url)
-    if is_local:
-        video_path = video_url
-        cleanup = False
-    else:
-        video_path = download_youtube_video(video_url)
-        cleanup = True
-
-    try:
+    with open_video(video_url) as video_path:
         analyser = WallBallAnalyser(
             video_path,
             expected_reps=expected_reps,
             criteria=criteria,
             target_y_px=target_y_px,
+            time_cap=time_cap,
         )
         return analyser.analyse()
-    finally:
-        if cleanup and os.path.exists(video_path):
-            os.unlink(video_path)
 
 
 # ------------------------------------------------------------------
 # Utility
 # ------------------------------------------------------------------
 
+def _ball_peak_target(
+    ball_ys: list[int],
+    frames_scanned: int,
+    min_detections: int = _BALL_SCAN_MIN_DETECTIONS,
+    peak_percentile: float = _BALL_PEAK_PERCENTILE,
+) -> int | None:
+    """
+    Target height from ball centroid Ys: their ``peak_percentile``-th percentile.
+
+    Returns None (after logging why) when there are fewer than ``min_detections``.
+    """
+    if len(ball_ys) < min_detections:
+        logger.warning(
+            "Ball trajectory scan: only %d detections in %d frames "
+            "(need %d) — falling back to image-based target detection.",
+            len(ball_ys), frames_scanned, min_detections,
+        )
+        return None
+
+    target_y = int(np.percentile(ball_ys, peak_percentile))
+    logger.info(
+        "Ball trajectory scan complete: %d detections, "
+        "ball Y range [%d, %d], target estimate y=%d (p%.0f)",
+        len(ball_ys), min(ball_ys), max(ball_ys), target_y, peak_percentile,
+    )
+    return target_y
+
+
 def _torso_bbox(lmList: list) -> tuple | None:
     """
     Build a rough torso bounding box from pose landmarks to use as a
@@ -614,14 +1044,10 @@ def _torso_bbox(lmList: list) -> tuple | None:
     """
     try:
         # Shoulders (11, 12) and hips (23, 24)
-        xs = [lmList[i][1] for i in (11, 12, 23, 24)]
-        ys = [lmList[i][2] for i in (11, 12, 23, 24)]
-        padding = 30
-        return (
-            min(xs) - padding,
-            min(ys) - padding,
-            max(xs) + padding,
-            max(ys) + padding,
-        )
-    except (IndexError, TypeError):
+        pts = np.asarray(lmList, dtype=np.float32)[[11, 12, 23, 24], 1:3]
+    except (IndexError, TypeError, ValueError):
         return None
+    padding = 30
+    x1, y1 = pts.min(axis=0) - padding
+    x2, y2 = pts.max(axis=0) + padding
+    return (int(x1), int(y1), int(x2), int(y2))
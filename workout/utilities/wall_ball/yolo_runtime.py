@@ -0,0 +1,226 @@
+"""
+Torch-free YOLOv8 inference on exported models (ONNX Runtime or OpenVINO).
+
+The ultralytics/PyTorch stack costs every worker a slow torch import, a
+large resident footprint and eager-mode CPU inference.  On CPU-only workers
+GymObjectDetector can instead run the same weights exported once to ONNX or
+OpenVINO IR, with the letterbox pre-processing and NMS post-processing that
+ultralytics would apply done here in NumPy/OpenCV.
+
+Exports live next to the .pt weights, in the layout ultralytics writes:
+
+    yolov8n.pt
+    yolov8n.onnx                          ONNX (backend 'onnx')
+    yolov8n_openvino_model/yolov8n.xml    OpenVINO IR (backend 'openvino')
+
+An export is reused while it is newer than the weights; ``export_model()``
+(``manage.py export_yolo``) creates or refreshes it and is the only step
+that still needs ultralytics and torch.
+"""
+import abc
+import logging
+import os
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+EXPORT_BACKENDS = ('onnx', 'openvino')
+
+# Input size the models are exported at and run at by default.
+_IMGSZ = 640
+# ultralytics predict() defaults.
+_CONF_THRESHOLD = 0.25
+_IOU_THRESHOLD = 0.7
+_MAX_DET = 300
+# Most confident candidates passed to NMS; the result is then capped at _MAX_DET.
+_MAX_NMS = 30000
+# Per-class box offset so one NMS pass never suppresses across classes.
+_CLASS_OFFSET = 7680
+_PAD_VALUE = 114
+
+
+def exported_model_path(model_path: str, backend: str) -> str:
+    """Where the ``backend`` export of the ``model_path`` weights lives."""
+    stem = os.path.splitext(model_path)[0]
+    if backend == 'onnx':
+        return stem + '.onnx'
+    if backend == 'openvino':
+        return os.path.join(stem + '_openvino_model', os.path.basename(stem) + '.xml')
+    raise ValueError(f"Unknown export backend {backend!r}; expected one of {', '.join(EXPORT_BACKENDS)}")
+
+
+def export_is_current(model_path: str, backend: str) -> bool:
+    """True if the export exists and is at least as new as the weights."""
+    path = exported_model_path(model_path, backend)
+    if not os.path.exists(path):
+        return False
+    return not os.path.exists(model_path) or os.path.getmtime(path) >= os.path.getmtime(model_path)
+
+
+def export_model(model_path: str, backend: str, force: bool = False) -> str:
+    """
+    Export the .pt weights for ``backend`` unless an up-to-date export exists.
+
+    Exports have dynamic batch and input sizes, so detect_batch() can send
+    several frames per call and search-window crops can run at a smaller size.
+
+    Returns:
+        Path of the exported model (see ``exported_model_path``).
+    """
+    path = exported_model_path(model_path, backend)
+    if not force and export_is_current(model_path, backend):
+        logger.info("YOLO %s export is up to date: %s", backend, path)
+        return path
+
+    try:
+        from ultralytics import YOLO  # noqa: PLC0415
+    except ImportError as exc:
+        raise ImportError(
+            "ultralytics is required to export the YOLO model. "
+            "Install it with: pip install ultralytics"
+        ) from exc
+
+    logger.info("Exporting %s to %s…", model_path, backend)
+    YOLO(model_path).export(format=backend, imgsz=_IMGSZ, dynamic=True)
+    if not os.path.exists(path):
+        raise RuntimeError(f"YOLO export finished but {path} was not written")
+    logger.info("YOLO %s export written to %s", backend, path)
+    return path
+
+
+def load_exported_model(model_path: str, backend: str) -> 'ExportedYolo':
+    """Runtime session for the ``backend`` export of ``model_path`` (which must exist)."""
+    path = exported_model_path(model_path, backend)
+    if not os.path.exists(path):
+        raise FileNotFoundError(
+            f"No {backend} export at {path}; run: python manage.py export_yolo --backend {backend}"
+        )
+    if not export_is_current(model_path, backend):
+        logger.warning("YOLO %s export %s is older than the weights; re-export it", backend, path)
+    if backend == 'onnx':
+        return OnnxYolo(path)
+    return OpenVinoYolo(path)
+
+
+class ExportedYolo(abc.ABC):
+    """
+    Callable YOLOv8 detector over an exported model.
+
+    ``model(frames, imgsz)`` takes BGR images and returns, per image, an (n, 6)
+    float32 array of ``[x1, y1, x2, y2, conf, cls]`` rows in image pixels,
+    sorted by confidence, like ultralytics' ``Results.boxes.data``.
+    """
+
+    # Fixed batch size / square input side of the exported input, or None if dynamic.
+    max_batch: int | None = None
+    input_size: int | None = None
+
+    def __call__(self, frames: list[np.ndarray], imgsz: int = _IMGSZ) -> list[np.ndarray]:
+        imgsz = self.input_size or imgsz
+        step = self.max_batch or len(frames)
+        detections = []
+        for start in range(0, len(frames), step):
+            chunk = frames[start:start + step]
+            inputs, letterboxes = zip(*(_letterbox(frame, imgsz) for frame in chunk))
+            outputs = self._infer(np.stack(inputs))
+            detections.extend(
+                _postprocess(output, frame.shape[:2], letterbox)
+                for output, frame, letterbox in zip(outputs, chunk, letterboxes)
+            )
+        return detections
+
+    @abc.abstractmethod
+    def _infer(self, batch: np.ndarray) -> np.ndarray:
+        """Raw model output, (N, 4 + classes, anchors), for an NCHW float32 batch."""
+
+
+class OnnxYolo(ExportedYolo):
+    def __init__(self, path: str):
+        try:
+            import onnxruntime  # noqa: PLC0415
+        except ImportError as exc:
+            raise ImportError(
+                "onnxruntime is required for the ONNX detector backend. "
+                "Install it with: pip install onnxruntime"
+            ) from exc
+        self._session = onnxruntime.InferenceSession(path, providers=['CPUExecutionProvider'])
+        model_input = self._session.get_inputs()[0]
+        self._input_name = model_input.name
+        self.max_batch = model_input.shape[0] if isinstance(model_input.shape[0], int) else None
+        self.input_size = model_input.shape[2] if isinstance(model_input.shape[2], int) else None
+
+    def _infer(self, batch: np.ndarray) -> np.ndarray:
+        return self._session.run(None, {self._input_name: batch})[0]
+
+
+class OpenVinoYolo(ExportedYolo):
+    def __init__(self, path: str):
+        try:
+            import openvino  # noqa: PLC0415
+        except ImportError as exc:
+            raise ImportError(
+                "openvino is required for the OpenVINO detector backend. "
+                "Install it with: pip install openvino"
+            ) from exc
+        self._model = openvino.Core().compile_model(path, 'CPU')
+        shape = self._model.input(0).get_partial_shape()
+        self.max_batch = shape[0].get_length() if shape[0].is_static else None
+        self.input_size = shape[2].get_length() if shape[2].is_static else None
+
+    def _infer(self, batch: np.ndarray) -> np.ndarray:
+        return self._model(batch)[self._model.output(0)]
+
+
+# ------------------------------------------------------------------
+# Pre- and post-processing (as ultralytics does it)
+# ------------------------------------------------------------------
+
+def _letterbox(frame: np.ndarray, imgsz: int = _IMGSZ) -> tuple[np.ndarray, tuple]:
+    """
+    Resize ``frame`` to fit ``imgsz``, pad it to a square and convert to CHW RGB in [0, 1].
+
+    Returns the input tensor and (gain, pad_x, pad_y) to map boxes back.
+    """
+    h, w = frame.shape[:2]
+    gain = min(imgsz / h, imgsz / w)
+    new_w, new_h = round(w * gain), round(h * gain)
+    if (new_w, new_h) != (w, h):
+        frame = cv2.resize(frame, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+    pad_x, pad_y = (imgsz - new_w) / 2, (imgsz - new_h) / 2
+    top, bottom = round(pad_y - 0.1), round(pad_y + 0.1)
+    left, right = round(pad_x - 0.1), round(pad_x + 0.1)
+    frame = cv2.copyMakeBorder(frame, top, bottom, left, right, cv2.BORDER_CONSTANT, value=(_PAD_VALUE,) * 3)
+    tensor = frame[:, :, ::-1].transpose(2, 0, 1).astype(np.float32) / 255.0
+    return np.ascontiguousarray(tensor), (gain, left, top)
+
+
+def _postprocess(output: np.ndarray, shape: tuple, letterbox: tuple) -> np.ndarray:
+    """Confidence filter, per-class NMS and mapping back to image pixels for one image's output."""
+    predictions = output.T                       # (anchors, 4 + classes)
+    scores = predictions[:, 4:]
+    cls = scores.argmax(axis=1)
+    conf = scores[np.arange(len(cls)), cls]
+    keep = conf > _CONF_THRESHOLD
+    if not keep.any():
+        return np.zeros((0, 6), dtype=np.float32)
+    boxes, conf, cls = predictions[keep, :4], conf[keep], cls[keep]
+    if len(conf) > _MAX_NMS:
+        top = np.argsort(-conf, kind='stable')[:_MAX_NMS]
+        boxes, conf, cls = boxes[top], conf[top], cls[top]
+
+    # (cx, cy, w, h) -> (x, y, w, h), shifted per class for class-aware NMS.
+    xywh = boxes.copy()
+    xywh[:, :2] -= xywh[:, 2:] / 2
+    shifted = xywh.copy()
+    shifted[:, :2] += cls[:, None] * _CLASS_OFFSET
+    kept = cv2.dnn.NMSBoxes(shifted.tolist(), conf.tolist(), _CONF_THRESHOLD, _IOU_THRESHOLD)
+    kept = np.asarray(kept, dtype=int).reshape(-1)[:_MAX_DET]
+
+    gain, pad_x, pad_y = letterbox
+    h, w = shape
+    xyxy = np.concatenate([xywh[kept, :2], xywh[kept, :2] + xywh[kept, 2:]], axis=1)
+    xyxy[:, [0, 2]] = ((xyxy[:, [0, 2]] - pad_x) / gain).clip(0, w)
+    xyxy[:, [1, 3]] = ((xyxy[:, [1, 3]] - pad_y) / gain).clip(0, h)
+    return np.concatenate([xyxy, conf[kept, None], cls[kept, None]], axis=1).astype(np.float32)
@@ -10,14 +10,26 @@ import logging
 import os
 
 import cv2
+import numpy as np
 
 import workout.utilities.PoseModule as pm
-from workout.utilities.movement_classifier import MovementClassifier
+from workout.utilities.frame_pipeline import FramePipeline
+from workout.utilities.frame_source import open_frame_source
+from workout.utilities.model_registry import get_model_registry
+from workout.utilities.motion_sampler import MotionSampler, motion_sampling_enabled
+from workout.utilities.pose_cache import BallRecorder, PoseTrack, PoseTrackSession, ReplayPoseDetector
 from workout.utilities.movement_counters import (
     PullUpCounter, PushUpCounter, SquatCounter, ThrusterCounter, ToesToBarCounter,
     WallBallCounter,
 )
-from workout.utilities.utils import download_youtube_video, load_movement_criteria
+from workout.utilities.utils import (
+    VideoStream,
+    analysis_stop_reason,
+    analysis_stopped_entry,
+    load_movement_criteria,
+    video_ingest_mode,
+)
+from workout.utilities.video_cache import get_video_cache, open_video
 
 logger = logging.getLogger(__name__)
 
@@ -25,12 +37,45 @@ logger = logging.getLogger(__name__)
 def _torso_bbox(lmList: list) -> tuple | None:
     """Rough torso bounding box from pose landmarks for ball-detection false-positive filtering."""
     try:
-        xs = [lmList[i][1] for i in (11, 12, 23, 24)]
-        ys = [lmList[i][2] for i in (11, 12, 23, 24)]
-        padding = 30
-        return (min(xs) - padding, min(ys) - padding, max(xs) + padding, max(ys) + padding)
-    except (IndexError, TypeError):
+        pts = np.asarray(lmList, dtype=np.float32)[[11, 12, 23, 24], 1:3]
+    except (IndexError, TypeError, ValueError):
         return None
+    padding = 30
+    x1, y1 = pts.min(axis=0) - padding
+    x2, y2 = pts.max(axis=0) + padding
+    return (int(x1), int(y1), int(x2), int(y2))
+
+
+def movement_angle_series(movement: str, xy, visibility) -> np.ndarray | None:
+    """
+    Whole-video equivalent of ``WorkoutAnalyser._get_angle``.
+
+    Args:
+        movement:   Internal movement key (e.g. 'squat').
+        xy:         (N, 33, 2) landmark pixel coordinates.
+        visibility: (N, 33) landmark visibility scores.
+
+    Returns:
+        (N,) array of primary joint angles, or None for unsupported movements.
+    """
+    if movement in ('squat', 'thruster', 'wall_ball'):
+        angles = pm.batch_angles(xy, {
+            name: pm.JOINT_TRIPLETS[name]
+            for name in ('left_hip_knee_ankle', 'right_hip_knee_ankle')
+        })
+        return pm.visible_side_series(
+            angles['left_hip_knee_ankle'], angles['right_hip_knee_ankle'], visibility,
+        )
+
+    if movement in ('push_up', 'pull_up'):
+        triplet = {'right_shoulder_elbow_wrist': pm.JOINT_TRIPLETS['right_shoulder_elbow_wrist']}
+        return pm.batch_angles(xy, triplet)['right_shoulder_elbow_wrist']
+
+    if movement == 'toes_to_bar':
+        triplet = {'right_hip_knee_ankle': pm.JOINT_TRIPLETS['right_hip_knee_ankle']}
+        return pm.batch_angles(xy, triplet)['right_hip_knee_ankle']
+
+    return None
 
 
 # Maps human-readable movement names (from the DB) to the internal classifier keys.
@@ -87,7 +132,7 @@ class WorkoutPlan:
     For AMRAP workouts the sequence repeats until the video ends.
     """
 
-    def __init__(self, components: list, workout_type: str = 'FT'):
+    def __init__(self, components: list, workout_type: str = 'FT', time_cap: int | None = None):
         """
         Args:
             components: list of dicts, each with:
@@ -95,10 +140,12 @@ class WorkoutPlan:
                         - expected_reps: int or None
                         - sequence: int (ordering key)
             workout_type: 'FT' (For Time), 'AMRAP', or 'FW' (For Weight)
+            time_cap: Workout.time_cap in seconds, or None for no cap
         """
         self.components = sorted(components, key=lambda c: c['sequence'])
         self.workout_type = workout_type
         self.is_amrap = workout_type == 'AMRAP'
+        self.time_cap = time_cap
 
     def get_current_spec(self, plan_index: int) -> dict | None:
         """Return the movement spec at plan_index, wrapping around for AMRAP."""
@@ -128,19 +175,59 @@ class WorkoutAnalyser:
     - Accumulate per-set results across the full video.
     """
 
-    def __init__(self, video_path: str, workout_plan: WorkoutPlan, criteria: dict):
+    def __init__(
+        self,
+        video_path: str | None,
+        workout_plan: WorkoutPlan,
+        criteria: dict,
+        pose_track: PoseTrack | None = None,
+        stream=None,
+    ):
         """
         Args:
             video_path: Local filesystem path to the video file.
             workout_plan: WorkoutPlan instance.
             criteria: Movement analysis criteria loaded from JSON config.
+            pose_track: Replay this cached track instead of reading ``video_path``.
+                        Ball positions only exist for frames the original run
+                        analysed as wall ball.
+            stream: utils.VideoStream to analyse while it downloads; ``video_path``
+                    is then its spool file.
         """
-        self.video = cv2.VideoCapture(video_path)
+        self.pose_track = pose_track
         self.plan = workout_plan
         self.criteria = criteria
+        has_wall_ball = any(c['movement'] == 'wall_ball' for c in workout_plan.components)
 
-        self.detector = pm.PoseDetector()
-        self.classifier = MovementClassifier(buffer_size=15)
+        # Replays cached landmarks when this exact video has been analysed before.
+        if pose_track is None:
+            # Without wall balls the frames only feed MediaPipe, so the decoder may
+            # emit RGB at inference size; YOLO and the target detector need full-size BGR.
+            self._pose_session = PoseTrackSession(
+                video_path,
+                streaming=stream is not None,
+                motion_sampling=motion_sampling_enabled(),
+                pose_only=not has_wall_ball,
+            )
+            self.detector = self._pose_session.begin()
+            decode = self._pose_session.decode
+            self.video = open_frame_source(
+                video_path, color=decode['color'], max_side=decode['max_side'], stream=stream,
+            )
+        else:
+            self.video = None
+            self._pose_session = None
+            self.detector = ReplayPoseDetector(pose_track)
+        # Counting windows are time-based; convert them at the rate frames arrive.
+        fps = pose_track.fps if pose_track is not None else self.video.get(cv2.CAP_PROP_FPS)
+        self._fps = fps if fps and fps > 0 else 30.0
+        self.classifier = get_model_registry().movement_classifier(buffer_size=15)
+        self.classifier.set_fps(self._fps)
+
+        # Skips pose inference on static stretches; pointless when replaying landmarks.
+        self._sampler = None
+        if pose_track is None and motion_sampling_enabled() and not self._pose_session.is_replay:
+            self._sampler = MotionSampler(self._fps)
 
         # Note: the JSON config key for push-ups is 'pushup', not 'push_up'.
         self.counters: dict = {
@@ -156,14 +243,35 @@ class WorkoutAnalyser:
         self._target_detector = None
         self._wall_ball_frame_idx: int = 0
         self._wall_ball_calibration_frames: int = 30
-        if any(c['movement'] == 'wall_ball' for c in workout_plan.components):
-            from workout.utilities.wall_ball.object_detector import GymObjectDetector  # noqa: PLC0415
+        self._adaptive_detection = False
+        if has_wall_ball:
+            from workout.utilities.wall_ball.ball_trajectory import (  # noqa: PLC0415
+                BallTrajectory, ball_search_window_enabled,
+            )
+            from workout.utilities.wall_ball.object_detector import adaptive_detection_enabled  # noqa: PLC0415
             from workout.utilities.wall_ball.target_detector import TargetDetector  # noqa: PLC0415
             self.counters['wall_ball'] = WallBallCounter(criteria.get('wall_ball', {}))
-            self._object_detector = GymObjectDetector()
+            self.counters['wall_ball'].set_fps(self._fps)
+            self._object_detector = get_model_registry().object_detector()
             self._target_detector = TargetDetector(
                 calibration_frames=self._wall_ball_calibration_frames,
             )
+            if pose_track is None and ball_search_window_enabled():
+                # The counter steps the trajectory; the detector searches around its prediction.
+                trajectory = BallTrajectory(self._fps)
+                self.counters['wall_ball'].ball_trajectory = trajectory
+                self._object_detector.trajectory = trajectory
+            # The counter's rep phase sets how often YOLO runs.
+            self._adaptive_detection = pose_track is None and adaptive_detection_enabled()
+
+        # Per-frame ball positions, stored with the pose track for re-scoring.
+        self._ball_recorder = BallRecorder()
+        self._frame_ball: dict | None = None
+        self._frame_no: int = pose_track.start_frame if pose_track is not None else 0
+        # First analysed frame: the time cap's origin.
+        self._start_frame: int = self._frame_no
+        # Replay: each movement's angle series over the whole track, computed on first use.
+        self._replay_angles: dict[str, np.ndarray | None] = {}
 
         # State
         self.plan_index: int = 0
@@ -171,6 +279,8 @@ class WorkoutAnalyser:
         self.completed_sets: list = []
         self.current_movement: str | None = None
         self.current_counter = None
+        # Why analysis stopped before the end of the video, if it did.
+        self.stop_reason: str | None = None
 
     # ------------------------------------------------------------------
     # Internal helpers
@@ -178,6 +288,9 @@ class WorkoutAnalyser:
 
     def _get_angle(self, movement: str, lmList: list):
         """Return the primary joint angle for the given movement type."""
+        if self.pose_track is not None:
+            return self._replay_angle(movement)
+
         if movement in ('squat', 'thruster'):
             # Both squat and thruster use hip-knee-ankle as the primary angle.
             # ThrusterCounter handles the additional overhead check internally.
@@ -199,6 +312,17 @@ class WorkoutAnalyser:
 
         return None
 
+    def _replay_angle(self, movement: str) -> float | None:
+        """_get_angle() for the current replayed frame, read from a vectorised series."""
+        if movement not in self._replay_angles:
+            self._replay_angles[movement] = movement_angle_series(
+                movement, self.pose_track.xy, self.pose_track.visibility,
+            )
+        series = self._replay_angles[movement]
+        if series is None:
+            return None
+        return float(series[self._frame_no - self.pose_track.start_frame])
+
     def _save_current_set(self, reason: str) -> None:
         """Append the in-progress set to completed_sets."""
         if self.current_counter is None:
@@ -264,6 +388,21 @@ class WorkoutAnalyser:
 
         logger.info("Switched to movement: %s (plan index %d)", new_movement, self.plan_index)
 
+    def _check_stop(self) -> bool:
+        """
+        True once further frames cannot change the score: a For Time plan is
+        complete, or the time cap has elapsed since the first analysed frame.
+        """
+        self.stop_reason = analysis_stop_reason(
+            bool(self.plan.components) and self.plan.is_complete(self.plan_index),
+            self._frame_no - self._start_frame,
+            self._fps,
+            self.plan.time_cap,
+        )
+        if self.stop_reason is not None:
+            logger.info("Stopping analysis at frame %d: %s", self._frame_no, self.stop_reason)
+        return self.stop_reason is not None
+
     def _reps_target_reached(self) -> bool:
         """True if the current counter has hit the required reps for this set."""
         if self.current_counter is None or not self.plan.components:
@@ -322,10 +461,19 @@ class WorkoutAnalyser:
 
         if self.current_movement and self.current_counter:
             # Wall ball: run ball detection and target calibration before counting.
-            if self.current_movement == 'wall_ball' and self._object_detector is not None:
+            if self.current_movement == 'wall_ball' and self.pose_track is not None:
+                target_y = self.pose_track.target_at(self._frame_no)
+                if target_y is not None and target_y != self.current_counter.target_y_px:
+                    self.current_counter.set_target_y(target_y)
+                self.current_counter.update_ball_position(self.pose_track.ball_at(self._frame_no))
+
+            elif self.current_movement == 'wall_ball' and self._object_detector is not None:
+                if self._adaptive_detection:
+                    self._object_detector.detection_interval = self.current_counter.ball_detection_interval()
                 athlete_torso_bbox = _torso_bbox(lmList) if lmList else None
                 detection = self._object_detector.detect(img, self._wall_ball_frame_idx, athlete_torso_bbox)
-                self.current_counter.update_ball_position(detection.get('ball'))
+                self._frame_ball = detection.get('ball')
+                self.current_counter.update_ball_position(self._frame_ball)
 
                 if not self._target_detector.is_calibrated:
                     wrist_y = lmList[15][2] if lmList and len(lmList) > 16 else None
@@ -378,26 +526,70 @@ class WorkoutAnalyser:
                 total_reps (int), no_reps (int), is_valid (bool), is_scaled (bool),
                 breakdown (list of per-set dicts), rounds_completed (int)
         """
+        if self.pose_track is not None:
+            return self._replay_track()
+
         if not self.video.isOpened():
             raise RuntimeError("Could not open video for analysis")
 
         has_frames = False
-        while True:
-            success, img = self.video.read()
-            if not success or img is None:
+        with FramePipeline(self.video, self.detector, sampler=self._sampler) as frames:
+            for img, lmList in frames:
+                has_frames = True
+                self.detector.lmList = lmList
+                self._frame_ball = None
+                self.process_frame(img, lmList)
+                self._ball_recorder.append(self._frame_ball, self._current_target_y())
+                if self._check_stop():
+                    break
+                self._frame_no += 1
+                if self._sampler is not None:
+                    # Full rate while a rep is in progress (takes effect up to a queue's worth of frames later).
+                    self._sampler.hold = self.current_counter is not None and self.current_counter.in_rep()
+        if self._sampler is not None:
+            self._sampler.log_summary()
+
+        self._pose_session.finish(
+            self.video.get(cv2.CAP_PROP_FPS),
+            self.video.source_size,
+            # A streamed video is only cacheable once its spool holds the whole file;
+            # a track cut short by early termination is stored as incomplete.
+            complete=getattr(self.video, 'complete', True) and self.stop_reason is None,
+            frames=len(self._ball_recorder),
+            ball=self._ball_recorder.to_array() if self._object_detector is not None else None,
+        )
+        self.video.release()
+
+        result = self._summarise(has_frames)
+        result['pose_track_key'] = self._pose_session.key
+        return result
+
+    def _replay_track(self) -> dict:
+        """analyse() over ``self.pose_track`` — no video decoding or model inference."""
+        self.detector.seek(self.pose_track.start_frame)
+        for _ in range(len(self.pose_track)):
+            self.detector.getPose(None, draw=False)
+            lmList = self.detector.getPosition(None, draw=False)
+            self.process_frame(None, lmList)
+            if self._check_stop():
                 break
-            has_frames = True
-            img = self.detector.getPose(img, draw=False)
-            lmList = self.detector.getPosition(img, draw=False)
-            self.process_frame(img, lmList)
+            self._frame_no += 1
+        return self._summarise(has_frames=len(self.pose_track) > 0)
 
-        self.video.release()
+    def _current_target_y(self) -> int | None:
+        """Calibrated wall ball target for the current set, or None."""
+        if self._target_detector is None or not self._target_detector.is_calibrated:
+            return None
+        return self._target_detector.target_y_px
+
+    def _summarise(self, has_frames: bool) -> dict:
+        """Close the in-progress set and build the analyse() result dict."""
 
         # Persist any in-progress set at the end of the video
         if self.current_movement and self.current_counter:
             in_progress = self.current_counter.get_stats()
             if in_progress['count'] > 0 or in_progress['no_rep'] > 0:
-                self._save_current_set(reason='video_end')
+                self._save_current_set(reason=self.stop_reason or 'video_end')
 
         total_reps = sum(s['reps'] for s in self.completed_sets)
         total_no_reps = sum(s['no_reps'] for s in self.completed_sets)
@@ -418,13 +610,17 @@ class WorkoutAnalyser:
             else (1 if self.plan_index >= len(self.plan.components) else 0)
         )
 
+        breakdown = list(self.completed_sets)
+        if self.stop_reason is not None:
+            breakdown.append(analysis_stopped_entry(self.stop_reason, self._frame_no - self._start_frame, self._fps))
+
         return {
             'total_reps': total_reps,
             'no_reps': total_no_reps,
             'good_reps': total_good_reps,
             'is_valid': is_valid,
             'is_scaled': False,
-            'breakdown': self.completed_sets,
+            'breakdown': breakdown,
             'rounds_completed': rounds_completed,
         }
 
@@ -437,6 +633,7 @@ def analyse_workout_video(
     video_url: str,
     workout_components: list,
     workout_type: str = 'FT',
+    time_cap: int | None = None,
 ) -> dict:
     """
     Download a video and run multi-movement workout analysis.
@@ -448,6 +645,7 @@ def analyse_workout_video(
                             - expected_reps (int | None): target reps for the set
                             - sequence (int): ordering position in the workout
         workout_type: 'FT' (For Time), 'AMRAP', or 'FW' (For Weight)
+        time_cap: Workout.time_cap in seconds; analysis stops once it has elapsed.
 
     Returns:
         dict: Analysis result including total_reps, no_reps, is_valid, is_scaled,
@@ -468,19 +666,16 @@ def analyse_workout_video(
     if normalised and all(c['movement'] == 'wall_ball' for c in normalised):
         from workout.utilities.wall_ball.wall_ball_analyser import WallBallAnalyser  # noqa: PLC0415
         total_expected = sum(c['expected_reps'] for c in normalised if c.get('expected_reps'))
-        is_local = os.path.exists(video_url)
-        video_path = video_url if is_local else download_youtube_video(video_url)
-        try:
+        with open_video(video_url) as video_path:
             analyser = WallBallAnalyser(
                 video_path,
                 expected_reps=total_expected or None,
                 criteria=criteria,
                 target_y_px=None,
+                time_cap=time_cap,
+                stop_at_expected_reps=workout_type != 'AMRAP',
             )
             return analyser.analyse()
-        finally:
-            if not is_local and os.path.exists(video_path):
-                os.unlink(video_path)
 
     # Dispatch to barbell analyser when all components are the same barbell movement.
     if normalised and all(c['movement'] in _BARBELL_MOVEMENTS for c in normalised):
@@ -488,27 +683,33 @@ def analyse_workout_video(
         if all(c['movement'] == movement_type for c in normalised):
             from workout.utilities.barbell.barbell_analyser import BarbellAnalyser  # noqa: PLC0415
             total_expected = sum(c['expected_reps'] for c in normalised if c.get('expected_reps'))
-            is_local = os.path.exists(video_url)
-            video_path = video_url if is_local else download_youtube_video(video_url)
-            try:
+            with open_video(video_url) as video_path:
                 analyser = BarbellAnalyser(
                     video_path,
                     movement_type=movement_type,
                     expected_reps=total_expected or None,
                     criteria=criteria,
+                    time_cap=time_cap,
+                    stop_at_expected_reps=workout_type != 'AMRAP',
                 )
                 return analyser.analyse()
-            finally:
-                if not is_local and os.path.exists(video_path):
-                    os.unlink(video_path)
 
-    plan = WorkoutPlan(normalised, workout_type=workout_type)
+    plan = WorkoutPlan(normalised, workout_type=workout_type, time_cap=time_cap)
 
-    is_local = os.path.exists(video_url)
-    video_path = video_url if is_local else download_youtube_video(video_url)
-    try:
+    video_cache = get_video_cache()
+    have_local_copy = os.path.exists(video_url) or (video_cache is not None and video_cache.get(video_url))
+    if not have_local_copy and video_ingest_mode() == 'stream':
+        # Decode while downloading; the analysis loop never seeks, so no full copy is needed first.
+        stream = VideoStream(video_url)
+        try:
+            analyser = WorkoutAnalyser(stream.spool_path, plan, criteria, stream=stream)
+            result = analyser.analyse()
+            if video_cache is not None and analyser.video.complete:
+                video_cache.add(video_url, stream.spool_path)
+            return result
+        finally:
+            stream.close()
+
+    with open_video(video_url) as video_path:
         analyser = WorkoutAnalyser(video_path, plan, criteria)
         return analyser.analyse()
-    finally:
-        if not is_local and os.path.exists(video_path):
-            os.unlink(video_path)
@@ -1,5 +1,6 @@
 import logging
 
+from celery.result import AsyncResult
 from django.db.models import Sum
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
@@ -13,7 +14,7 @@ from workout.serializers import (
     WorkoutComponentSerializer, VideoSerializer, VideoScore,
     MovementSerializer,
 )
-from workout.tasks import analyse_video
+from workout.tasks import analyse_video, rescore_workout
 
 
 class MovementViewSet(viewsets.ReadOnlyModelViewSet):
@@ -33,7 +34,7 @@ class WorkoutsViewSet(viewsets.ModelViewSet):
         return WorkoutSerializer
 
     def get_permissions(self):
-        if self.action in ('create', 'update', 'partial_update', 'destroy', 'activate'):
+        if self.action in ('create', 'update', 'partial_update', 'destroy', 'activate', 'rescore', 'rescore_result'):
             return [IsCompetitionAdmin()]
         return [IsAuthenticated()]
 
@@ -64,6 +65,40 @@ class WorkoutsViewSet(viewsets.ModelViewSet):
         workout.save()
         return Response({'id': workout.id, 'is_active': workout.is_active})
 
+    @action(detail=True, methods=['post'])
+    def rescore(self, request, pk=None):
+        """Re-judge every video of this workout with criteria overrides, e.g. {"criteria": {"squat": {"end_point": 75}}}."""
+        workout = self.get_object()
+        criteria = request.data.get('criteria') or {}
+        if not isinstance(criteria, dict) or not all(isinstance(v, dict) for v in criteria.values()):
+            return Response(
+                {'detail': 'criteria must map movement names to threshold overrides.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        task = rescore_workout.delay(workout.id, criteria)
+        return Response(
+            {'id': workout.id, 'status': 'queued', 'task_id': task.id},
+            status=status.HTTP_202_ACCEPTED,
+        )
+
+    @action(detail=True, methods=['get'], url_path='rescore-result')
+    def rescore_result(self, request, pk=None):
+        """Outcome of a queued rescore (?task_id=...), including the videos it could not re-score."""
+        workout = self.get_object()
+        task_id = request.query_params.get('task_id')
+        if not task_id:
+            return Response({'detail': 'task_id is required.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        task = AsyncResult(task_id)
+        if not task.ready():
+            return Response({'id': workout.id, 'task_id': task_id, 'status': task.status.lower()})
+        if task.failed():
+            return Response({'id': workout.id, 'task_id': task_id, 'status': 'failed', 'detail': str(task.result)})
+        result = task.result or {}
+        if result.get('workout_id') != str(workout.id):
+            return Response({'detail': 'No rescore of this workout has that task_id.'}, status=status.HTTP_404_NOT_FOUND)
+        return Response({'id': workout.id, 'task_id': task_id, 'status': 'complete', **result})
+
 
 class WorkoutComponentsViewSet(viewsets.ModelViewSet):
     queryset = WorkoutComponent.objects.all()